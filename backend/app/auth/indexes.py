@@ -0,0 +1,5 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    "users": [IndexModel([("email", 1), ("role", 1)])],
+}
@@ -3,6 +3,7 @@ from app.auth.schemas import LoginRequest, TokenResponse
 from app.auth.service import verify_user_credentials
 from app.config.database import get_database
 from app.config.settings import settings
+from app.middleware.token_cache import token_cache
 from app.auth.service import verify_user_credentials
 
 router = APIRouter()
@@ -28,7 +29,7 @@ async def login(
         )
 
     from app.config.security import create_access_token
-    access_token = create_access_token(subject=user.user_id)
+    access_token = create_access_token(subject=user.user_id, claims={"email": user.email, "role": user.role})
 
     response.set_cookie(
         key="access_token",
@@ -42,6 +43,9 @@ async def login(
     return TokenResponse(message="Login successful")
 
 @router.post("/logout", response_model=TokenResponse)
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    token = request.cookies.get("access_token")
+    if token:
+        token_cache.revoke(token)
     response.delete_cookie(key="access_token", samesite="lax")
     return TokenResponse(message="Logout successful")
@@ -1,6 +1,7 @@
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.auth.schemas import AuthUserPayload
+from app.config.security import verify_and_update_async
 
 async def verify_user_credentials(
     db: AsyncIOMotorDatabase,
@@ -18,9 +19,13 @@ async def verify_user_credentials(
     if not user:
         return None
 
-    # 🔥 Hackathon-friendly plain-text check (as you decided)
-    if user.get("password") != password:
+    stored = user.get("password") or ""
+    valid, new_hash = await verify_and_update_async(password, stored)
+    if not valid:
         return None
+    if new_hash:
+        # Conditional on the old value so a concurrent password change is never overwritten.
+        await db["users"].update_one({"_id": user["_id"], "password": stored}, {"$set": {"password": new_hash}})
 
     return AuthUserPayload(
         user_id=str(user["_id"]),
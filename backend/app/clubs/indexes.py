@@ -0,0 +1,6 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    "clubs": [IndexModel("club_id", unique=True)],
+    "club_events": [IndexModel("club_id"), IndexModel("status")],
+}
@@ -1,19 +1,58 @@
+import asyncio
+import logging
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
 from app.config.settings import settings
+from app.config.indexes import ensure_indexes
+from app.config.mongo_metrics import mongo_metrics
+
+logger = logging.getLogger(__name__)
 
 mongo_client: AsyncIOMotorClient | None = None
 mongo_db = None
+setup_task: asyncio.Task | None = None
+
+
+async def _setup(db, after):
+    # Index builds, and any startup step that needs the server, run in the background and retry
+    # until mongod answers: an unreachable database leaves the API up with /api/ready at 503
+    # instead of aborting startup.
+    while True:
+        try:
+            await ensure_indexes(db)
+            for step in after:
+                await step(db)
+            return
+        except PyMongoError as e:
+            logger.warning("MongoDB setup failed, retrying in %ss: %s", settings.MONGO_SETUP_RETRY_SECONDS, e)
+            await asyncio.sleep(settings.MONGO_SETUP_RETRY_SECONDS)
 
 
-async def connect_to_mongo():
-    global mongo_client, mongo_db
+async def connect_to_mongo(*after):
+    global mongo_client, mongo_db, setup_task
     if mongo_client is None:
-        mongo_client = AsyncIOMotorClient(settings.MONGODB_URI)
+        mongo_client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxConnecting=settings.MONGO_MAX_CONNECTING,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS or None,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+            connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS or None,
+            event_listeners=[mongo_metrics],
+        )
         mongo_db = mongo_client[settings.DATABASE_NAME]
+        setup_task = asyncio.create_task(_setup(mongo_db, after))
 
 
 async def close_mongo():
-    global mongo_client, mongo_db
+    global mongo_client, mongo_db, setup_task
+    if setup_task:
+        setup_task.cancel()
+        setup_task = None
     if mongo_client:
         mongo_client.close()
         mongo_client = None
@@ -25,3 +64,39 @@ def get_database():
         raise RuntimeError("MongoDB is not initialized. Call connect_to_mongo first.")
     return mongo_db
 
+
+async def mongo_health() -> dict:
+    # Ready means the server answered a ping in time. A saturated pool is reported but does not
+    # fail readiness: during a spike every replica saturates at once, and pulling them all from
+    # the load balancer would turn slow responses into an outage. The probe is unauthenticated,
+    # so pools are summed rather than listed by address and errors are reduced to their type.
+    pools = list(mongo_metrics.pool_stats().values())
+    in_use = sum(p["in_use"] for p in pools)
+    waiting = sum(p["waiting"] for p in pools)
+    health = {
+        "ready": False,
+        "ping_ms": None,
+        "error": None,
+        "pool": {
+            "status": "saturated" if waiting and any(p["in_use"] >= settings.MONGO_MAX_POOL_SIZE for p in pools) else "ok",
+            "max_size": settings.MONGO_MAX_POOL_SIZE,
+            "connections": sum(p["connections"] for p in pools),
+            "in_use": in_use,
+            "waiting": waiting,
+            "checkout_timeouts": sum(p["checkout_timeouts"] for p in pools),
+            "checkout_wait_p99_ms": max((p["checkout_wait"]["p99_ms"] for p in pools), default=0.0),
+        },
+    }
+    if mongo_db is None:
+        health["error"] = "MongoDB is not initialized."
+        return health
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(mongo_db.command("ping"), settings.MONGO_READY_TIMEOUT_MS / 1000)
+        health["ready"] = True
+        health["ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    except asyncio.TimeoutError:
+        health["error"] = "Ping timed out."
+    except Exception as e:
+        health["error"] = type(e).__name__
+    return health
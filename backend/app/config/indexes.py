@@ -0,0 +1,36 @@
+import logging
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from app.auth.indexes import INDEXES as AUTH_INDEXES
+from app.clubs.indexes import INDEXES as CLUB_INDEXES
+from app.files.indexes import INDEXES as FILE_INDEXES
+from app.hall_ticket.indexes import INDEXES as HALL_TICKET_INDEXES
+from app.mindmaps.indexes import INDEXES as MINDMAP_INDEXES
+from app.seating.indexes import INDEXES as SEATING_INDEXES
+
+logger = logging.getLogger(__name__)
+
+# Each module declares {collection: [IndexModel, ...]} for the queries it runs.
+MODULE_INDEXES = [AUTH_INDEXES, HALL_TICKET_INDEXES, MINDMAP_INDEXES, CLUB_INDEXES, SEATING_INDEXES, FILE_INDEXES]
+
+def index_registry() -> Dict[str, List[IndexModel]]:
+    registry: Dict[str, List[IndexModel]] = {}
+    for indexes in MODULE_INDEXES:
+        for collection, models in indexes.items():
+            registry.setdefault(collection, []).extend(models)
+    return registry
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    # Creating an index that already exists with the same spec is a no-op, so this runs on every
+    # startup. A conflicting definition, or duplicates under a unique key, is logged and skipped
+    # so one bad collection does not keep the API down.
+    created: Dict[str, List[str]] = {}
+    for collection, models in index_registry().items():
+        for model in models:
+            try:
+                created.setdefault(collection, []).extend(await db[collection].create_indexes([model]))
+            except OperationFailure as e:
+                logger.warning("Index %s on %s not created: %s", model.document["name"], collection, e)
+    return created
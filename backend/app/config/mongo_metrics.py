@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+from pymongo import monitoring
+
+# Upper bounds in milliseconds; the last bucket catches everything slower.
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Commands without a collection argument are grouped under the database.
+COLLECTION_FIELDS = {"getMore": "collection"}
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation (max for the overflow bucket).
+        target = q * sum(self.counts)
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "mean_ms": round(self.total_ms / count, 3) if count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {f"le_{b}": c for b, c in zip(BUCKETS_MS, self.counts)} | {"inf": self.counts[-1]},
+        }
+
+
+class _PoolStats:
+    __slots__ = ("connections", "in_use", "waiting", "checkouts", "checkout_failures", "timeouts", "cleared", "wait")
+
+    def __init__(self):
+        self.connections = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.timeouts = 0
+        self.cleared = 0
+        self.wait = LatencyHistogram()
+
+    def to_dict(self) -> dict:
+        return {
+            "connections": self.connections,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "checkout_timeouts": self.timeouts,
+            "cleared": self.cleared,
+            "checkout_wait": self.wait.to_dict(),
+        }
+
+
+class MongoMetrics(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    # Registered on the client, so every command and pool event passes through here. Motor runs
+    # pymongo on worker threads, so events arrive concurrently and all state sits behind a lock.
+    # Command latency is driver round trip (network plus server); checkout wait is time spent
+    # queued for a pooled connection before the command could be sent.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, str] = {}
+        self._commands: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._failures: Dict[Tuple[str, str], int] = {}
+        self._pools: Dict[str, _PoolStats] = {}
+
+    # --- Commands ---
+    def started(self, event: monitoring.CommandStartedEvent):
+        target = event.command.get(COLLECTION_FIELDS.get(event.command_name, event.command_name))
+        namespace = f"{event.database_name}.{target}" if isinstance(target, str) else event.database_name
+        with self._lock:
+            self._pending[(event.request_id, event.connection_id)] = namespace
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            namespace = self._pending.pop((event.request_id, event.connection_id), event.database_name)
+            key = (namespace, event.command_name)
+            histogram = self._commands.get(key)
+            if histogram is None:
+                histogram = self._commands[key] = LatencyHistogram()
+            histogram.record(event.duration_micros / 1000)
+            if failed:
+                self._failures[key] = self._failures.get(key, 0) + 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, True)
+
+    # --- Connection pool ---
+    def _pool(self, address) -> _PoolStats:
+        name = "%s:%s" % address
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = self._pools[name] = _PoolStats()
+        return pool
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address).connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.connections = max(pool.connections - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._pool(event.address).waiting += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.waiting = max(pool.waiting - 1, 0)
+            pool.checkout_failures += 1
+            pool.timeouts += event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.waiting = max(pool.waiting - 1, 0)
+            pool.in_use += 1
+            pool.checkouts += 1
+            duration: Optional[float] = getattr(event, "duration", None)
+            if duration is not None:
+                pool.wait.record(duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.in_use = max(pool.in_use - 1, 0)
+
+    # --- Reporting ---
+    def pool_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {address: pool.to_dict() for address, pool in self._pools.items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            commands = {}
+            for (namespace, name), histogram in sorted(self._commands.items()):
+                commands.setdefault(namespace, {})[name] = dict(histogram.to_dict(), failures=self._failures.get((namespace, name), 0))
+            return {"commands": commands, "pools": {address: pool.to_dict() for address, pool in self._pools.items()}}
+
+
+mongo_metrics = MongoMetrics()
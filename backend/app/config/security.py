@@ -1,33 +1,71 @@
+import asyncio
+import hmac
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
+import bcrypt
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.config.settings import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# --- Password Hashing ---
+# bcrypt releases the GIL, so hashing runs on its own small thread pool: a login storm queues
+# there instead of blocking the event loop or exhausting the default executor.
+BCRYPT_HASH = re.compile(r"\$2[aby]?\$(\d\d)\$[./A-Za-z0-9]{53}")
+BCRYPT_MAX_BYTES = 72
+
+password_pool: ThreadPoolExecutor | None = None
+
+def get_password_pool() -> ThreadPoolExecutor:
+    global password_pool
+    if password_pool is None:
+        password_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+    return password_pool
+
+def shutdown_password_pool():
+    global password_pool
+    if password_pool:
+        password_pool.shutdown(wait=False, cancel_futures=True)
+        password_pool = None
+
+def _secret(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes; newer bcrypt releases raise instead of truncating.
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
 
-# --- Password Hashing (DISABLED FOR HACKATHON) ---
-# All password hashing is disabled for hackathon/prototype mode.
-# Passwords are compared in plain text.
-# This MUST be reverted to proper hashing (bcrypt) before production use!
-#
 def hash_password(password: str) -> str:
-    # Hashing disabled; store in plain text
-    return password
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)).decode("ascii")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Verification disabled; direct string comparison only
-    return plain_password == hashed_password
+    # Stored values that are not bcrypt hashes are legacy plain-text passwords.
+    if not hashed_password:
+        return False
+    if not BCRYPT_HASH.fullmatch(hashed_password):
+        return hmac.compare_digest(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return bcrypt.checkpw(_secret(plain_password), hashed_password.encode("ascii"))
+
+def needs_rehash(hashed_password: str) -> bool:
+    match = BCRYPT_HASH.fullmatch(hashed_password or "")
+    return not match or int(match.group(1)) < settings.PASSWORD_HASH_ROUNDS
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # Returns (valid, new_hash); new_hash is set when a valid password is stored in plain text
+    # or with a lower cost than PASSWORD_HASH_ROUNDS.
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    return True, hash_password(plain_password) if needs_rehash(hashed_password) else None
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await asyncio.get_running_loop().run_in_executor(get_password_pool(), verify_and_update, plain_password, hashed_password)
 
 # --- JWT Tokens ---
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None):
-    return _create_token(subject, expires_delta, fresh=True)
+def create_access_token(subject: str, expires_delta: Optional[timedelta] = None, claims: Optional[dict] = None):
+    return _create_token(subject, expires_delta, fresh=True, claims=claims)
 
 def create_refresh_token(subject: str, expires_delta: Optional[timedelta] = None):
     return _create_token(subject, expires_delta, refresh=True)
 
-def _create_token(subject: str, expires_delta: Optional[timedelta] = None, fresh=False, refresh=False):
-    to_encode = {"sub": subject, "iat": datetime.utcnow(), "fresh": fresh, "refresh": refresh}
+def _create_token(subject: str, expires_delta: Optional[timedelta] = None, fresh=False, refresh=False, claims: Optional[dict] = None):
+    to_encode = {**(claims or {}), "sub": subject, "iat": datetime.utcnow(), "fresh": fresh, "refresh": refresh}
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
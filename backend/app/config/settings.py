@@ -16,17 +16,62 @@ except: pass
 class Settings(BaseSettings):
     MONGODB_URI: str
     DATABASE_NAME: str = "vcube"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 30000
+    MONGO_READY_TIMEOUT_MS: int = 1000
+    MONGO_SETUP_RETRY_SECONDS: float = 5.0
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 600
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080
+    TOKEN_CACHE_MAX_ENTRIES: int = 20000
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
 
     AWS_S3_BUCKET: str = ""
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_S3_REGION: str = ""
+    AWS_S3_ENDPOINT_URL: str = ""
     CLOUDINARY_URL: str = ""
+    STORAGE_BACKEND: str = "auto"
+    LOCAL_STORAGE_DIR: str = "data/storage"
+    LOCAL_STORAGE_URL: str = "/storage"
+    STORAGE_IO_WORKERS: int = 16
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_BATCH_MAX_FILES: int = 50
+    UPLOAD_BATCH_CONCURRENCY: int = 8
+    SIGNED_URL_TTL_SECONDS: int = 900
+    FILE_CACHE_TTL_SECONDS: int = 300
+    FILE_CACHE_MAX_ENTRIES: int = 10000
+
+    CSV_INGEST_CHUNK_SIZE: int = 64 * 1024
+    CSV_INGEST_BATCH_SIZE: int = 1000
+    CSV_INGEST_MAX_REPORTED_ERRORS: int = 100
+
+    SEAT_CACHE_TTL_SECONDS: int = 300
+    SEATING_UPDATE_LEASE_SECONDS: int = 30
+    SEATING_UPDATE_RETRIES: int = 20
+    SEATING_UPDATE_RETRY_SECONDS: float = 0.05
+
+    PROCESS_POOL_WORKERS: int = 0
+    EXPORT_MAX_IN_FLIGHT: int = 16
+
+    HALL_TICKET_BATCH_SIZE: int = 200
+    HALL_TICKET_RENDER_CHUNK: int = 25
+    HALL_TICKET_UPLOAD_CONCURRENCY: int = 16
+    HALL_TICKET_JOB_LEASE_SECONDS: int = 120
+    HALL_TICKET_JOB_RETRY_SECONDS: float = 5.0
+    HALL_TICKET_MAX_REPORTED_ERRORS: int = 100
 
     FRONTEND_ORIGIN: str = "http://localhost:3000"
     cors_origins_str: str = "http://localhost:3000"
@@ -2,6 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Optional
 from bson.objectid import ObjectId
 from app.exams.schemas import ExamCreate, ExamUpdate, ExamResponse
+from app.hall_ticket.service import mark_tickets_stale
 
 def _serialize_exam(doc) -> dict:
     if not doc:
@@ -30,12 +31,16 @@ async def update_exam(db: AsyncIOMotorDatabase, exam_id: str, data: ExamUpdate)
         if not doc:
             return None
         return ExamResponse.parse_obj(_serialize_exam(doc))
-    await db["exams"].update_one({"_id": ObjectId(exam_id)}, {"$set": update_data})
+    res = await db["exams"].update_one({"_id": ObjectId(exam_id)}, {"$set": update_data})
+    if res.modified_count:
+        await mark_tickets_stale(db, exam_id)
     doc = await db["exams"].find_one({"_id": ObjectId(exam_id)})
     return ExamResponse.parse_obj(_serialize_exam(doc)) if doc else None
 
 async def delete_exam(db: AsyncIOMotorDatabase, exam_id: str) -> bool:
     res = await db["exams"].delete_one({"_id": ObjectId(exam_id)})
+    if res.deleted_count:
+        await mark_tickets_stale(db, exam_id)
     return res.deleted_count > 0
 
 async def fetch_exams(db: AsyncIOMotorDatabase) -> List[ExamResponse]:
@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.config.settings import settings
+
+class CachedFile:
+    __slots__ = ("uploaded_by", "storage_backend", "storage_key", "url", "filename", "content_type", "etag", "last_modified", "signed_url", "expires_at")
+
+    def __init__(self, doc: dict, expires_at: float):
+        self.uploaded_by = doc.get("uploaded_by")
+        self.storage_backend = doc.get("storage_backend")
+        self.storage_key = doc.get("storage_key")
+        self.url = doc.get("url")
+        self.filename = doc.get("filename")
+        self.content_type = doc.get("content_type")
+        # Stored objects are immutable, so their content hash is a strong validator.
+        self.etag = f'"{doc["sha256"]}"' if doc.get("sha256") else None
+        self.last_modified = doc.get("uploaded_at")
+        self.signed_url: Optional[str] = None
+        self.expires_at = expires_at
+
+class FileLocationCache:
+    # LRU of file id -> what a download needs (owner, location, validators, signed URL), so
+    # repeat downloads skip the files lookup and URL signing. Entries carrying a signed URL
+    # expire at half the URL's lifetime, so handed-out URLs always have time left.
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._files: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_id: str) -> Optional[CachedFile]:
+        entry = self._files.get(file_id)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                del self._files[file_id]
+            self.misses += 1
+            return None
+        self._files.move_to_end(file_id)
+        self.hits += 1
+        return entry
+
+    def put(self, file_id: str, doc: dict, signed_url: Optional[str] = None, signed_ttl: Optional[int] = None) -> CachedFile:
+        ttl = self.ttl_seconds if signed_ttl is None else min(self.ttl_seconds, signed_ttl / 2)
+        entry = CachedFile(doc, time.monotonic() + ttl)
+        entry.signed_url = signed_url
+        self._files[file_id] = entry
+        self._files.move_to_end(file_id)
+        while len(self._files) > self.max_entries:
+            self._files.popitem(last=False)
+        return entry
+
+    def invalidate(self, file_id: Optional[str] = None):
+        if file_id is None:
+            self._files.clear()
+        else:
+            self._files.pop(file_id, None)
+
+file_cache = FileLocationCache(settings.FILE_CACHE_TTL_SECONDS, settings.FILE_CACHE_MAX_ENTRIES)
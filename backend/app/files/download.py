@@ -1,11 +1,51 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi import APIRouter, Depends, Request, HTTPException, Query, status
 from fastapi.responses import RedirectResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.config.database import get_database
+from app.config.settings import settings
+from app.files.cache import CachedFile, file_cache
+from app.files.serving import LocalFileResponse, http_date, not_modified, not_modified_response
+from app.storage.local import LocalStorage
+from app.storage.service import get_storage
 from bson.objectid import ObjectId
+from email.utils import formatdate
 from typing import Optional
 
 router = APIRouter(prefix="/api/files", tags=["Files"])
+storage_router = APIRouter(prefix=settings.LOCAL_STORAGE_URL, tags=["Files"])
+
+def _local_storage() -> Optional[LocalStorage]:
+    storage = get_storage()
+    return storage if isinstance(storage, LocalStorage) else None
+
+def _serve_local(request: Request, storage: LocalStorage, key: str, etag: Optional[str], last_modified: Optional[str], content_type: Optional[str], filename: Optional[str]):
+    path = storage.path(key)
+    try:
+        stat_result = path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
+    # Objects are never rewritten in place, so mtime and size make a sound fallback validator.
+    etag = etag or f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    last_modified = last_modified or formatdate(stat_result.st_mtime, usegmt=True)
+    if not_modified(request.headers, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    headers = {"cache-control": "private, no-cache", "etag": etag, "last-modified": last_modified}
+    return LocalFileResponse(path, headers=headers, media_type=content_type, filename=filename, stat_result=stat_result, content_disposition_type="inline")
+
+async def _load(db: AsyncIOMotorDatabase, file_id: str) -> CachedFile:
+    entry = file_cache.get(file_id)
+    if entry:
+        return entry
+    try:
+        file_doc = await db["files"].find_one({"_id": ObjectId(file_id)})
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
+    if not file_doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
+    if file_doc.get("storage_key") and file_doc.get("storage_backend") not in (None, "local"):
+        signed = await get_storage().signed_url(file_doc["storage_key"], settings.SIGNED_URL_TTL_SECONDS)
+        return file_cache.put(file_id, file_doc, signed, settings.SIGNED_URL_TTL_SECONDS)
+    return file_cache.put(file_id, file_doc)
 
 @router.get("/{file_id}")
 async def download_file(
@@ -13,21 +53,36 @@ async def download_file(
     request: Request,
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
+    # Local objects are streamed here (Range, revalidation, zero-copy); remote ones redirect to
+    # a short-lived signed URL. Both come from the file cache on repeat downloads.
     user = getattr(request.state, "user", None)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
-    try:
-        file_doc = await db["files"].find_one({"_id": ObjectId(file_id)})
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
-    if not file_doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
-    uploaded_by = file_doc.get("uploaded_by")
+    entry = await _load(db, file_id)
     user_role = user.get("role")
-    if uploaded_by != user["user_id"] and user_role not in ["ADMIN"]:
+    if entry.uploaded_by != user["user_id"] and user_role not in ["ADMIN"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied.")
-    url = file_doc.get("url")
+    local = _local_storage()
+    if entry.storage_backend == "local" and local and entry.storage_key:
+        last_modified = http_date(entry.last_modified) if entry.last_modified else None
+        return _serve_local(request, local, entry.storage_key, entry.etag, last_modified, entry.content_type, entry.filename)
+    url = entry.signed_url or entry.url
     if not url:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File URL not available.")
     return RedirectResponse(url=url, status_code=status.HTTP_302_FOUND)
 
+@storage_router.get("/{key:path}")
+async def serve_storage_object(
+    key: str,
+    request: Request,
+    expires: Optional[int] = Query(None),
+    signature: Optional[str] = Query(None),
+):
+    # Target of LocalStorage links, e.g. hall ticket PDFs. The signature is the authorization,
+    # so the path is public and works from plain links and <img> tags.
+    local = _local_storage()
+    if not local:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found.")
+    if not local.verify_signature(key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired link.")
+    return _serve_local(request, local, key, None, None, None, None)
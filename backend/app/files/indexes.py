@@ -0,0 +1,9 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    # Reference documents carry no sha256, so only stored objects are unique per hash.
+    "files": [
+        IndexModel("sha256", unique=True, partialFilterExpression={"sha256": {"$exists": True}}),
+        IndexModel("ref", sparse=True),
+    ],
+}
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+ZEROCOPY = "http.response.zerocopysend"
+
+
+def http_date(value: datetime) -> str:
+    # Mongo hands back naive datetimes in UTC.
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return format_datetime(value.replace(microsecond=0), usegmt=True)
+
+
+def not_modified(request_headers: Headers, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return etag is not None and ("*" in tags or etag in tags)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(etag: Optional[str], last_modified: Optional[str]) -> Response:
+    headers = {"cache-control": "private, no-cache"}
+    if etag:
+        headers["etag"] = etag
+    if last_modified:
+        headers["last-modified"] = last_modified
+    return Response(status_code=304, headers=headers)
+
+
+class LocalFileResponse(FileResponse):
+    # FileResponse already handles Range/If-Range, ETag and Last-Modified, and uses pathsend when
+    # the server offers it. This adds the ASGI zero-copy send extension (the server sendfile()s
+    # the descriptor) for whole-file and single-range bodies.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._zerocopy = scope["type"] == "http" and ZEROCOPY in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _zerocopy_send(self, send: Send, offset: int, count: int) -> None:
+        with open(self.path, "rb") as file:
+            await send({"type": ZEROCOPY, "file": file, "offset": offset, "count": count, "more_body": False})
+
+    async def _handle_simple(self, send: Send, send_header_only: bool, send_pathsend: bool) -> None:
+        if not self._zerocopy or send_header_only or send_pathsend:
+            return await super()._handle_simple(send, send_header_only, send_pathsend)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await self._zerocopy_send(send, 0, int(self.headers["content-length"]))
+
+    async def _handle_single_range(self, send: Send, start: int, end: int, file_size: int, send_header_only: bool) -> None:
+        if not self._zerocopy or send_header_only:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": headers.raw})
+        await self._zerocopy_send(send, start, end - start)
@@ -0,0 +1,147 @@
+import hashlib
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Collection, List, Optional
+from fastapi import Request
+from app.storage.base import StorageBackend, StorageWriter
+
+try:
+    import python_multipart as multipart
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import parse_options_header
+
+# Slack for multipart boundaries and part headers when pre-checking Content-Length.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+class StreamedUpload:
+    def __init__(self, filename: str, content_type: str, key: Optional[str] = None, writer: Optional[StorageWriter] = None, error: Optional[str] = None):
+        self.filename = filename
+        self.content_type = content_type
+        self.key = key
+        self.writer = writer
+        self.error = error
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+
+async def iter_uploads(
+    request: Request,
+    storage: StorageBackend,
+    key_for: Callable[[str], str],
+    allowed_types: Collection[str],
+    max_size: int,
+    field: str = "file",
+    max_files: int = 1,
+) -> AsyncIterator[StreamedUpload]:
+    # Parses the multipart body as it arrives and forwards each file part named `field` to its
+    # own storage writer, hashing and counting bytes on the way. Memory is bounded by the network
+    # chunk plus the writers' buffers. Each part is yielded once complete, or as soon as it is
+    # rejected (with .error set, its writer already aborted and its remaining bytes skipped).
+    # Callers must commit() or abort() the writers of successful parts.
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected("Expected a multipart/form-data request.")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_files * max_size + MULTIPART_OVERHEAD:
+        raise UploadRejected("File size exceeds limit.")
+
+    events: List[tuple] = []
+    header = {"field": b"", "value": b""}
+    headers = {}
+
+    def on_header_field(data, start, end):
+        header["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        header["value"] += data[start:end]
+
+    def on_header_end():
+        headers[header["field"].lower()] = header["value"]
+        header["field"] = header["value"] = b""
+
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+        headers.clear()
+
+    parser = multipart.MultipartParser(params[b"boundary"], {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": lambda data, start, end: events.append(("data", bytes(data[start:end]))),
+        "on_part_end": lambda: events.append(("end", None)),
+    })
+
+    current: Optional[StreamedUpload] = None
+    seen = 0
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, value in events:
+                if kind == "headers":
+                    _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+                    if disposition.get(b"name", b"").decode("latin-1") != field or b"filename" not in disposition:
+                        continue
+                    seen += 1
+                    if seen > max_files:
+                        raise UploadRejected(f"Too many files; at most {max_files} per request.")
+                    filename = disposition[b"filename"].decode("utf-8", "replace")
+                    part_type = value.get(b"content-type", b"").decode("latin-1")
+                    if part_type not in allowed_types:
+                        yield StreamedUpload(filename, part_type, error="Invalid file type.")
+                        continue
+                    key = key_for(filename)
+                    current = StreamedUpload(filename, part_type, key, storage.open_writer(key, part_type))
+                elif kind == "data" and current:
+                    current.size += len(value)
+                    if current.size > max_size:
+                        rejected, current = current, None
+                        await rejected.writer.abort()
+                        rejected.error = "File size exceeds limit."
+                        yield rejected
+                        continue
+                    current.sha256.update(value)
+                    await current.writer.write(value)
+                elif kind == "end" and current:
+                    completed, current = current, None
+                    yield completed
+            events.clear()
+        parser.finalize()
+        if current:
+            raise UploadRejected("Incomplete upload.")
+    except MultipartParseError as e:
+        raise UploadRejected("Malformed multipart body.") from e
+    finally:
+        if current:
+            await current.writer.abort()
+
+
+async def receive_upload(
+    request: Request,
+    storage: StorageBackend,
+    key_for: Callable[[str], str],
+    allowed_types: Collection[str],
+    max_size: int,
+    field: str = "file",
+) -> StreamedUpload:
+    # Single-file variant: the first rejection ends the request without reading further.
+    async with aclosing(iter_uploads(request, storage, key_for, allowed_types, max_size, field)) as uploads:
+        async for upload in uploads:
+            if upload.error:
+                raise UploadRejected(upload.error)
+            try:
+                async for _ in uploads:
+                    pass
+            except BaseException:
+                await upload.writer.abort()
+                raise
+            return upload
+    raise UploadRejected("No file provided.")
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, Request, UploadFile, File, HTTPException, status
+import asyncio
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, Request, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.config.database import get_database
 from app.config.settings import settings
+from app.files.streaming import StreamedUpload, iter_uploads, receive_upload, UploadRejected
+from app.middleware.role_guard import require_roles
+from app.storage.base import StorageBackend
+from app.storage.service import get_storage, storage_metrics
 from datetime import datetime
-from typing import Optional
-import boto3
-from botocore.exceptions import ClientError
-import cloudinary
-import cloudinary.uploader
-from io import BytesIO
+from typing import Dict, List, Optional
+from uuid import uuid4
+from bson.objectid import ObjectId
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 router = APIRouter(prefix="/api/files", tags=["Files"])
 
@@ -22,60 +27,251 @@ ALLOWED_CONTENT_TYPES = {
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
-async def upload_to_storage(file_content: bytes, filename: str, content_type: str) -> str:
-    if settings.AWS_S3_BUCKET and settings.AWS_ACCESS_KEY_ID:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_S3_REGION,
-        )
-        key = f"uploads/{datetime.utcnow().strftime('%Y/%m/%d')}/{filename}"
-        s3_client.put_object(Bucket=settings.AWS_S3_BUCKET, Key=key, Body=file_content, ContentType=content_type)
-        return f"https://{settings.AWS_S3_BUCKET}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{key}"
-    elif settings.CLOUDINARY_URL:
-        cloudinary.config(cloudinary_url=settings.CLOUDINARY_URL)
-        result = cloudinary.uploader.upload(
-            BytesIO(file_content),
-            resource_type="auto",
-            folder="uploads",
-            public_id=filename.rsplit(".", 1)[0],
-        )
-        return result.get("secure_url", result.get("url", ""))
-    else:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="File storage not configured.")
-
-@router.post("/upload")
+def upload_key(filename: str) -> str:
+    # A unique segment per upload, so same-named files never overwrite each other's objects.
+    return f"uploads/{datetime.utcnow().strftime('%Y/%m/%d')}/{uuid4().hex}/{filename}"
+
+def _stored_doc(upload: StreamedUpload, url: str, storage_backend: str, user_id: str) -> dict:
+    return {
+        "_id": ObjectId(),
+        "filename": upload.filename,
+        "content_type": upload.content_type,
+        "size": upload.size,
+        "sha256": upload.sha256.hexdigest(),
+        "url": url,
+        "storage_backend": storage_backend,
+        "storage_key": upload.key,
+        "uploaded_by": user_id,
+        "uploaded_at": datetime.utcnow(),
+    }
+
+def _reference_doc(original: dict, upload: StreamedUpload, user_id: str) -> dict:
+    # Points at an already stored object with identical content; nothing is written to storage.
+    return {
+        "_id": ObjectId(),
+        "filename": upload.filename,
+        "content_type": upload.content_type,
+        "size": upload.size,
+        "url": original["url"],
+        "storage_backend": original.get("storage_backend"),
+        "storage_key": original.get("storage_key"),
+        "ref": original.get("ref", original["_id"]),
+        "uploaded_by": user_id,
+        "uploaded_at": datetime.utcnow(),
+    }
+
+def _upload_result(doc: dict) -> dict:
+    # Local objects are only readable through signed links, so point at the owner-checked route.
+    return {
+        "file_id": str(doc["_id"]),
+        "filename": doc["filename"],
+        "url": f"/api/files/{doc['_id']}" if doc.get("storage_backend") == "local" else doc["url"],
+        "size": doc["size"],
+        "deduplicated": "ref" in doc,
+    }
+
+async def upload_to_storage(file_content: bytes, key: str, content_type: str) -> str:
+    return await get_storage().put(key, file_content, content_type)
+
+async def _store_or_reference(db: AsyncIOMotorDatabase, storage: StorageBackend, upload: StreamedUpload, user_id: str) -> dict:
+    original = await db["files"].find_one({"sha256": upload.sha256.hexdigest()})
+    if original:
+        await upload.writer.abort()
+        return _reference_doc(original, upload, user_id)
+    url = await upload.writer.commit()
+    return _stored_doc(upload, url, storage.name, user_id)
+
+async def _insert_file_docs(db: AsyncIOMotorDatabase, storage: StorageBackend, uploads: List[StreamedUpload], docs: List[Optional[dict]]):
+    # One insert_many for the whole batch. An entry that lost a race with a concurrent upload of
+    # the same content has its object deleted and becomes a reference to the winner, along with
+    # any in-batch references to it; entries that failed otherwise are set to None.
+    pending = [d for d in docs if d]
+    if not pending:
+        return
+    try:
+        await db["files"].insert_many(pending, ordered=False)
+        return
+    except BulkWriteError as e:
+        failed = {pending[err["index"]]["_id"]: err.get("code") for err in e.details.get("writeErrors", [])}
+    winners, lost, retry = {}, set(), []
+    for i, doc in enumerate(docs):
+        if not doc or doc["_id"] not in failed:
+            continue
+        original = None
+        if "sha256" in doc:
+            if failed[doc["_id"]] == 11000:
+                original = await db["files"].find_one({"sha256": doc["sha256"]})
+            await storage.delete(doc["storage_key"])
+        if original:
+            winners[doc["_id"]] = original
+            docs[i] = _reference_doc(original, uploads[i], doc["uploaded_by"])
+            retry.append(docs[i])
+        else:
+            lost.add(doc["_id"])
+            docs[i] = None
+    fixes = []
+    for i, doc in enumerate(docs):
+        if doc and doc.get("ref") in winners:
+            docs[i] = dict(_reference_doc(winners[doc["ref"]], uploads[i], doc["uploaded_by"]), _id=doc["_id"])
+            fixes.append(ReplaceOne({"_id": doc["_id"]}, docs[i]))
+        elif doc and doc.get("ref") in lost:
+            fixes.append(DeleteOne({"_id": doc["_id"]}))
+            docs[i] = None
+    if retry:
+        await db["files"].insert_many(retry, ordered=False)
+    if fixes:
+        await db["files"].bulk_write(fixes, ordered=False)
+
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"],
+        }}},
+    }
+}
+
+BATCH_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+            "required": ["files"],
+        }}},
+    }
+}
+
+@router.post("/upload", openapi_extra=UPLOAD_OPENAPI)
 async def upload_file(
-    file: UploadFile = File(...),
     request: Request,
     db: AsyncIOMotorDatabase = Depends(get_database),
 ):
+    # The body is streamed straight to storage rather than declared as an UploadFile, which
+    # would make Starlette spool the whole file before size or type could be checked.
     user = getattr(request.state, "user", None)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
-    if not file.content_type or file.content_type not in ALLOWED_CONTENT_TYPES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type.")
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File size exceeds limit.")
+    storage = get_storage()
     try:
-        url = await upload_to_storage(content, file.filename, file.content_type)
-    except Exception as e:
+        upload = await receive_upload(request, storage, upload_key, ALLOWED_CONTENT_TYPES, MAX_FILE_SIZE)
+    except UploadRejected as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="File upload failed.")
-    file_doc = {
-        "filename": file.filename,
-        "content_type": file.content_type,
-        "size": len(content),
-        "url": url,
-        "uploaded_by": user["user_id"],
-        "uploaded_at": datetime.utcnow(),
+    try:
+        file_doc = await _store_or_reference(db, storage, upload, user["user_id"])
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="File upload failed.")
+    try:
+        await db["files"].insert_one(file_doc)
+    except DuplicateKeyError:
+        # A concurrent upload of the same content stored it first: keep theirs, drop ours.
+        original = await db["files"].find_one({"sha256": file_doc["sha256"]})
+        await storage.delete(upload.key)
+        file_doc = _reference_doc(original, upload, user["user_id"])
+        await db["files"].insert_one(file_doc)
+    return _upload_result(file_doc)
+
+@router.post("/upload/batch", openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def upload_files(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
+    # Files are committed to storage while later parts are still arriving. A free commit slot
+    # is awaited before reading past each file, which bounds buffered uploads to the
+    # concurrency limit. A rejected or failed file only fails its own entry.
+    user = getattr(request.state, "user", None)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
+    storage = get_storage()
+    slots = asyncio.Semaphore(settings.UPLOAD_BATCH_CONCURRENCY)
+    uploads: List[StreamedUpload] = []
+    tasks: List[Optional[asyncio.Task]] = []
+    first_by_hash: Dict[str, asyncio.Task] = {}
+
+    async def store(upload: StreamedUpload) -> dict:
+        try:
+            return await _store_or_reference(db, storage, upload, user["user_id"])
+        finally:
+            slots.release()
+
+    async def reference(upload: StreamedUpload, first: asyncio.Task) -> dict:
+        try:
+            await upload.writer.abort()
+            return _reference_doc(await first, upload, user["user_id"])
+        finally:
+            slots.release()
+
+    error = None
+    try:
+        async with aclosing(iter_uploads(
+            request, storage, upload_key, ALLOWED_CONTENT_TYPES, MAX_FILE_SIZE, field="files", max_files=settings.UPLOAD_BATCH_MAX_FILES
+        )) as received:
+            async for upload in received:
+                uploads.append(upload)
+                if upload.error:
+                    tasks.append(None)
+                    continue
+                await slots.acquire()
+                digest = upload.sha256.hexdigest()
+                if digest in first_by_hash:
+                    tasks.append(asyncio.create_task(reference(upload, first_by_hash[digest])))
+                else:
+                    task = first_by_hash[digest] = asyncio.create_task(store(upload))
+                    tasks.append(task)
+    except UploadRejected as e:
+        if not uploads:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        error = str(e)
+    if not uploads and not error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files provided.")
+
+    outcomes = await asyncio.gather(*(t for t in tasks if t), return_exceptions=True)
+    done = iter(outcomes)
+    docs: List[Optional[dict]] = []
+    for upload, task in zip(uploads, tasks):
+        outcome = next(done) if task else None
+        docs.append(outcome if isinstance(outcome, dict) else None)
+    await _insert_file_docs(db, storage, uploads, docs)
+
+    results = []
+    for upload, task, doc in zip(uploads, tasks, docs):
+        if doc:
+            results.append(dict(_upload_result(doc), status="ok"))
+        else:
+            results.append({"filename": upload.filename, "status": "error", "error": upload.error or "File upload failed."})
+    response = {
+        "uploaded": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
     }
-    result = await db["files"].insert_one(file_doc)
+    if error:
+        response["error"] = error
+    return response
+
+@router.get("/storage/metrics", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_storage_metrics():
+    return storage_metrics()
+
+@router.get("/dedup/stats", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_dedup_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
+    totals = {"stored": {"count": 0, "bytes": 0}, "deduplicated": {"count": 0, "bytes": 0}}
+    pipeline = [{"$group": {
+        "_id": {"$cond": [{"$ifNull": ["$ref", False]}, "deduplicated", "stored"]},
+        "count": {"$sum": 1},
+        "bytes": {"$sum": "$size"},
+    }}]
+    async for row in db["files"].aggregate(pipeline):
+        totals[row["_id"]] = {"count": row["count"], "bytes": row["bytes"]}
+    uploads = totals["stored"]["count"] + totals["deduplicated"]["count"]
     return {
-        "file_id": str(result.inserted_id),
-        "filename": file.filename,
-        "url": url,
-        "size": len(content),
+        "uploads": uploads,
+        "stored_objects": totals["stored"]["count"],
+        "stored_bytes": totals["stored"]["bytes"],
+        "dedup_hits": totals["deduplicated"]["count"],
+        "hit_rate": round(totals["deduplicated"]["count"] / uploads, 4) if uploads else 0.0,
+        "bytes_saved": totals["deduplicated"]["bytes"],
     }
-
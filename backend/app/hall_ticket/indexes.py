@@ -0,0 +1,13 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    "hall_tickets": [
+        IndexModel([("student_id", 1), ("issued_at", -1)]),
+        IndexModel([("job_id", 1), ("student_id", 1)]),
+        IndexModel([("exams.exam_id", 1), ("stale", 1)]),
+        IndexModel("stale", partialFilterExpression={"stale": True}),
+    ],
+    "hall_ticket_jobs": [IndexModel("status")],
+    # Bulk jobs page through each cohort in student_id order.
+    "students": [IndexModel([("department", 1), ("semester", 1), ("student_id", 1)])],
+}
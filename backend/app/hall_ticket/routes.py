@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, status
-from app.hall_ticket.schemas import HallTicketResponse
-from app.hall_ticket.service import get_hall_ticket_by_student, admin_get_hall_ticket
+from fastapi import APIRouter, Depends, Request, HTTPException, status, Query
+from app.hall_ticket.schemas import HallTicketResponse, HallTicketJobResponse
+from app.hall_ticket.service import get_hall_ticket_by_student, admin_get_hall_ticket, start_bulk_generation, get_bulk_job
 from app.config.database import get_database
 from app.middleware.role_guard import require_roles
 
@@ -16,6 +16,25 @@ async def get_my_hall_ticket(request: Request, db=Depends(get_database)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hall ticket not found.")
     return ticket
 
+@router.post("/bulk", response_model=HallTicketJobResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_roles(["ADMIN"]))])
+async def start_bulk_hall_tickets(
+    session_date: str = Query(None),
+    session_time: str = Query(None),
+    stale_only: bool = Query(False),
+    db=Depends(get_database)
+):
+    try:
+        return await start_bulk_generation(db, session_date, session_time, stale_only)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/bulk/{job_id}", response_model=HallTicketJobResponse, dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_bulk_hall_ticket_status(job_id: str, db=Depends(get_database)):
+    job = await get_bulk_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found.")
+    return job
+
 @router.get("/{student_id}", response_model=HallTicketResponse, dependencies=[Depends(require_roles(["ADMIN"]))])
 async def admin_get_ticket(student_id: str, db=Depends(get_database)):
     ticket = await admin_get_hall_ticket(db, student_id)
@@ -16,5 +16,18 @@ class HallTicketResponse(BaseModel):
     pdf_url: str
     qr_code_url: Optional[str] = None
     issued_at: str
+    stale: bool = False
 
-
+class HallTicketJobResponse(BaseModel):
+    job_id: str
+    status: str  # pending, running, completed, failed
+    session_date: Optional[str] = None
+    session_time: Optional[str] = None
+    stale_only: bool = False
+    total: int
+    processed: int
+    reused: int = 0
+    failed: int
+    errors: List[str] = []
+    created_at: str
+    updated_at: str
@@ -1,28 +1,88 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.hall_ticket.schemas import HallTicketMeta, HallTicketResponse
+from pymongo import ReturnDocument, UpdateOne
+from bson.objectid import ObjectId
+from app.config.settings import settings
+from app.hall_ticket.schemas import HallTicketMeta, HallTicketResponse, HallTicketJobResponse
+from app.seating.encoding import decode_room
+from app.storage.base import guess_content_type
+from app.storage.service import get_storage, shareable_url
 from app.utils.qr_generator import generate_qr_code
 from app.utils.pdf_generator import create_hall_ticket_pdf
-from typing import Optional, List
-from datetime import datetime
+from app.utils.process_pool import run_in_process
+from typing import Optional, List, Dict, Tuple, Set, Iterable
+from datetime import datetime, timedelta
 
-# Cloud storage upload to be implemented (S3/Cloudinary)
 async def upload_pdf(file_bytes: bytes, filename: str) -> str:
-    # Placeholder: integrate with S3/Cloudinary here, return URL
-    raise NotImplementedError("Upload logic not implemented.")
+    return await get_storage().put(f"hall_tickets/{filename}", file_bytes, guess_content_type(filename))
 
 # Fetch hall ticket for a student
 def _serialize_ticket(doc):
     doc["hall_ticket_id"] = str(doc.get("_id"))
     return doc
 
+async def _ticket_response(doc: dict) -> HallTicketResponse:
+    doc = _serialize_ticket(dict(doc))
+    doc["pdf_url"] = await shareable_url(doc.get("pdf_url"))
+    doc["qr_code_url"] = await shareable_url(doc.get("qr_code_url"))
+    return HallTicketResponse.parse_obj(doc)
+
 async def get_hall_ticket_by_student(db: AsyncIOMotorDatabase, student_id: str) -> Optional[HallTicketResponse]:
-    doc = await db["hall_tickets"].find_one({"student_id": student_id})
-    return HallTicketResponse.parse_obj(_serialize_ticket(doc)) if doc else None
+    doc = await db["hall_tickets"].find_one({"student_id": student_id}, sort=[("issued_at", -1)])
+    return await _ticket_response(doc) if doc else None
+
+# Content-addressed artifacts: a ticket PDF depends only on the student name and the rendered exam fields.
+TICKET_FIELDS = ("subject", "code", "date", "time", "venue")
+
+def ticket_content_hash(student_name: str, exams: List[dict]) -> str:
+    canonical = {
+        "student_name": student_name,
+        "exams": sorted(([str(exam.get(f) or "") for f in TICKET_FIELDS] for exam in exams), key=lambda e: (e[2], e[3], e[1], e[0])),
+    }
+    return hashlib.blake2b(json.dumps(canonical, separators=(",", ":")).encode("utf-8"), digest_size=16).hexdigest()
+
+async def _fresh_tickets(db: AsyncIOMotorDatabase, hashes: Dict[str, str]) -> Dict[str, dict]:
+    # Latest non-stale ticket per student whose content still matches.
+    fresh = {}
+    cursor = db["hall_tickets"].find({"student_id": {"$in": list(hashes)}, "content_hash": {"$in": list(set(hashes.values()))}, "stale": {"$ne": True}})
+    async for doc in cursor.sort("issued_at", 1):
+        if doc["content_hash"] == hashes[doc["student_id"]]:
+            fresh[doc["student_id"]] = doc
+    return fresh
+
+async def _cached_pdf_urls(db: AsyncIOMotorDatabase, hashes) -> Dict[str, str]:
+    return {doc["_id"]: doc["pdf_url"] async for doc in db["hall_ticket_artifacts"].find({"_id": {"$in": list(set(hashes))}})}
+
+async def _store_pdf_artifacts(db: AsyncIOMotorDatabase, urls: Dict[str, str]):
+    if urls:
+        now = datetime.utcnow().isoformat()
+        await db["hall_ticket_artifacts"].bulk_write(
+            [UpdateOne({"_id": h}, {"$setOnInsert": {"pdf_url": url, "created_at": now}}, upsert=True) for h, url in urls.items()],
+            ordered=False,
+        )
+
+async def _clear_stale(db: AsyncIOMotorDatabase, student_ids: List[str]):
+    await db["hall_tickets"].update_many({"student_id": {"$in": student_ids}, "stale": True}, {"$set": {"stale": False}})
+
+async def mark_tickets_stale(db: AsyncIOMotorDatabase, exam_id: str) -> int:
+    res = await db["hall_tickets"].update_many({"exams.exam_id": exam_id, "stale": {"$ne": True}}, {"$set": {"stale": True}})
+    return res.modified_count
 
 async def generate_hall_ticket(db: AsyncIOMotorDatabase, student_id: str, student_name: str, exams: List[dict]) -> HallTicketResponse:
+    content_hash = ticket_content_hash(student_name, exams)
+    fresh = await _fresh_tickets(db, {student_id: content_hash})
+    if student_id in fresh:
+        return await _ticket_response(fresh[student_id])
     issued_at = datetime.utcnow().isoformat()
-    pdf_bytes = create_hall_ticket_pdf(student_name, exams)
-    pdf_url = await upload_pdf(pdf_bytes, f"hall_ticket_{student_id}.pdf")
+    pdf_url = (await _cached_pdf_urls(db, [content_hash])).get(content_hash)
+    if not pdf_url:
+        pdf_bytes = create_hall_ticket_pdf(student_name, exams)
+        pdf_url = await upload_pdf(pdf_bytes, f"hall_ticket_{content_hash}.pdf")
+        await _store_pdf_artifacts(db, {content_hash: pdf_url})
     qr_content = f"{student_id}|{issued_at}"
     qr_code_bytes = generate_qr_code(qr_content)
     qr_code_url = await upload_pdf(qr_code_bytes, f"hall_ticket_{student_id}_qr.png")
@@ -32,14 +92,281 @@ async def generate_hall_ticket(db: AsyncIOMotorDatabase, student_id: str, studen
         "exams": exams,
         "pdf_url": pdf_url,
         "qr_code_url": qr_code_url,
-        "issued_at": issued_at
+        "issued_at": issued_at,
+        "content_hash": content_hash,
+        "stale": False
     }
+    await _clear_stale(db, [student_id])
     res = await db["hall_tickets"].insert_one(record)
     record["_id"] = res.inserted_id
-    return HallTicketResponse.parse_obj(_serialize_ticket(record))
+    return await _ticket_response(record)
 
 # For admin access
 def admin_get_hall_ticket(db: AsyncIOMotorDatabase, student_id: str):
     return get_hall_ticket_by_student(db, student_id)
 
+# --- Bulk generation ---
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+_running_jobs = set()
+
+def render_hall_tickets(batch: List[Tuple[str, str, List[dict], str, bool]]) -> List[Tuple[Optional[bytes], bytes]]:
+    # Runs in a worker process: PDF and QR rendering are pure CPU. PDFs already in the artifact cache are skipped.
+    return [
+        (create_hall_ticket_pdf(student_name, exams) if render_pdf else None, generate_qr_code(f"{student_id}|{issued_at}"))
+        for student_id, student_name, exams, issued_at, render_pdf in batch
+    ]
+
+def _serialize_job(doc) -> dict:
+    return {
+        "job_id": str(doc["_id"]),
+        "status": doc.get("status"),
+        "session_date": doc.get("session_date"),
+        "session_time": doc.get("session_time"),
+        "total": doc.get("total", 0),
+        "processed": doc.get("processed", 0),
+        "failed": doc.get("failed", 0),
+        "reused": doc.get("reused", 0),
+        "stale_only": doc.get("stale_only", False),
+        "errors": doc.get("errors", []),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+    }
+
+async def _exams_in_session(db: AsyncIOMotorDatabase, session_date: Optional[str], session_time: Optional[str], projection: Optional[dict] = None):
+    async for exam in db["exams"].find({}, projection):
+        date, time = str(exam.get("date")), exam.get("time")
+        if (session_date and date != session_date) or (session_time and time != session_time):
+            continue
+        yield exam
+
+async def _session_cohorts(db: AsyncIOMotorDatabase, session_date: Optional[str], session_time: Optional[str]) -> Set[tuple]:
+    # Only the (department, semester) keys; seats are decoded by the job, not the request.
+    projection = {"department": 1, "semester": 1, "date": 1, "time": 1}
+    return {(e.get("department"), e.get("semester")) async for e in _exams_in_session(db, session_date, session_time, projection)}
+
+async def _session_exams(db: AsyncIOMotorDatabase, session_date: Optional[str], session_time: Optional[str]) -> Dict[tuple, List[dict]]:
+    # Exams in scope grouped by the (department, semester) cohort that sits them, with each
+    # exam's seats from its latest seating map.
+    cohorts: Dict[tuple, List[dict]] = {}
+    async for exam in _exams_in_session(db, session_date, session_time):
+        date, time = str(exam.get("date")), exam.get("time")
+        seats = {}
+        header = await db["seating_maps"].find_one({"exam_id": str(exam["_id"])}, {"_id": 1}, sort=[("generated_at", -1)])
+        if header:
+            async for room in db["seating_assignments"].find({"seating_map_id": header["_id"]}):
+                for a in decode_room(room):
+                    seats[a["student_id"]] = f"{a['block']}-{a['room_number']}, Row {a['row']}, Seat {a['seat']}"
+        cohorts.setdefault((exam.get("department"), exam.get("semester")), []).append({
+            "exam_id": str(exam["_id"]),
+            "subject": exam.get("subject"),
+            "code": exam.get("code"),
+            "date": date,
+            "time": time,
+            "venue": exam.get("venue"),
+            "seats": seats,
+        })
+    return cohorts
+
+def _student_exams(cohort_exams: List[dict], student_id: str) -> List[dict]:
+    return [
+        {
+            "exam_id": e["exam_id"],
+            "subject": e["subject"],
+            "code": e["code"],
+            "date": e["date"],
+            "time": e["time"],
+            "venue": e["seats"].get(student_id, e["venue"]),
+        }
+        for e in cohort_exams
+    ]
+
+async def _claim_job(db: AsyncIOMotorDatabase, job_id: ObjectId) -> Optional[dict]:
+    now = datetime.utcnow()
+    return await db["hall_ticket_jobs"].find_one_and_update(
+        {
+            "_id": job_id,
+            "status": {"$in": ["pending", "running"]},
+            "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}, {"worker": WORKER_ID}],
+        },
+        {"$set": {"status": "running", "worker": WORKER_ID, "lease_until": now + timedelta(seconds=settings.HALL_TICKET_JOB_LEASE_SECONDS)}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def _process_batch(db: AsyncIOMotorDatabase, job: dict, batch: List[dict], cohorts: Dict[tuple, List[dict]], uploads: asyncio.Semaphore) -> Tuple[int, int, List[str]]:
+    # Students already ticketed by this job (e.g. before a crash) or holding a fresh ticket with
+    # identical content are skipped, so replays and reissues are cheap.
+    exams = {s["student_id"]: _student_exams(cohorts[(s.get("department"), s.get("semester"))], s["student_id"]) for s in batch}
+    hashes = {s["student_id"]: ticket_content_hash(s.get("name", ""), exams[s["student_id"]]) for s in batch}
+    done = set(await _fresh_tickets(db, hashes))
+    async for doc in db["hall_tickets"].find({"job_id": job["_id"], "student_id": {"$in": list(hashes)}}, {"student_id": 1}):
+        done.add(doc["student_id"])
+    todo = [s for s in batch if s["student_id"] not in done]
+    if not todo:
+        return 0, len(batch), []
+    pdf_urls = await _cached_pdf_urls(db, (hashes[s["student_id"]] for s in todo))
+    issued_at = datetime.utcnow().isoformat()
+    work = []
+    pending = set()
+    for s in todo:
+        # Render each missing PDF once even if several students share its content.
+        h = hashes[s["student_id"]]
+        render_pdf = h not in pdf_urls and h not in pending
+        pending.add(h)
+        work.append((s["student_id"], s.get("name", ""), exams[s["student_id"]], issued_at, render_pdf))
+    chunk = settings.HALL_TICKET_RENDER_CHUNK
+    rendered = []
+    for part in await asyncio.gather(*(run_in_process(render_hall_tickets, work[i:i + chunk]) for i in range(0, len(work), chunk))):
+        rendered.extend(part)
+
+    new_urls = {}
+    for item, (pdf_bytes, _) in zip(work, rendered):
+        if pdf_bytes is not None:
+            h = hashes[item[0]]
+            new_urls[h] = asyncio.ensure_future(_bounded_upload(uploads, pdf_bytes, f"hall_ticket_{h}.pdf"))
+
+    async def upload(item, artifacts):
+        student_id, student_name, student_exams, _, _ = item
+        h = hashes[student_id]
+        qr_code_url = await _bounded_upload(uploads, artifacts[1], f"hall_ticket_{student_id}_qr.png")
+        pdf_url = pdf_urls[h] if h in pdf_urls else await new_urls[h]
+        return {
+            "student_id": student_id,
+            "student_name": student_name,
+            "exams": student_exams,
+            "pdf_url": pdf_url,
+            "qr_code_url": qr_code_url,
+            "issued_at": issued_at,
+            "content_hash": h,
+            "stale": False,
+            "job_id": job["_id"],
+        }
+
+    results = await asyncio.gather(*(upload(item, artifacts) for item, artifacts in zip(work, rendered)), return_exceptions=True)
+    await asyncio.gather(*new_urls.values(), return_exceptions=True)
+    await _store_pdf_artifacts(db, {h: f.result() for h, f in new_urls.items() if not f.exception()})
+    records = [r for r in results if isinstance(r, dict)]
+    errors = [f"{item[0]}: {r}" for item, r in zip(work, results) if not isinstance(r, dict)]
+    if records:
+        await _clear_stale(db, [r["student_id"] for r in records])
+        await db["hall_tickets"].insert_many(records, ordered=False)
+    return len(records), len(batch) - len(todo), errors
+
+async def _bounded_upload(uploads: asyncio.Semaphore, data: bytes, filename: str) -> str:
+    async with uploads:
+        return await upload_pdf(data, filename)
+
+async def _student_filter(db: AsyncIOMotorDatabase, cohorts: Iterable[tuple], stale_only: bool) -> dict:
+    student_filter = {"$or": [{"department": d, "semester": s} for d, s in cohorts]} if cohorts else {"_id": None}
+    if stale_only:
+        stale = await db["hall_tickets"].distinct("student_id", {"stale": True})
+        student_filter = {"$and": [student_filter, {"student_id": {"$in": stale}}]}
+    return student_filter
+
+async def run_hall_ticket_job(db: AsyncIOMotorDatabase, job_id: ObjectId) -> bool:
+    # Returns False when the job could not be claimed (another worker holds its lease).
+    job = await _claim_job(db, job_id)
+    if not job:
+        return False
+    jobs = db["hall_ticket_jobs"]
+    try:
+        cohorts = await _session_exams(db, job.get("session_date"), job.get("session_time"))
+        student_filter = await _student_filter(db, cohorts, job.get("stale_only", False))
+        if job.get("last_student_id") is not None:
+            student_filter = {"$and": [student_filter, {"student_id": {"$gt": job["last_student_id"]}}]}
+        uploads = asyncio.Semaphore(settings.HALL_TICKET_UPLOAD_CONCURRENCY)
+        cursor = db["students"].find(student_filter, {"student_id": 1, "name": 1, "department": 1, "semester": 1}).sort("student_id", 1)
+        batch = []
+
+        async def checkpoint():
+            created, reused, errors = await _process_batch(db, job, batch, cohorts, uploads)
+            update = {
+                "$inc": {"processed": len(batch), "reused": reused, "failed": len(errors)},
+                "$set": {
+                    "last_student_id": batch[-1]["student_id"],
+                    "updated_at": datetime.utcnow().isoformat(),
+                    "lease_until": datetime.utcnow() + timedelta(seconds=settings.HALL_TICKET_JOB_LEASE_SECONDS),
+                },
+            }
+            if errors:
+                update["$push"] = {"errors": {"$each": errors, "$slice": settings.HALL_TICKET_MAX_REPORTED_ERRORS}}
+            res = await jobs.update_one({"_id": job["_id"], "worker": WORKER_ID}, update)
+            batch.clear()
+            return res.matched_count == 1
+
+        async for student in cursor:
+            batch.append(student)
+            if len(batch) >= settings.HALL_TICKET_BATCH_SIZE and not await checkpoint():
+                return True  # Lease lost to another worker.
+        if batch and not await checkpoint():
+            return True
+        await jobs.update_one({"_id": job["_id"]}, {"$set": {"status": "completed", "lease_until": None, "updated_at": datetime.utcnow().isoformat()}})
+    except Exception as e:
+        await jobs.update_one({"_id": job["_id"]}, {
+            "$set": {"status": "failed", "lease_until": None, "updated_at": datetime.utcnow().isoformat()},
+            "$push": {"errors": {"$each": [str(e)], "$slice": settings.HALL_TICKET_MAX_REPORTED_ERRORS}},
+        })
+    return True
+
+async def _resume_job(db: AsyncIOMotorDatabase, job_id: ObjectId):
+    # A worker that restarts inside its own lease gets a new WORKER_ID and cannot claim the job
+    # yet, so keep retrying until the lease runs out or the job finishes elsewhere.
+    while not await run_hall_ticket_job(db, job_id):
+        job = await db["hall_ticket_jobs"].find_one({"_id": job_id}, {"status": 1, "lease_until": 1})
+        if not job or job.get("status") not in ("pending", "running"):
+            return
+        lease_until = job.get("lease_until")
+        remaining = (lease_until - datetime.utcnow()).total_seconds() if lease_until else 0.0
+        await asyncio.sleep(min(remaining, settings.HALL_TICKET_JOB_LEASE_SECONDS) if remaining > 0 else settings.HALL_TICKET_JOB_RETRY_SECONDS)
+
+def _track(task: asyncio.Task):
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+
+def _start_job(db: AsyncIOMotorDatabase, job_id: ObjectId):
+    _track(asyncio.create_task(run_hall_ticket_job(db, job_id)))
+
+async def start_bulk_generation(db: AsyncIOMotorDatabase, session_date: Optional[str] = None, session_time: Optional[str] = None, stale_only: bool = False) -> HallTicketJobResponse:
+    cohorts = await _session_cohorts(db, session_date, session_time)
+    if not cohorts:
+        raise ValueError("No exams found for the requested session.")
+    total = await db["students"].count_documents(await _student_filter(db, cohorts, stale_only))
+    now = datetime.utcnow().isoformat()
+    job = {
+        "status": "pending",
+        "session_date": session_date,
+        "session_time": session_time,
+        "stale_only": stale_only,
+        "total": total,
+        "processed": 0,
+        "reused": 0,
+        "failed": 0,
+        "errors": [],
+        "last_student_id": None,
+        "lease_until": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    res = await db["hall_ticket_jobs"].insert_one(job)
+    job["_id"] = res.inserted_id
+    _start_job(db, res.inserted_id)
+    return HallTicketJobResponse.parse_obj(_serialize_job(job))
+
+async def get_bulk_job(db: AsyncIOMotorDatabase, job_id: str) -> Optional[HallTicketJobResponse]:
+    doc = await db["hall_ticket_jobs"].find_one({"_id": ObjectId(job_id)})
+    return HallTicketJobResponse.parse_obj(_serialize_job(doc)) if doc else None
+
+async def resume_bulk_jobs(db: AsyncIOMotorDatabase):
+    # Pick up jobs whose worker died, retrying each until its lease expires.
+    async for doc in db["hall_ticket_jobs"].find({"status": {"$in": ["pending", "running"]}}, {"_id": 1}):
+        _track(asyncio.create_task(_resume_job(db, doc["_id"])))
 
+async def release_bulk_jobs(db: AsyncIOMotorDatabase):
+    # Graceful shutdown: stop this worker's jobs and drop its leases so a restart resumes them at once.
+    tasks = list(_running_jobs)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await db["hall_ticket_jobs"].update_many(
+        {"worker": WORKER_ID, "status": {"$in": ["pending", "running"]}},
+        {"$set": {"lease_until": None}},
+    )
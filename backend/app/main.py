@@ -1,12 +1,28 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
+from pymongo.errors import PyMongoError
 
 from app.config.settings import settings
-from app.config.database import connect_to_mongo, close_mongo
+from app.config.database import connect_to_mongo, close_mongo, get_database, mongo_health
+from app.config.mongo_metrics import mongo_metrics
+from app.middleware.role_guard import require_roles
+from app.hall_ticket.service import resume_bulk_jobs, release_bulk_jobs
+from app.utils.process_pool import shutdown_process_pool
+from app.config.security import shutdown_password_pool
+from app.storage.service import init_storage, close_storage
+from app.middleware.auth_middleware import AuthMiddleware
 from app.auth.routes import router as auth_router
 from app.users.routes import router as users_router
+from app.exams.routes import router as exams_router
+from app.calendar.routes import router as calendar_router
+from app.clubs.routes import router as clubs_router, admin_router
+from app.mindmaps.routes import router as mindmaps_router
+from app.seating.routes import router as seating_router
+from app.hall_ticket.routes import router as hall_ticket_router
+from app.files.upload import router as files_upload_router
+from app.files.download import router as files_download_router, storage_router
 
 app = FastAPI(
     title="VCube Academic & Examination Management API",
@@ -16,11 +32,22 @@ app = FastAPI(
 # 🔥 REQUIRED: Mongo lifecycle
 @app.on_event("startup")
 async def startup():
-    await connect_to_mongo()
+    await init_storage()
+    await connect_to_mongo(resume_bulk_jobs)
 
 @app.on_event("shutdown")
 async def shutdown():
+    try:
+        await release_bulk_jobs(get_database())
+    except PyMongoError:
+        pass  # Unreachable database: the leases simply expire.
     await close_mongo()
+    shutdown_process_pool()
+    shutdown_password_pool()
+    await close_storage()
+
+# --- Auth (added before CORS so CORS wraps it and 401s still carry CORS headers) ---
+app.add_middleware(AuthMiddleware)
 
 # --- CORS ---
 from fastapi.middleware.cors import CORSMiddleware
@@ -55,6 +82,25 @@ async def root():
 async def health():
     return {"ok": True}
 
+@app.get("/api/ready")
+async def ready():
+    health = await mongo_health()
+    return JSONResponse(status_code=200 if health["ready"] else 503, content=health)
+
+@app.get("/api/metrics/mongo", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_mongo_metrics():
+    return mongo_metrics.stats()
+
 # --- Routers ---
 app.include_router(auth_router, prefix="/api/auth", tags=["Auth"])
 app.include_router(users_router, prefix="/api/users", tags=["Users"])
+app.include_router(exams_router)
+app.include_router(calendar_router)
+app.include_router(clubs_router)
+app.include_router(admin_router)
+app.include_router(mindmaps_router)
+app.include_router(seating_router)
+app.include_router(hall_ticket_router)
+app.include_router(files_upload_router)
+app.include_router(files_download_router)
+app.include_router(storage_router)
@@ -1,16 +1,59 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request, Response
+import re
+from typing import Iterable, Optional
+from starlette.requests import cookie_parser
 from starlette.responses import JSONResponse
 from starlette.status import HTTP_401_UNAUTHORIZED
-from app.config.security import decode_jwt_token
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config.settings import settings
+from app.middleware.token_cache import token_cache
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        token = request.cookies.get("access_token")
+# Exact paths, or prefixes ending in "*".
+PUBLIC_PATHS = (
+    "/",
+    "/api/health",
+    "/api/ready",
+    "/api/auth/login",
+    "/api/auth/logout",
+    "/docs",
+    "/docs/*",
+    "/redoc",
+    "/openapi.json",
+    # Local storage links carry their own signature.
+    f"{settings.LOCAL_STORAGE_URL}/*",
+)
+
+def compile_allowlist(paths: Iterable[str]) -> re.Pattern:
+    patterns = [re.escape(p[:-1]) + ".*" if p.endswith("*") else re.escape(p) for p in paths]
+    return re.compile("|".join(f"(?:{p})" for p in patterns) or "(?!)")
+
+def _cookie(scope: Scope, name: str) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == b"cookie":
+            return cookie_parser(value.decode("latin-1")).get(name)
+    return None
+
+class AuthMiddleware:
+    # Plain ASGI: no task or body wrapping, so streamed responses (file downloads, ZIP exports)
+    # pass straight through. The verified payload lands in scope["state"], which is what
+    # request.state reads from. Public paths and CORS preflights skip authentication.
+    def __init__(self, app: ASGIApp, public_paths: Iterable[str] = PUBLIC_PATHS):
+        self.app = app
+        self.public = compile_allowlist(public_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket") or self.public.fullmatch(scope["path"]) or scope.get("method") == "OPTIONS":
+            return await self.app(scope, receive, send)
+        token = _cookie(scope, "access_token")
         if not token:
-            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={"detail": "Missing access token."})
-        payload = decode_jwt_token(token)
+            return await self._reject(scope, receive, send, "Missing access token.")
+        payload = token_cache.decode(token)
         if not payload:
-            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={"detail": "Invalid or expired token."})
-        request.state.user = payload
-        return await call_next(request)
+            return await self._reject(scope, receive, send, "Invalid or expired token.")
+        payload.setdefault("user_id", payload.get("sub"))
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, detail: str):
+        if scope["type"] == "websocket":
+            return await send({"type": "websocket.close", "code": 1008, "reason": detail})
+        await JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={"detail": detail})(scope, receive, send)
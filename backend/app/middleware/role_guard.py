@@ -1,8 +1,8 @@
-from fastapi import Request, HTTPException, status, Depends
+from fastapi import Request, HTTPException, status
 from typing import Callable, List
 
 def require_roles(allowed_roles: List[str]) -> Callable:
-    async def checker(request: Request = Depends()):
+    async def checker(request: Request):
         user = getattr(request.state, "user", None)
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
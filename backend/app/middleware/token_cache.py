@@ -0,0 +1,87 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.config.security import decode_jwt_token
+from app.config.settings import settings
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+class TokenCache:
+    # LRU of verified JWT payloads keyed by a digest of the token (raw tokens are never kept).
+    # An entry is dropped once its exp passes, so a cached token never outlives its signature check.
+    # Revocation is per process: other workers keep accepting a revoked token until it expires.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._payloads: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = _digest(token)
+        payload = self._payloads.get(key)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                self._payloads.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._payloads[key]
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: dict):
+        self._payloads[_digest(token)] = payload
+        while len(self._payloads) > self.max_entries:
+            self._payloads.popitem(last=False)
+            self.evicted += 1
+
+    def is_revoked(self, token: str) -> bool:
+        key = _digest(token)
+        expires = self._revoked.get(key)
+        if expires is None:
+            return False
+        if expires <= time.time():
+            del self._revoked[key]
+            return False
+        return True
+
+    def revoke(self, token: str):
+        # Logout hook. The token stays denied until its own exp, after which it is invalid anyway.
+        key = _digest(token)
+        payload = self._payloads.pop(key, None) or decode_jwt_token(token)
+        if payload:
+            self._revoked[key] = payload.get("exp", 0)
+            now = time.time()
+            if len(self._revoked) > self.max_entries:
+                self._revoked = {k: exp for k, exp in self._revoked.items() if exp > now}
+
+    def decode(self, token: str) -> Optional[dict]:
+        # Returns a copy so request handlers cannot alter the cached payload.
+        if self._revoked and self.is_revoked(token):
+            return None
+        payload = self.get(token)
+        if payload is None:
+            payload = decode_jwt_token(token)
+            if payload is None:
+                return None
+            self.put(token, payload)
+        return dict(payload)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._payloads),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
@@ -0,0 +1,5 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    "mindmaps": [IndexModel("created_by")],
+}
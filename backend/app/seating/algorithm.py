@@ -1,8 +1,159 @@
 import random
-from typing import List
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
 from app.seating.schemas import StudentData, RoomData, SeatAssignment
 
-def allocate_seats(students: List[StudentData], rooms: List[RoomData], mix_departments: bool = True) -> List[SeatAssignment]:
+ENGINES = ("loop", "array")
+
+class SeatAllocation(Sequence):
+    # Compact result of the array engine: one index per seat, pydantic objects built on access only.
+    def __init__(self, students: List[StudentData], rooms: List[RoomData], student_idx: np.ndarray, room_idx: np.ndarray, row: np.ndarray, seat: np.ndarray, violations: Optional[int] = None):
+        self.students = students
+        self.rooms = rooms
+        self.student_idx = student_idx
+        self.room_idx = room_idx
+        self.row = row
+        self.seat = seat
+        self.violations = violations
+
+    def __len__(self) -> int:
+        return len(self.student_idx)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return SeatAssignment(**self._record(int(self.student_idx[i]), int(self.room_idx[i]), int(self.row[i]), int(self.seat[i])))
+
+    def _record(self, s: int, r: int, row: int, seat: int) -> dict:
+        student = self.students[s]
+        room = self.rooms[r]
+        return {
+            "student_id": student.student_id,
+            "student_name": student.name,
+            "roll_number": student.roll_number,
+            "department": student.department,
+            "room_id": room.room_id,
+            "block": room.block,
+            "room_number": room.room_number,
+            "row": row,
+            "seat": seat,
+        }
+
+    def to_dicts(self) -> List[dict]:
+        return [
+            self._record(s, r, row, seat)
+            for s, r, row, seat in zip(self.student_idx.tolist(), self.room_idx.tolist(), self.row.tolist(), self.seat.tolist())
+        ]
+
+def room_grid(rooms: List[RoomData]):
+    rows = np.fromiter((max(room.rows, 0) for room in rooms), dtype=np.int64, count=len(rooms))
+    benches = np.fromiter((max(room.benches_per_row, 0) for room in rooms), dtype=np.int64, count=len(rooms))
+    return rows, benches
+
+def _grid_coordinates(rows: np.ndarray, benches: np.ndarray, limit: int):
+    caps = rows * benches
+    room_idx = np.repeat(np.arange(len(rows), dtype=np.int64), caps)[:limit]
+    starts = np.concatenate(([0], np.cumsum(caps)[:-1])) if len(rows) else caps
+    offset = np.arange(len(room_idx), dtype=np.int64) - starts[room_idx]
+    per_row = benches[room_idx]
+    return room_idx, offset // per_row + 1, offset % per_row + 1
+
+def _seat_coordinates(rooms: List[RoomData], limit: int):
+    rows, benches = room_grid(rooms)
+    return _grid_coordinates(rows, benches, limit)
+
+def _label_codes(labels: List[str]):
+    labels = np.asarray(labels, dtype=object)
+    if not len(labels):
+        return [], np.empty(0, dtype=np.int64)
+    names, codes = np.unique(labels, return_inverse=True)
+    return names.tolist(), codes.astype(np.int64)
+
+def _department_codes(students: List[StudentData]):
+    names, codes = _label_codes([s.department for s in students])
+    return len(names), codes
+
+def _student_order(students: List[StudentData], mix_departments: bool) -> np.ndarray:
+    if mix_departments:
+        # Shuffle a plain index list so the permutation matches random.shuffle on the student list.
+        order = list(range(len(students)))
+        random.shuffle(order)
+        return np.asarray(order, dtype=np.int64)
+    _, codes = _department_codes(students)
+    return np.argsort(codes, kind="stable")
+
+def allocate_seats_array(students: List[StudentData], rooms: List[RoomData], mix_departments: bool = True) -> SeatAllocation:
+    order = _student_order(students, mix_departments)
+    room_idx, row, seat = _seat_coordinates(rooms, len(order))
+    return SeatAllocation(students, rooms, order[:len(room_idx)], room_idx, row, seat)
+
+def _adjacency_violations(rows: np.ndarray, benches: np.ndarray, room_idx: np.ndarray, row: np.ndarray, seat: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    # Same-group pairs sitting side by side on a row or one behind the other, counted per group.
+    if not len(codes):
+        return np.zeros(n_groups, dtype=np.int64)
+    caps = rows * benches
+    starts = np.concatenate(([0], np.cumsum(caps)[:-1]))
+    per_row = benches[room_idx]
+    cell = starts[room_idx] + (row - 1) * per_row + (seat - 1)
+    grid = np.full(int(caps.sum()), -1, dtype=np.int64)
+    grid[cell] = codes
+    right = seat < per_row
+    behind = row < rows[room_idx]
+    side = codes[right][grid[cell[right] + 1] == codes[right]]
+    back = codes[behind][grid[cell[behind] + per_row[behind]] == codes[behind]]
+    return np.bincount(side, minlength=n_groups) + np.bincount(back, minlength=n_groups)
+
+def count_adjacency_violations(rooms: List[RoomData], room_idx: np.ndarray, row: np.ndarray, seat: np.ndarray, codes: np.ndarray) -> int:
+    rows, benches = room_grid(rooms)
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    return int(_adjacency_violations(rows, benches, room_idx, row, seat, codes, n_groups).sum())
+
+def separated_indices(labels: List[str], rows: np.ndarray, benches: np.ndarray, seed: Optional[int] = None):
+    # Spread every group evenly over the seat sequence, then lay each room out as a
+    # checkerboard with its largest groups on one colour. Works on plain arrays so it can
+    # run in a worker process; returns per-seat indices and per-label violation counts.
+    # Without a seed the shuffle draws from the global RNG; with one it never touches it.
+    rng = random.Random(seed) if seed is not None else random
+    names, codes = _label_codes(labels)
+    n_groups = len(names)
+    order = list(range(len(labels)))
+    rng.shuffle(order)
+    order = np.asarray(order, dtype=np.int64)
+    room_idx, row, seat = _grid_coordinates(rows, benches, len(order))
+    n = len(room_idx)
+    if not n:
+        return order[:0], room_idx, row, seat, dict.fromkeys(names, 0)
+    group = codes[order]
+    sizes = np.bincount(group, minlength=n_groups)
+    rank = np.empty(len(order), dtype=np.int64)
+    by_group = np.argsort(group, kind="stable")
+    rank[by_group] = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    order = order[np.argsort((rank + 0.5) / sizes[group], kind="stable")][:n]
+    group = codes[order]
+    room_group = room_idx * n_groups + group
+    _, inverse, counts = np.unique(room_group, return_inverse=True, return_counts=True)
+    students_sorted = np.lexsort((group, -counts[inverse], room_idx))
+    slots = np.lexsort((np.arange(n), (row + seat) % 2, room_idx))
+    student_idx = np.empty(n, dtype=np.int64)
+    student_idx[slots] = order[students_sorted]
+    violations = _adjacency_violations(rows, benches, room_idx, row, seat, codes[student_idx], n_groups)
+    return student_idx, room_idx, row, seat, dict(zip(names, violations.tolist()))
+
+def allocate_seats_separated(students: List[StudentData], rooms: List[RoomData], labels: Optional[List[str]] = None) -> SeatAllocation:
+    rows, benches = room_grid(rooms)
+    labels = labels if labels is not None else [s.department for s in students]
+    student_idx, room_idx, row, seat, violations = separated_indices(labels, rows, benches)
+    return SeatAllocation(students, rooms, student_idx, room_idx, row, seat, violations=sum(violations.values()))
+
+def allocate_seats(students: List[StudentData], rooms: List[RoomData], mix_departments: bool = True, engine: str = "loop", separate_departments: bool = False) -> Union[List[SeatAssignment], SeatAllocation]:
+    if separate_departments:
+        return allocate_seats_separated(students, rooms)
+    if engine == "array":
+        return allocate_seats_array(students, rooms, mix_departments)
+    if engine != "loop":
+        raise ValueError(f"Unknown seating engine '{engine}'. Expected one of: {', '.join(ENGINES)}.")
     assignments = []
     student_list = students.copy()
     if mix_departments:
@@ -34,4 +185,66 @@ def allocate_seats(students: List[StudentData], rooms: List[RoomData], mix_depar
             break
     return assignments
 
+def assignment_docs(assignments: Union[List[SeatAssignment], SeatAllocation]) -> List[dict]:
+    if isinstance(assignments, SeatAllocation):
+        return assignments.to_dicts()
+    return [a.dict() for a in assignments]
+
+def room_capacities(rooms: List[RoomData]) -> List[int]:
+    return [max(room.rows, 0) * max(room.benches_per_row, 0) for room in rooms]
+
+def seat_positions(rooms: List[RoomData], start: int, stop: int) -> List[dict]:
+    # Seats start .. stop - 1 in allocation order, in the shape fill_seats hands out.
+    room_idx, row, seat = _seat_coordinates(rooms, stop)
+    return [
+        {"room_id": rooms[r].room_id, "block": rooms[r].block, "room_number": rooms[r].room_number, "row": rw, "seat": st}
+        for r, rw, st in zip(room_idx[start:].tolist(), row[start:].tolist(), seat[start:].tolist())
+    ]
 
+def rooms_spanned(capacities: List[int], cursor: int, count: int) -> range:
+    # Indices of the rooms holding seats cursor .. cursor + count - 1 in allocation order.
+    ends = np.cumsum(capacities).tolist() if capacities else []
+    first = bisect_right(ends, cursor)
+    last = bisect_right(ends, cursor + max(count, 1) - 1)
+    return range(first, min(last + 1, len(capacities)))
+
+def fill_seats(
+    students: List[StudentData],
+    free_seats: List[dict],
+    room_ids: List[str],
+    capacities: List[int],
+    rooms: Dict[str, RoomData],
+    cursor: int
+) -> Tuple[List[SeatAssignment], List[dict], int, List[str]]:
+    # Place late registrations into freed seats first, then into unused capacity after cursor.
+    ends = np.cumsum(capacities).tolist() if capacities else []
+    taken = 0
+    assignments = []
+    unplaced = []
+    for student in students:
+        if taken < len(free_seats):
+            seat = free_seats[taken]
+            taken += 1
+        elif ends and cursor < ends[-1]:
+            r = bisect_right(ends, cursor)
+            room = rooms[room_ids[r]]
+            offset = cursor - (ends[r] - capacities[r])
+            seat = {
+                "room_id": room.room_id,
+                "block": room.block,
+                "room_number": room.room_number,
+                "row": offset // room.benches_per_row + 1,
+                "seat": offset % room.benches_per_row + 1,
+            }
+            cursor += 1
+        else:
+            unplaced.append(student.student_id)
+            continue
+        assignments.append(SeatAssignment(
+            student_id=student.student_id,
+            student_name=student.name,
+            roll_number=student.roll_number,
+            department=student.department,
+            **seat
+        ))
+    return assignments, free_seats[taken:], cursor, unplaced
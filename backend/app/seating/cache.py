@@ -0,0 +1,83 @@
+import time
+from typing import Dict, Iterable, Optional
+from app.config.settings import settings
+
+SEAT_FIELDS = ("room_id", "block", "room_number", "row", "seat")
+
+class _ExamSeats:
+    __slots__ = ("seating_map_id", "seats", "complete", "expires_at")
+
+    def __init__(self, seating_map_id: str, complete: bool, expires_at: float):
+        self.seating_map_id = seating_map_id
+        self.seats: Dict[str, Optional[dict]] = {}
+        self.complete = complete
+        self.expires_at = expires_at
+
+class SeatLookupCache:
+    # Per-exam student -> seat table. Buckets warmed from a freshly generated map are complete,
+    # so a miss there is authoritative; buckets filled by read-through only cache what was asked.
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._exams: Dict[str, _ExamSeats] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _bucket(self, exam_id: str) -> Optional[_ExamSeats]:
+        bucket = self._exams.get(exam_id)
+        if bucket and bucket.expires_at < time.monotonic():
+            del self._exams[exam_id]
+            return None
+        return bucket
+
+    def get(self, exam_id: str, student_id: str):
+        # Returns (found, seating_map_id, seat); seat is None for a known "not seated".
+        bucket = self._bucket(exam_id)
+        if bucket is not None:
+            if student_id in bucket.seats:
+                self.hits += 1
+                return True, bucket.seating_map_id, bucket.seats[student_id]
+            if bucket.complete:
+                self.hits += 1
+                return True, bucket.seating_map_id, None
+        self.misses += 1
+        return False, None, None
+
+    def warm(self, exam_id: str, seating_map_id: str, assignments: Iterable[dict]):
+        bucket = _ExamSeats(seating_map_id, True, time.monotonic() + self.ttl_seconds)
+        for a in assignments:
+            bucket.seats[a["student_id"]] = {k: a[k] for k in SEAT_FIELDS}
+        self._exams[exam_id] = bucket
+
+    def put(self, exam_id: str, seating_map_id: str, student_id: str, seat: Optional[dict]):
+        bucket = self._bucket(exam_id)
+        if bucket is None or bucket.seating_map_id != seating_map_id:
+            bucket = _ExamSeats(seating_map_id, False, time.monotonic() + self.ttl_seconds)
+            self._exams[exam_id] = bucket
+        bucket.seats[student_id] = seat
+
+    def apply_delta(self, exam_id: str, seating_map_id: str, placed: Iterable[dict], removed: Iterable[str]):
+        bucket = self._bucket(exam_id)
+        if bucket is None or bucket.seating_map_id != seating_map_id:
+            return
+        for student_id in removed:
+            bucket.seats.pop(student_id, None)
+        for a in placed:
+            bucket.seats[a["student_id"]] = {k: a[k] for k in SEAT_FIELDS}
+
+    def invalidate(self, exam_id: Optional[str] = None):
+        if exam_id is None:
+            self._exams.clear()
+        else:
+            self._exams.pop(exam_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "exams": len(self._exams),
+            "seats": sum(len(bucket.seats) for bucket in self._exams.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+seat_cache = SeatLookupCache(settings.SEAT_CACHE_TTL_SECONDS)
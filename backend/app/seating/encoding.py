@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional
+import zlib
+import numpy as np
+from bson.binary import Binary
+from bson.objectid import ObjectId
+
+# Stored layout of one room of a seating map. Room fields are kept once per document,
+# departments go into a per-room dictionary, per-seat integers are packed little-endian
+# uint16 arrays and the free-text columns are length-prefixed and deflated. Only student_ids
+# stays a BSON array so it can be indexed. Format 1 documents joined text on SEPARATOR, which
+# broke on names containing it; they are still decoded.
+FORMAT = 2
+SEPARATOR = "\x1f"
+
+def _pack(values: List[int]) -> Binary:
+    return Binary(np.asarray(values, dtype="<u2").tobytes())
+
+def _unpack(data: Optional[bytes]) -> List[int]:
+    return np.frombuffer(bytes(data or b""), dtype="<u2").tolist()
+
+def _join(values: List[str]) -> Binary:
+    # uint32 byte lengths of every value, then the values' UTF-8 bytes back to back.
+    encoded = [v.encode("utf-8") for v in values]
+    lengths = np.fromiter((len(e) for e in encoded), dtype="<u4", count=len(encoded)).tobytes()
+    return Binary(zlib.compress(lengths + b"".join(encoded)))
+
+def _split(value: bytes, count: int, format: int = FORMAT) -> List[str]:
+    if not count:
+        return []
+    data = zlib.decompress(value)
+    if format < 2:
+        return data.decode("utf-8").split(SEPARATOR)
+    ends = np.cumsum(np.frombuffer(data, dtype="<u4", count=count), dtype=np.int64) + 4 * count
+    starts = np.concatenate(([4 * count], ends[:-1]))
+    if len(data) != ends[-1]:
+        raise ValueError("Corrupt seating text column.")
+    return [data[a:b].decode("utf-8") for a, b in zip(starts.tolist(), ends.tolist())]
+
+def encode_room(seating_map_id: ObjectId, room_index: int, room: dict, assignments: List[dict]) -> dict:
+    departments: Dict[str, int] = {}
+    codes = [departments.setdefault(a["department"], len(departments)) for a in assignments]
+    return {
+        "seating_map_id": seating_map_id,
+        "room_id": room["room_id"],
+        "room_index": room_index,
+        "block": room["block"],
+        "room_number": room["room_number"],
+        "format": FORMAT,
+        "count": len(assignments),
+        "departments": list(departments),
+        "student_ids": [a["student_id"] for a in assignments],
+        "student_names": _join([a["student_name"] for a in assignments]),
+        "roll_numbers": _join([a["roll_number"] for a in assignments]),
+        "department_codes": _pack(codes),
+        "rows": _pack([a["row"] for a in assignments]),
+        "seats": _pack([a["seat"] for a in assignments]),
+    }
+
+def decode_room(doc: dict) -> List[dict]:
+    if "assignments" in doc:
+        return doc["assignments"]
+    count = doc.get("count", 0)
+    format = doc.get("format", 1)
+    departments = doc.get("departments", [])
+    room_id, block, room_number = doc["room_id"], doc["block"], doc["room_number"]
+    return [
+        {
+            "student_id": student_id,
+            "student_name": name,
+            "roll_number": roll,
+            "department": departments[code],
+            "room_id": room_id,
+            "block": block,
+            "room_number": room_number,
+            "row": row,
+            "seat": seat,
+        }
+        for student_id, name, roll, code, row, seat in zip(
+            doc["student_ids"],
+            _split(doc["student_names"], count, format),
+            _split(doc["roll_numbers"], count, format),
+            _unpack(doc["department_codes"]),
+            _unpack(doc["rows"]),
+            _unpack(doc["seats"]),
+        )
+    ]
@@ -0,0 +1,93 @@
+import asyncio
+import csv
+import io
+import zipfile
+from collections import deque
+from itertools import groupby
+from typing import AsyncIterator, Optional
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config.settings import settings
+from app.seating.encoding import decode_room
+from app.utils.pdf_generator import create_room_sheet_pdf
+from app.utils.process_pool import run_in_process
+
+CSV_COLUMNS = ["block", "room_number", "room_id", "row", "seat", "roll_number", "student_id", "student_name", "department"]
+
+async def find_seating_map_header(db: AsyncIOMotorDatabase, seating_map_id: Optional[str] = None) -> Optional[dict]:
+    projection = {"exam_id": 1, "exam_name": 1, "generated_at": 1, "total_assignments": 1}
+    if seating_map_id:
+        return await db["seating_maps"].find_one({"_id": ObjectId(seating_map_id)}, projection)
+    return await db["seating_maps"].find_one(sort=[("generated_at", -1)], projection=projection)
+
+async def iter_rooms(db: AsyncIOMotorDatabase, header: dict) -> AsyncIterator[dict]:
+    # One room at a time, in allocation order, whichever storage layout the map uses.
+    if "total_assignments" in header:
+        cursor = db["seating_assignments"].find({"seating_map_id": header["_id"]}, {"_id": 0}).sort("room_index", 1)
+        async for room in cursor:
+            seats = sorted(decode_room(room), key=lambda a: (a["row"], a["seat"]))
+            yield {"room_id": room["room_id"], "block": room["block"], "room_number": room["room_number"], "assignments": seats}
+        return
+    doc = await db["seating_maps"].find_one({"_id": header["_id"]}, {"assignments": 1})
+    for room_id, seats in groupby(doc.get("assignments", []), key=lambda a: a["room_id"]):
+        seats = sorted(seats, key=lambda a: (a["row"], a["seat"]))
+        yield {"room_id": room_id, "block": seats[0]["block"], "room_number": seats[0]["room_number"], "assignments": seats}
+
+class _ZipStream(io.RawIOBase):
+    # Write-only sink for zipfile; the bytes written so far are drained after every member.
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _sheet_name(room: dict) -> str:
+    name = "_".join(str(room.get(k) or "") for k in ("block", "room_number", "room_id"))
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name) + ".pdf"
+
+async def stream_room_sheets_zip(db: AsyncIOMotorDatabase, header: dict) -> AsyncIterator[bytes]:
+    # Rooms are rendered in the process pool with at most EXPORT_MAX_IN_FLIGHT sheets pending,
+    # and each finished PDF is written to the archive and flushed to the client straight away.
+    sink = _ZipStream()
+    in_flight = deque()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+
+    async def write_oldest():
+        name, task = in_flight.popleft()
+        archive.writestr(name, await task)
+        return sink.drain()
+
+    try:
+        async for room in iter_rooms(db, header):
+            room_meta = {k: room.get(k) for k in ("room_id", "block", "room_number")}
+            task = asyncio.ensure_future(run_in_process(create_room_sheet_pdf, header.get("exam_name"), room_meta, room["assignments"]))
+            in_flight.append((_sheet_name(room), task))
+            if len(in_flight) >= settings.EXPORT_MAX_IN_FLIGHT:
+                yield await write_oldest()
+        while in_flight:
+            yield await write_oldest()
+        archive.close()
+        yield sink.drain()
+    finally:
+        # Client went away mid-download: stop rendering sheets nobody will receive.
+        for _, task in in_flight:
+            task.cancel()
+
+async def stream_seating_csv(db: AsyncIOMotorDatabase, header: dict) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    async for room in iter_rooms(db, header):
+        writer.writerows(room["assignments"])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,12 @@
+from pymongo import IndexModel
+
+INDEXES = {
+    "students": [IndexModel("student_id", unique=True)],
+    "rooms": [IndexModel("room_id", unique=True)],
+    "seating_maps": [IndexModel([("exam_id", 1), ("generated_at", -1)]), IndexModel([("generated_at", -1)])],
+    "seating_assignments": [
+        IndexModel([("seating_map_id", 1), ("room_id", 1)], unique=True),
+        IndexModel([("seating_map_id", 1), ("room_index", 1)]),
+        IndexModel([("seating_map_id", 1), ("student_ids", 1)]),
+    ],
+}
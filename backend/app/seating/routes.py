@@ -1,56 +1,134 @@
+from typing import Union
 from fastapi import APIRouter, Depends, Request, UploadFile, File, HTTPException, status, Query
-from app.seating.schemas import UploadResponse, SeatingMapResponse
+from app.seating.schemas import UploadResponse, SeatingMapResponse, RosterDelta, SeatingMapUpdateResponse, SeatLookupResponse, BatchSeatingResponse
 from app.seating.service import (
-    parse_students_csv, parse_rooms_csv, store_students, store_rooms,
-    generate_seating_map, get_seating_map
+    ingest_students_csv, ingest_rooms_csv,
+    generate_seating_map, generate_batch_seating_maps, get_seating_map, update_seating_map, lookup_seat,
+    SeatingMapConflict
 )
+from fastapi.responses import StreamingResponse
+from app.seating.export import find_seating_map_header, stream_room_sheets_zip, stream_seating_csv
 from app.config.database import get_database
 from app.middleware.role_guard import require_roles
+from app.seating.cache import seat_cache
 
 router = APIRouter(prefix="/api/seating", tags=["Seating"])
 
 @router.post("/upload-students", response_model=UploadResponse, dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
 async def upload_students_csv(
     file: UploadFile = File(...),
+    batch_size: int = Query(None, ge=1),
+    sync: bool = Query(False),
     db=Depends(get_database)
 ):
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a CSV.")
-    content = await file.read()
-    students = await parse_students_csv(content)
-    count = await store_students(db, students)
-    return UploadResponse(message="Students uploaded successfully.", records_processed=count)
+    try:
+        return await ingest_students_csv(db, file, batch_size, sync)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.post("/upload-rooms", response_model=UploadResponse, dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
 async def upload_rooms_csv(
     file: UploadFile = File(...),
+    batch_size: int = Query(None, ge=1),
+    sync: bool = Query(False),
     db=Depends(get_database)
 ):
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a CSV.")
-    content = await file.read()
-    rooms = await parse_rooms_csv(content)
-    count = await store_rooms(db, rooms)
-    return UploadResponse(message="Rooms uploaded successfully.", records_processed=count)
+    try:
+        return await ingest_rooms_csv(db, file, batch_size, sync)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-@router.post("/generate", response_model=SeatingMapResponse, dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
+@router.post("/generate", response_model=Union[SeatingMapResponse, BatchSeatingResponse], dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
 async def generate_seating(
     exam_id: str = Query(None),
     exam_name: str = Query(None),
     mix_departments: bool = Query(True),
+    engine: str = Query("array"),
+    separate_departments: bool = Query(False),
+    batch: bool = Query(False),
+    session_date: str = Query(None),
+    session_time: str = Query(None),
     db=Depends(get_database)
 ):
-    result = await generate_seating_map(db, exam_id, exam_name, mix_departments)
+    try:
+        if batch:
+            return await generate_batch_seating_maps(db, session_date, session_time)
+        result = await generate_seating_map(db, exam_id, exam_name, mix_departments, engine, separate_departments)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return result
+
+@router.post("/incremental", response_model=SeatingMapUpdateResponse, dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
+async def update_seating(
+    delta: RosterDelta,
+    seating_map_id: str = Query(...),
+    db=Depends(get_database)
+):
+    try:
+        result = await update_seating_map(db, seating_map_id, delta)
+    except SeatingMapConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seating map not found.")
     return result
 
 @router.get("/view", response_model=SeatingMapResponse, dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
 async def view_seating_map(
     seating_map_id: str = Query(None),
+    room_id: str = Query(None),
+    block: str = Query(None),
+    department: str = Query(None),
+    cursor: str = Query(None, pattern=r"^\d+$"),
+    limit: int = Query(50, ge=1, le=500),
     db=Depends(get_database)
 ):
-    result = await get_seating_map(db, seating_map_id)
+    result = await get_seating_map(db, seating_map_id, room_id, block, department, cursor, limit)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seating map not found.")
     return result
 
+@router.get("/my-seat", response_model=SeatLookupResponse, dependencies=[Depends(require_roles(["STUDENT"]))])
+async def get_my_seat(
+    request: Request,
+    exam_id: str = Query(...),
+    db=Depends(get_database)
+):
+    user = getattr(request.state, "user", None)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
+    seat = await lookup_seat(db, exam_id, user["user_id"])
+    if not seat:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seat not found.")
+    return seat
+
+@router.get("/cache/stats", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_seat_cache_stats():
+    return seat_cache.stats()
 
+@router.get("/export", dependencies=[Depends(require_roles(["SEATING_MANAGER", "ADMIN"]))])
+async def export_seating_sheets(
+    seating_map_id: str = Query(None),
+    format: str = Query("pdf", pattern="^(pdf|csv)$"),
+    db=Depends(get_database)
+):
+    header = await find_seating_map_header(db, seating_map_id)
+    if not header:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seating map not found.")
+    filename = f"seating_{header['_id']}"
+    if format == "csv":
+        return StreamingResponse(
+            stream_seating_csv(db, header),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+    return StreamingResponse(
+        stream_room_sheets_zip(db, header),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}_sheets.zip"'}
+    )
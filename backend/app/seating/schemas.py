@@ -27,15 +27,61 @@ class SeatAssignment(BaseModel):
     row: int
     seat: int
 
+class SeatLookupResponse(BaseModel):
+    exam_id: str
+    seating_map_id: str
+    student_id: str
+    room_id: str
+    block: str
+    room_number: str
+    row: int
+    seat: int
+
 class SeatingMapResponse(BaseModel):
     seating_map_id: str = Field(..., alias="_id")
     exam_id: Optional[str] = None
     exam_name: Optional[str] = None
     assignments: List[SeatAssignment]
     generated_at: str
+    adjacency_violations: Optional[int] = None
+    total_assignments: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class RosterDelta(BaseModel):
+    added: List[StudentData] = []
+    removed: List[str] = []
+
+class SeatingMapUpdateResponse(BaseModel):
+    seating_map_id: str
+    placed: List[SeatAssignment]
+    removed: int
+    unplaced: List[str]
+    free_seats: int
+
+class RowError(BaseModel):
+    row: int
+    error: str
+
+class SeatingMapSummary(BaseModel):
+    seating_map_id: str
+    exam_id: Optional[str] = None
+    exam_name: Optional[str] = None
+    session: Optional[str] = None
+    total_assignments: int
+    unplaced: int = 0
+    adjacency_violations: Optional[int] = None
+
+class BatchSeatingResponse(BaseModel):
+    seating_maps: List[SeatingMapSummary]
 
 class UploadResponse(BaseModel):
     message: str
     records_processed: int
+    records_failed: int = 0
+    errors: List[RowError] = []
+    inserted: Optional[int] = None
+    updated: Optional[int] = None
+    deleted: Optional[int] = None
+    unchanged: Optional[int] = None
 
 
@@ -1,10 +1,26 @@
+import codecs
 import csv
+import hashlib
 import io
+import json
+import asyncio
+import random
+from collections import deque
+from itertools import groupby
+from fastapi import UploadFile
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List, Optional
-from datetime import datetime
-from app.seating.schemas import StudentData, RoomData, SeatAssignment, SeatingMapResponse
-from app.seating.algorithm import allocate_seats
+from pydantic import ValidationError
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from typing import AsyncIterator, Callable, List, Optional
+from datetime import datetime, timedelta
+from app.config.settings import settings
+from app.config.indexes import index_registry
+from app.seating.schemas import StudentData, RoomData, SeatAssignment, SeatingMapResponse, UploadResponse, RowError, RosterDelta, SeatingMapUpdateResponse, SeatLookupResponse, SeatingMapSummary, BatchSeatingResponse
+from app.seating.cache import seat_cache, SEAT_FIELDS
+from app.seating.encoding import encode_room, decode_room
+from app.seating.algorithm import allocate_seats, assignment_docs, room_capacities, rooms_spanned, fill_seats, separated_indices, seat_positions, SeatAllocation, room_grid
+from app.utils.process_pool import run_in_process
 from bson.objectid import ObjectId
 
 async def parse_students_csv(file_content: bytes) -> List[StudentData]:
@@ -38,53 +54,574 @@ async def parse_rooms_csv(file_content: bytes) -> List[RoomData]:
         ))
     return rooms
 
+def _staging(db: AsyncIOMotorDatabase, collection: str):
+    return db[f"{collection}_staging_{ObjectId()}"]
+
+async def _swap_in(db: AsyncIOMotorDatabase, staging, collection: str):
+    # Readers see either the old roster or the complete new one; rename replaces the target's
+    # indexes too, so the registry's are built on the staging copy first.
+    indexes = index_registry().get(collection)
+    if indexes:
+        await staging.create_indexes(indexes)
+    await staging.rename(collection, dropTarget=True)
+
+async def _replace_collection(db: AsyncIOMotorDatabase, collection: str, docs: List[dict]):
+    if not docs:
+        await db[collection].delete_many({})
+        return
+    staging = _staging(db, collection)
+    try:
+        await staging.insert_many(docs)
+        await _swap_in(db, staging, collection)
+    except BaseException:
+        await staging.drop()
+        raise
+
 async def store_students(db: AsyncIOMotorDatabase, students: List[StudentData]) -> int:
-    await db["students"].delete_many({})
-    docs = [s.dict() for s in students]
-    if docs:
-        await db["students"].insert_many(docs)
+    await _replace_collection(db, "students", [s.dict() for s in students])
     return len(students)
 
 async def store_rooms(db: AsyncIOMotorDatabase, rooms: List[RoomData]) -> int:
-    await db["rooms"].delete_many({})
-    docs = [r.dict() for r in rooms]
-    if docs:
-        await db["rooms"].insert_many(docs)
+    await _replace_collection(db, "rooms", [r.dict() for r in rooms])
     return len(rooms)
 
+def _student_from_row(row: dict) -> StudentData:
+    student = StudentData(
+        student_id=(row.get("student_id") or "").strip(),
+        name=row.get("name") or "",
+        department=row.get("department") or "",
+        semester=row.get("semester") or "",
+        roll_number=row.get("roll_number") or ""
+    )
+    if not student.student_id:
+        raise ValueError("student_id is required.")
+    return student
+
+def _room_from_row(row: dict) -> RoomData:
+    room_id = (row.get("room_id") or "").strip()
+    if not room_id:
+        raise ValueError("room_id is required.")
+    try:
+        rows = int(row.get("rows") or 0)
+        benches = int(row.get("benches_per_row") or 0)
+    except ValueError:
+        raise ValueError("rows and benches_per_row must be integers.")
+    return RoomData(
+        room_id=room_id,
+        block=row.get("block") or "",
+        room_number=row.get("room_number") or "",
+        rows=rows,
+        benches_per_row=benches,
+        capacity=rows * benches
+    )
+
+class _NeedMore(Exception):
+    pass
+
+class _LineFeed:
+    # Line source for a single csv.reader over the whole upload. When the reader wants a line
+    # that has not been read yet, it raises _NeedMore; rewind() puts back the lines of the
+    # unfinished record, and the reader parses that record again from its first line.
+    def __init__(self):
+        self.lines = deque()
+        self.record = []
+        self.eof = False
+        self.truncated = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            if not self.eof:
+                raise _NeedMore
+            # Input ended while the reader still wanted lines: an open quoted field.
+            self.truncated = bool(self.record)
+            raise StopIteration
+        line = self.lines.popleft()
+        self.record.append(line)
+        return line
+
+    def rewind(self):
+        self.lines.extendleft(reversed(self.record))
+        self.record = []
+
+async def _iter_csv_rows(file: UploadFile, chunk_size: int, required: Optional[str] = None) -> AsyncIterator[tuple]:
+    # Decode the upload incrementally and yield (line_number, row dict) one record at a time.
+    # Raises ValueError before the first row if the header lacks the `required` column.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    tail = ""
+    line_number = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        try:
+            text = tail + decoder.decode(chunk, final=not chunk)
+        except UnicodeDecodeError:
+            raise ValueError("Invalid file encoding. Expected UTF-8.")
+        lines = io.StringIO(text, newline="").readlines()
+        tail = lines.pop() if chunk and lines and not lines[-1].endswith("\n") else ""
+        feed.lines.extend(lines)
+        feed.eof = not chunk
+        while True:
+            feed.record = []
+            try:
+                fields = next(reader)
+            except _NeedMore:
+                feed.rewind()
+                break
+            except StopIteration:
+                break
+            except csv.Error as e:
+                raise ValueError(f"Malformed CSV on line {line_number + 1}: {e}.")
+            record_start = line_number + 1
+            line_number += len(feed.record)
+            if feed.truncated:
+                raise ValueError(f"Unterminated quoted field starting on line {record_start}.")
+            if not fields:
+                continue
+            if header is None:
+                header = [f.strip() for f in fields]
+                if required and required not in header:
+                    raise ValueError(f"Missing required column '{required}'.")
+                continue
+            yield record_start, dict(zip(header, fields))
+        if not chunk:
+            break
+    if header is None and required:
+        raise ValueError("The CSV file is empty.")
+
+ROSTER_KEYS = {"students": "student_id", "rooms": "room_id"}
+
+def _row_hash(doc: dict) -> str:
+    return hashlib.blake2b(json.dumps(doc, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+async def ingest_csv(
+    db: AsyncIOMotorDatabase,
+    file: UploadFile,
+    collection: str,
+    build: Callable[[dict], object],
+    batch_size: Optional[int] = None,
+    sync: bool = False
+) -> UploadResponse:
+    # Replace mode loads the rows into a staging collection and swaps it in once the whole file
+    # has been read, so a bad upload leaves the current roster untouched. Sync mode diffs row
+    # hashes against what is stored and only writes the rows that changed.
+    batch_size = batch_size or settings.CSV_INGEST_BATCH_SIZE
+    key = ROSTER_KEYS[collection]
+    coll = db[collection]
+    existing = {}
+    if sync:
+        try:
+            await coll.create_index(key, unique=True)
+        except DuplicateKeyError:
+            raise ValueError(f"Stored {collection} contain duplicate {key} values; re-upload without sync first.")
+        async for doc in coll.find({}, {key: 1, "row_hash": 1, "_id": 0}):
+            existing[doc.get(key)] = doc.get("row_hash")
+    else:
+        coll = _staging(db, collection)
+    try:
+        return await _ingest_rows(db, file, collection, coll, key, build, batch_size, sync, existing)
+    except BaseException:
+        if not sync:
+            await coll.drop()
+        raise
+
+async def _ingest_rows(
+    db: AsyncIOMotorDatabase,
+    file: UploadFile,
+    collection: str,
+    coll,
+    key: str,
+    build: Callable[[dict], object],
+    batch_size: int,
+    sync: bool,
+    existing: dict
+) -> UploadResponse:
+    seen = set()
+    batch = []
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    processed = 0
+    failed = 0
+    errors = []
+
+    async def flush():
+        if not batch:
+            return
+        if sync:
+            await coll.bulk_write(batch, ordered=False)
+        else:
+            await coll.insert_many(batch, ordered=False)
+        batch.clear()
+
+    async for line, row in _iter_csv_rows(file, settings.CSV_INGEST_CHUNK_SIZE, key):
+        try:
+            doc = build(row).dict()
+            if doc[key] in seen:
+                raise ValueError(f"Duplicate {key} '{doc[key]}'.")
+        except (ValueError, ValidationError) as e:
+            failed += 1
+            # A row that failed validation is not a removal from the roster.
+            existing.pop((row.get(key) or "").strip(), None)
+            if len(errors) < settings.CSV_INGEST_MAX_REPORTED_ERRORS:
+                errors.append(RowError(row=line, error=str(e)))
+            continue
+        seen.add(doc[key])
+        processed += 1
+        doc["row_hash"] = _row_hash(doc)
+        if not sync:
+            counts["inserted"] += 1
+            batch.append(doc)
+        else:
+            if doc[key] not in existing:
+                counts["inserted"] += 1
+            elif existing.pop(doc[key]) == doc["row_hash"]:
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+            batch.append(ReplaceOne({key: doc[key]}, doc, upsert=True))
+        if len(batch) >= batch_size:
+            await flush()
+    # Deletions are only trusted from a file that parsed cleanly: with failed rows the upload
+    # may be truncated or mis-keyed, and missing keys would wipe rows that are still wanted.
+    skipped_deletes = len(existing) if sync and failed else 0
+    if sync and existing and not failed:
+        counts["deleted"] = len(existing)
+        batch.append(DeleteMany({key: {"$in": list(existing)}}))
+    await flush()
+    message = f"{collection.capitalize()} {'synced' if sync else 'uploaded'} successfully."
+    if skipped_deletes:
+        message = f"{collection.capitalize()} synced; {skipped_deletes} deletions skipped because {failed} rows failed."
+    if not sync:
+        if processed:
+            await _swap_in(db, coll, collection)
+        else:
+            await coll.drop()
+            counts["inserted"] = 0
+            message = f"No valid {collection} rows; existing {collection} left unchanged."
+    return UploadResponse(
+        message=message,
+        records_processed=processed,
+        records_failed=failed,
+        errors=errors,
+        **counts
+    )
+
+async def ingest_students_csv(db: AsyncIOMotorDatabase, file: UploadFile, batch_size: Optional[int] = None, sync: bool = False) -> UploadResponse:
+    return await ingest_csv(db, file, "students", _student_from_row, batch_size, sync)
+
+async def ingest_rooms_csv(db: AsyncIOMotorDatabase, file: UploadFile, batch_size: Optional[int] = None, sync: bool = False) -> UploadResponse:
+    return await ingest_csv(db, file, "rooms", _room_from_row, batch_size, sync)
+
+def _room_documents(seating_map_id: ObjectId, assignments: List[dict], room_ids: List[str]) -> List[dict]:
+    # One encoded document per room, in allocation order; assignments arrive grouped by room already.
+    room_index = {room_id: i for i, room_id in enumerate(room_ids)}
+    docs = []
+    for room_id, seats in groupby(assignments, key=lambda a: a["room_id"]):
+        seats = list(seats)
+        docs.append(encode_room(seating_map_id, room_index[room_id], seats[0], seats))
+    return docs
+
 async def generate_seating_map(
     db: AsyncIOMotorDatabase,
     exam_id: Optional[str] = None,
     exam_name: Optional[str] = None,
-    mix_departments: bool = True
+    mix_departments: bool = True,
+    engine: str = "loop",
+    separate_departments: bool = False
 ) -> SeatingMapResponse:
-    students_cursor = db["students"].find({})
-    rooms_cursor = db["rooms"].find({})
-    students_list = []
-    rooms_list = []
-    async for doc in students_cursor:
-        students_list.append(StudentData.parse_obj(doc))
-    async for doc in rooms_cursor:
-        rooms_list.append(RoomData.parse_obj(doc))
-    assignments = allocate_seats(students_list, rooms_list, mix_departments)
+    students_list, rooms_list = await _load_roster(db)
+    assignments = allocate_seats(students_list, rooms_list, mix_departments, engine, separate_departments)
+    docs = assignment_docs(assignments)
     seating_map = {
         "exam_id": exam_id,
         "exam_name": exam_name,
-        "assignments": [a.dict() for a in assignments],
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": datetime.utcnow().isoformat(),
+        "adjacency_violations": getattr(assignments, "violations", None),
+        "room_ids": [r.room_id for r in rooms_list],
+        "room_capacities": room_capacities(rooms_list),
+        "seat_cursor": len(docs),
+        "free_seats": [],
+        "total_assignments": len(docs)
     }
     res = await db["seating_maps"].insert_one(seating_map)
+    room_docs = _room_documents(res.inserted_id, docs, seating_map["room_ids"])
+    if room_docs:
+        await db["seating_assignments"].insert_many(room_docs, ordered=False)
+    if exam_id:
+        seat_cache.warm(exam_id, str(res.inserted_id), docs)
     seating_map["_id"] = str(res.inserted_id)
+    seating_map["assignments"] = docs
     return SeatingMapResponse.parse_obj(seating_map)
 
-async def get_seating_map(db: AsyncIOMotorDatabase, seating_map_id: Optional[str] = None) -> Optional[SeatingMapResponse]:
+async def _load_roster(db: AsyncIOMotorDatabase):
+    students_list = []
+    rooms_list = []
+    async for doc in db["students"].find({}):
+        students_list.append(StudentData.parse_obj(doc))
+    async for doc in db["rooms"].find({}):
+        rooms_list.append(RoomData.parse_obj(doc))
+    return students_list, rooms_list
+
+async def generate_batch_seating_maps(
+    db: AsyncIOMotorDatabase,
+    session_date: Optional[str] = None,
+    session_time: Optional[str] = None
+) -> BatchSeatingResponse:
+    # Seat every exam sitting in the same slot together, interleaving exams across adjacent
+    # benches; every slot is allocated in a worker process, independent slots in parallel.
+    # A cohort with two exams in one slot cannot be seated for both, so it is rejected.
+    sessions = {}
+    async for exam in db["exams"].find({}):
+        date, time = str(exam.get("date")), exam.get("time")
+        if (session_date and date != session_date) or (session_time and time != session_time):
+            continue
+        sessions.setdefault((date, time), []).append(exam)
+    if not sessions:
+        raise ValueError("No exams found for the requested session.")
+    cohorts, conflicts = {}, []
+    for (date, time), exams in sessions.items():
+        exam_by_cohort = cohorts[(date, time)] = {}
+        for exam in exams:
+            cohort = (exam.get("department"), exam.get("semester"))
+            if cohort in exam_by_cohort:
+                conflicts.append(
+                    f"{cohort[0]} semester {cohort[1]} on {date} {time}: "
+                    f"{exam_by_cohort[cohort].get('code')} and {exam.get('code')}"
+                )
+                continue
+            exam_by_cohort[cohort] = exam
+    if conflicts:
+        raise ValueError("Cohorts have more than one exam in the same session: " + "; ".join(conflicts))
+    students_list, rooms_list = await _load_roster(db)
+    rows, benches = room_grid(rooms_list)
+    plans = []
+    for (date, time), exams in sessions.items():
+        exam_by_cohort = cohorts[(date, time)]
+        seated = [s for s in students_list if (s.department, s.semester) in exam_by_cohort]
+        labels = [str(exam_by_cohort[(s.department, s.semester)]["_id"]) for s in seated]
+        plans.append((f"{date} {time}", exams, seated, labels))
+    results = await asyncio.gather(*(
+        run_in_process(separated_indices, labels, rows, benches, random.getrandbits(32))
+        for _, _, _, labels in plans
+    ))
+    summaries = []
+    generated_at = datetime.utcnow().isoformat()
+    room_ids = [r.room_id for r in rooms_list]
+    capacities = room_capacities(rooms_list)
+    for (session, exams, seated, labels), (student_idx, room_idx, row, seat, violations) in zip(plans, results):
+        allocation = SeatAllocation(seated, rooms_list, student_idx, room_idx, row, seat)
+        # Exams in one slot share the rooms, so the unused seats are dealt out between their maps
+        # as free seats; a lone exam keeps the plain cursor like generate_seating_map.
+        if len(exams) == 1:
+            spare, seat_cursor = [[]], len(student_idx)
+        else:
+            tail = seat_positions(rooms_list, len(student_idx), sum(capacities))
+            spare, seat_cursor = [tail[i::len(exams)] for i in range(len(exams))], sum(capacities)
+        exam_of = [labels[i] for i in student_idx.tolist()]
+        by_exam = {}
+        for exam_label, doc in zip(exam_of, allocation.to_dicts()):
+            by_exam.setdefault(exam_label, []).append(doc)
+        eligible = {}
+        for exam_label in labels:
+            eligible[exam_label] = eligible.get(exam_label, 0) + 1
+        for exam, free_seats in zip(exams, spare):
+            exam_id = str(exam["_id"])
+            docs = by_exam.get(exam_id, [])
+            exam_name = f"{exam.get('subject')} ({exam.get('code')})"
+            header = {
+                "exam_id": exam_id,
+                "exam_name": exam_name,
+                "session": session,
+                "generated_at": generated_at,
+                "adjacency_violations": violations.get(exam_id, 0),
+                "room_ids": room_ids,
+                "room_capacities": capacities,
+                "seat_cursor": seat_cursor,
+                "free_seats": free_seats,
+                "total_assignments": len(docs)
+            }
+            res = await db["seating_maps"].insert_one(header)
+            room_docs = _room_documents(res.inserted_id, docs, room_ids)
+            if room_docs:
+                await db["seating_assignments"].insert_many(room_docs, ordered=False)
+            seat_cache.warm(exam_id, str(res.inserted_id), docs)
+            summaries.append(SeatingMapSummary(
+                seating_map_id=str(res.inserted_id),
+                exam_id=exam_id,
+                exam_name=exam_name,
+                session=session,
+                total_assignments=len(docs),
+                unplaced=eligible.get(exam_id, 0) - len(docs),
+                adjacency_violations=header["adjacency_violations"]
+            ))
+    return BatchSeatingResponse(seating_maps=summaries)
+
+async def get_seating_map(
+    db: AsyncIOMotorDatabase,
+    seating_map_id: Optional[str] = None,
+    room_id: Optional[str] = None,
+    block: Optional[str] = None,
+    department: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Optional[SeatingMapResponse]:
+    header_projection = {"free_seats": 0, "room_ids": 0, "room_capacities": 0}
     if seating_map_id:
-        doc = await db["seating_maps"].find_one({"_id": ObjectId(seating_map_id)})
+        doc = await db["seating_maps"].find_one({"_id": ObjectId(seating_map_id)}, header_projection)
     else:
-        doc = await db["seating_maps"].find_one(sort=[("generated_at", -1)])
+        doc = await db["seating_maps"].find_one(sort=[("generated_at", -1)], projection=header_projection)
     if not doc:
         return None
+    if "assignments" in doc:
+        # Maps stored before per-room sharding keep their assignments embedded.
+        doc["assignments"] = [
+            a for a in doc["assignments"]
+            if (not room_id or a["room_id"] == room_id)
+            and (not block or a["block"] == block)
+            and (not department or a["department"] == department)
+        ]
+        doc["_id"] = str(doc["_id"])
+        return SeatingMapResponse.parse_obj(doc)
+    match = {"seating_map_id": doc["_id"]}
+    if room_id:
+        match["room_id"] = room_id
+    if block:
+        match["block"] = block
+    if department:
+        match["departments"] = department
+    if cursor:
+        match["room_index"] = {"$gt": int(cursor)}
+    rooms = db["seating_assignments"].find(match).sort("room_index", 1)
+    if limit:
+        rooms = rooms.limit(limit)
+    assignments = []
+    last_index = None
+    rooms_returned = 0
+    async for room in rooms:
+        seats = decode_room(room)
+        if department:
+            seats = [a for a in seats if a["department"] == department]
+        assignments.extend(seats)
+        last_index = room["room_index"]
+        rooms_returned += 1
     doc["_id"] = str(doc["_id"])
+    doc["assignments"] = assignments
+    doc["next_cursor"] = str(last_index) if limit and rooms_returned == limit else None
     return SeatingMapResponse.parse_obj(doc)
 
+class SeatingMapConflict(Exception):
+    pass
 
+async def update_seating_map(db: AsyncIOMotorDatabase, seating_map_id: str, delta: RosterDelta) -> Optional[SeatingMapUpdateResponse]:
+    # Apply late registrations and withdrawals without touching anyone else's seat. A delta first
+    # claims the map by bumping its version (compare-and-set on the version it read) and holds it
+    # for SEATING_UPDATE_LEASE_SECONDS, so concurrent deltas retry instead of handing out the same seats.
+    map_id = ObjectId(seating_map_id)
+    maps = db["seating_maps"]
+    for attempt in range(settings.SEATING_UPDATE_RETRIES):
+        header = await maps.find_one({"_id": map_id}, {"exam_id": 1, "room_ids": 1, "room_capacities": 1, "seat_cursor": 1, "free_seats": 1, "total_assignments": 1, "version": 1, "updating_until": 1})
+        if not header:
+            return None
+        if "total_assignments" not in header or "seat_cursor" not in header:
+            raise ValueError("Seating map does not support incremental updates; regenerate it first.")
+        now = datetime.utcnow()
+        if not header.get("updating_until") or header["updating_until"] < now:
+            claim = await maps.update_one(
+                {"_id": map_id, "version": header.get("version")},
+                {"$set": {"updating_until": now + timedelta(seconds=settings.SEATING_UPDATE_LEASE_SECONDS)}, "$inc": {"version": 1}}
+            )
+            if claim.matched_count:
+                version = (header.get("version") or 0) + 1
+                try:
+                    return await _apply_delta(db, map_id, header, version, delta)
+                except Exception:
+                    await maps.update_one({"_id": map_id, "version": version}, {"$set": {"updating_until": None}, "$inc": {"version": 1}})
+                    raise
+        await asyncio.sleep(settings.SEATING_UPDATE_RETRY_SECONDS * (attempt + 1))
+    raise SeatingMapConflict("Seating map is being updated by another request; try again.")
+
+async def _apply_delta(db: AsyncIOMotorDatabase, map_id: ObjectId, header: dict, version: int, delta: RosterDelta) -> SeatingMapUpdateResponse:
+    removed = set(delta.removed)
+    touched = list(removed | {s.student_id for s in delta.added})
+    room_docs = {}
+    if touched:
+        async for room in db["seating_assignments"].find({"seating_map_id": map_id, "student_ids": {"$in": touched}}):
+            room_docs[room["room_id"]] = room
+    matched = [a for room in room_docs.values() for a in decode_room(room) if a["student_id"] in touched]
+    freed = [
+        {k: a[k] for k in ("room_id", "block", "room_number", "row", "seat")}
+        for a in matched if a["student_id"] in removed
+    ]
+    seated = {a["student_id"] for a in matched if a["student_id"] not in removed}
+    added = [s for s in delta.added if s.student_id not in seated]
+    free_seats = header.get("free_seats", []) + freed
+    room_ids = header["room_ids"]
+    capacities = header["room_capacities"]
+    cursor = header["seat_cursor"]
+    needed = list(rooms_spanned(capacities, cursor, len(added) - len(free_seats))) if len(added) > len(free_seats) else []
+    rooms = {}
+    if needed:
+        async for doc in db["rooms"].find({"room_id": {"$in": [room_ids[i] for i in needed]}}):
+            rooms[doc["room_id"]] = RoomData.parse_obj(doc)
+    # Unused capacity is addressed by the room layout recorded at generation time.
+    changed_rooms = [room_ids[i] for i in needed if room_ids[i] not in rooms or room_capacities([rooms[room_ids[i]]])[0] != capacities[i]]
+    if changed_rooms:
+        raise SeatingMapConflict(f"Rooms removed or resized since the seating map was generated: {', '.join(changed_rooms)}. Regenerate it.")
+    placed, free_seats, cursor, unplaced = fill_seats(added, free_seats, room_ids, capacities, rooms, cursor)
+    # Rewrite only the rooms that lost or gained a student.
+    placed_docs = [a.dict() for a in placed]
+    missing = list({a["room_id"] for a in placed_docs} - set(room_docs))
+    if missing:
+        async for room in db["seating_assignments"].find({"seating_map_id": map_id, "room_id": {"$in": missing}}):
+            room_docs[room["room_id"]] = room
+    changed = {a["room_id"] for a in placed_docs} | {seat["room_id"] for seat in freed}
+    room_index = {room_id: i for i, room_id in enumerate(room_ids)}
+    ops = []
+    for room_id in changed:
+        seats = [a for a in decode_room(room_docs[room_id]) if a["student_id"] not in removed] if room_id in room_docs else []
+        seats.extend(a for a in placed_docs if a["room_id"] == room_id)
+        seats.sort(key=lambda a: (a["row"], a["seat"]))
+        ops.append(ReplaceOne(
+            {"seating_map_id": map_id, "room_id": room_id},
+            encode_room(map_id, room_index[room_id], seats[0] if seats else room_docs[room_id], seats),
+            upsert=True
+        ))
+    if ops:
+        await db["seating_assignments"].bulk_write(ops, ordered=False)
+    res = await db["seating_maps"].update_one({"_id": map_id, "version": version}, {
+        "$set": {"free_seats": free_seats, "seat_cursor": cursor, "updating_until": None, "updated_at": datetime.utcnow().isoformat()},
+        "$inc": {"total_assignments": len(placed) - len(freed), "version": 1}
+    })
+    if not res.matched_count:
+        raise SeatingMapConflict("Seating map update outlived its lease; regenerate the map.")
+    seating_map_id = str(map_id)
+    if header.get("exam_id"):
+        seat_cache.apply_delta(header["exam_id"], seating_map_id, placed_docs, removed)
+    return SeatingMapUpdateResponse(
+        seating_map_id=seating_map_id,
+        placed=placed,
+        removed=len(freed),
+        unplaced=unplaced,
+        free_seats=len(free_seats)
+    )
+
+async def lookup_seat(db: AsyncIOMotorDatabase, exam_id: str, student_id: str) -> Optional[SeatLookupResponse]:
+    found, seating_map_id, seat = seat_cache.get(exam_id, student_id)
+    if not found:
+        header = await db["seating_maps"].find_one({"exam_id": exam_id}, {"_id": 1}, sort=[("generated_at", -1)])
+        if not header:
+            return None
+        seating_map_id = str(header["_id"])
+        room = await db["seating_assignments"].find_one({"seating_map_id": header["_id"], "student_ids": student_id})
+        seat = None
+        if room:
+            match = next(a for a in decode_room(room) if a["student_id"] == student_id)
+            seat = {k: match[k] for k in SEAT_FIELDS}
+        seat_cache.put(exam_id, seating_map_id, student_id, seat)
+    if not seat:
+        return None
+    return SeatLookupResponse(exam_id=exam_id, seating_map_id=seating_map_id, student_id=student_id, **seat)
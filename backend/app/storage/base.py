@@ -0,0 +1,92 @@
+import mimetypes
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+from app.config.settings import settings
+from app.storage.executor import run_blocking
+
+
+def guess_content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class StorageWriter(ABC):
+    # Incremental upload of one object: write() chunks, then commit() to publish it or abort()
+    # to discard it. Nothing is visible under the key before commit().
+    @abstractmethod
+    async def write(self, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def commit(self) -> str:
+        ...
+
+    @abstractmethod
+    async def abort(self) -> None:
+        ...
+
+
+class SpooledWriter(StorageWriter):
+    # Fallback for backends without native chunked uploads: chunks spill to a temp file past
+    # UPLOAD_CHUNK_SIZE and the backend uploads that file on commit.
+    def __init__(self, backend: "StorageBackend", key: str, content_type: Optional[str]):
+        self.backend = backend
+        self.key = key
+        self.content_type = content_type
+        self._spool = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_SIZE)
+
+    async def write(self, data: bytes) -> None:
+        await run_blocking("write", self._spool.write, data)
+
+    async def commit(self) -> str:
+        try:
+            self._spool.seek(0)
+            return await self.backend.put_file(self.key, self._spool, self.content_type)
+        finally:
+            self._spool.close()
+
+    async def abort(self) -> None:
+        self._spool.close()
+
+
+class StorageBackend(ABC):
+    # Keys are "/"-separated paths such as "uploads/2024/01/31/syllabus.pdf".
+    # get() raises FileNotFoundError for unknown keys; delete() of an unknown key is a no-op.
+    name = "base"
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def url(self, key: str) -> str:
+        ...
+
+    async def signed_url(self, key: str, expires_in: int) -> str:
+        # Time-limited URL for private objects; backends without signing return the plain URL.
+        return await self.url(key)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        # Key behind a URL this backend handed out, for backends whose plain URLs are not servable.
+        return None
+
+    def open_writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        return SpooledWriter(self, key, content_type)
+
+    async def put_file(self, key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> str:
+        return await self.put(key, await run_blocking("read", fileobj.read), content_type)
+
+    async def open(self) -> None:
+        # Create clients eagerly (called at startup); backends otherwise create them on first use.
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,91 @@
+import time
+import urllib.request
+from io import BytesIO
+from urllib.parse import urlsplit
+from typing import BinaryIO, Optional
+from app.storage.base import StorageBackend
+from app.storage.executor import run_blocking
+
+# Cloudinary stores PDFs and images as "image" resources; anything else (e.g. CSV) is "raw".
+IMAGE_FORMATS = {"pdf", "jpg", "jpeg", "png", "gif", "webp"}
+
+
+def _split_key(key: str):
+    stem, _, ext = key.rpartition(".")
+    if not stem:
+        return key, ""
+    return stem, ext.lower()
+
+
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+
+    def __init__(self, cloudinary_url: str):
+        self.cloudinary_url = cloudinary_url
+        self._configured = False
+
+    def _configure(self):
+        if not self._configured:
+            import cloudinary
+            # cloudinary://<api_key>:<api_secret>@<cloud_name>
+            parts = urlsplit(self.cloudinary_url)
+            cloudinary.config(cloud_name=parts.hostname, api_key=parts.username, api_secret=parts.password, secure=True)
+            self._configured = True
+
+    def _resource(self, key: str):
+        public_id, ext = _split_key(key)
+        if ext in IMAGE_FORMATS:
+            return public_id, "image", ext
+        return public_id, "raw", None
+
+    def _upload(self, key: str, fileobj: BinaryIO) -> str:
+        import cloudinary.uploader
+        self._configure()
+        public_id, _, _ = self._resource(key)
+        result = cloudinary.uploader.upload(fileobj, resource_type="auto", public_id=public_id, overwrite=True)
+        return result.get("secure_url", result.get("url", ""))
+
+    def _url(self, key: str) -> str:
+        import cloudinary.utils
+        self._configure()
+        public_id, resource_type, fmt = self._resource(key)
+        return cloudinary.utils.cloudinary_url(public_id, resource_type=resource_type, format=fmt, secure=True)[0]
+
+    def _get(self, key: str) -> bytes:
+        try:
+            with urllib.request.urlopen(self._url(key)) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise FileNotFoundError(key) from e
+            raise
+
+    def _destroy(self, key: str):
+        import cloudinary.uploader
+        self._configure()
+        public_id, resource_type, _ = self._resource(key)
+        cloudinary.uploader.destroy(public_id, resource_type=resource_type)
+
+    async def open(self) -> None:
+        self._configure()
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        return await run_blocking("put", self._upload, key, BytesIO(data))
+
+    async def put_file(self, key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> str:
+        return await run_blocking("put", self._upload, key, fileobj)
+
+    async def get(self, key: str) -> bytes:
+        return await run_blocking("get", self._get, key)
+
+    async def delete(self, key: str) -> None:
+        await run_blocking("delete", self._destroy, key)
+
+    async def signed_url(self, key: str, expires_in: int) -> str:
+        import cloudinary.utils
+        self._configure()
+        public_id, resource_type, fmt = self._resource(key)
+        return cloudinary.utils.private_download_url(public_id, fmt or "", resource_type=resource_type, expires_at=int(time.time()) + expires_in)
+
+    async def url(self, key: str) -> str:
+        return self._url(key)
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.config.settings import settings
+
+LATENCY_SAMPLES = 1024
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _OpStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, seconds: float, waited: float, failed: bool):
+        self.count += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.wait_seconds += waited
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(1000 * self.total_seconds / self.count, 2) if self.count else 0.0,
+            "mean_wait_ms": round(1000 * self.wait_seconds / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(1000 * _percentile(self.samples, 0.5), 2),
+            "p95_ms": round(1000 * _percentile(self.samples, 0.95), 2),
+            "max_ms": round(1000 * self.max_seconds, 2),
+        }
+
+
+class StorageExecutor:
+    # Bounded thread pool for blocking storage SDK and disk calls, kept apart from the default
+    # executor so slow uploads cannot starve other to_thread users. Latency includes queue wait.
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.peak_queued = 0
+        self._ops: Dict[str, _OpStats] = {}
+
+    async def run(self, op: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        submitted = time.perf_counter()
+        state = {"started": None, "abandoned": False}
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        def call():
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = time.perf_counter()
+                self.queued -= 1
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, call)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                if state["started"] is None:
+                    # Cancelled while still queued: the call will never run.
+                    state["abandoned"] = True
+                    self.queued -= 1
+                else:
+                    ended = time.perf_counter()
+                    self._ops.setdefault(op, _OpStats()).record(ended - submitted, state["started"] - submitted, failed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "peak_queued": self.peak_queued,
+                "operations": {op: s.to_dict() for op, s in self._ops.items()},
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+storage_executor: Optional[StorageExecutor] = None
+
+
+def get_storage_executor() -> StorageExecutor:
+    global storage_executor
+    if storage_executor is None:
+        storage_executor = StorageExecutor(settings.STORAGE_IO_WORKERS)
+    return storage_executor
+
+
+async def run_blocking(op: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await get_storage_executor().run(op, fn, *args, **kwargs)
+
+
+def shutdown_storage_executor():
+    global storage_executor
+    if storage_executor:
+        storage_executor.shutdown()
+        storage_executor = None
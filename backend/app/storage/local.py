@@ -0,0 +1,143 @@
+import hashlib
+import hmac
+import os
+import time
+import tempfile
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, unquote, urlencode
+from app.config.settings import settings
+from app.storage.base import StorageBackend, StorageWriter
+from app.storage.executor import run_blocking
+
+
+class LocalWriter(StorageWriter):
+    # Appends to a temp file next to the target, buffering up to UPLOAD_CHUNK_SIZE per disk write;
+    # commit() fsyncs and renames it into place.
+    def __init__(self, storage: "LocalStorage", key: str):
+        self.storage = storage
+        self.key = key
+        self._buffer = bytearray()
+        self._file = None
+
+    def _open(self):
+        target = self.storage.path(self.key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        self._file = os.fdopen(fd, "wb")
+
+    def _flush(self, data: bytes):
+        if self._file is None:
+            self._open()
+        self._file.write(data)
+
+    def _finish(self):
+        if self._file is None:
+            self._open()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.storage.path(self.key))
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._tmp)
+            except FileNotFoundError:
+                pass
+
+    async def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= settings.UPLOAD_CHUNK_SIZE:
+            chunk, self._buffer = bytes(self._buffer), bytearray()
+            await run_blocking("write", self._flush, chunk)
+
+    async def commit(self) -> str:
+        if self._buffer:
+            chunk, self._buffer = bytes(self._buffer), bytearray()
+            await run_blocking("write", self._flush, chunk)
+        try:
+            await run_blocking("put", self._finish)
+        except BaseException:
+            await run_blocking("delete", self._discard)
+            raise
+        return await self.storage.url(self.key)
+
+    async def abort(self) -> None:
+        self._buffer = bytearray()
+        await run_blocking("delete", self._discard)
+
+
+class LocalStorage(StorageBackend):
+    # Objects live under root/<aa>/<bb>/<quoted key>, sharded by a hash of the key so no
+    # directory grows past a few thousand entries. Writes go to a temp file in the target
+    # directory and are renamed into place, so readers never see a partial object.
+    name = "local"
+
+    def __init__(self, root: str, base_url: str, signing_key: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.signing_key = hashlib.sha256(b"local-storage:" + signing_key.encode("utf-8")).digest()
+
+    def path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / quote(key, safe="")
+
+    def _write(self, key: str, data: bytes):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _delete(self, key: str):
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def open_writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        return LocalWriter(self, key)
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        await run_blocking("put", self._write, key, data)
+        return await self.url(key)
+
+    async def get(self, key: str) -> bytes:
+        return await run_blocking("get", self.path(key).read_bytes)
+
+    async def delete(self, key: str) -> None:
+        await run_blocking("delete", self._delete, key)
+
+    async def url(self, key: str) -> str:
+        return f"{self.base_url}/{quote(key)}"
+
+    # Objects are served only through signed, expiring links: the plain URL names the object but
+    # grants nothing, and keys such as hall_tickets/hall_ticket_<student_id>_qr.png are guessable.
+    def _signature(self, key: str, expires: int) -> str:
+        message = f"{key}\n{expires}".encode("utf-8")
+        return hmac.new(self.signing_key, message, hashlib.sha256).hexdigest()
+
+    async def signed_url(self, key: str, expires_in: int) -> str:
+        expires = int(time.time()) + expires_in
+        return f"{await self.url(key)}?{urlencode({'expires': expires, 'signature': self._signature(key, expires)})}"
+
+    def verify_signature(self, key: str, expires: Optional[int], signature: Optional[str]) -> bool:
+        if expires is None or not signature or expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(key, expires), signature)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return unquote(url[len(prefix):].split("?", 1)[0]) if url.startswith(prefix) else None
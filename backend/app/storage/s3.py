@@ -0,0 +1,132 @@
+import threading
+from typing import Optional
+from app.config.settings import settings
+from app.storage.base import StorageBackend, StorageWriter, guess_content_type
+from app.storage.executor import run_blocking
+
+
+# S3 rejects multipart parts under 5 MiB (except the last one).
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3Writer(StorageWriter):
+    # Objects that fit in one part go up with a single put_object; larger ones become a multipart
+    # upload, so at most one part is buffered per upload.
+    def __init__(self, storage: "S3Storage", key: str, content_type: Optional[str]):
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type or guess_content_type(key)
+        self.part_size = max(settings.UPLOAD_CHUNK_SIZE, MIN_PART_SIZE)
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    async def _upload_part(self):
+        client = self.storage.client
+        if self._upload_id is None:
+            res = await run_blocking("put", client.create_multipart_upload, Bucket=self.storage.bucket, Key=self.key, ContentType=self.content_type)
+            self._upload_id = res["UploadId"]
+        chunk, self._buffer = bytes(self._buffer), bytearray()
+        number = len(self._parts) + 1
+        res = await run_blocking(
+            "write", client.upload_part, Bucket=self.storage.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=number, Body=chunk
+        )
+        self._parts.append({"ETag": res["ETag"], "PartNumber": number})
+
+    async def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= self.part_size:
+            await self._upload_part()
+
+    async def commit(self) -> str:
+        if self._upload_id is None:
+            return await self.storage.put(self.key, bytes(self._buffer), self.content_type)
+        try:
+            if self._buffer:
+                await self._upload_part()
+            await run_blocking(
+                "put", self.storage.client.complete_multipart_upload,
+                Bucket=self.storage.bucket, Key=self.key, UploadId=self._upload_id, MultipartUpload={"Parts": self._parts},
+            )
+        except BaseException:
+            await self.abort()
+            raise
+        return await self.storage.url(self.key)
+
+    async def abort(self) -> None:
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            upload_id, self._upload_id = self._upload_id, None
+            await run_blocking("delete", self.storage.client.abort_multipart_upload, Bucket=self.storage.bucket, Key=self.key, UploadId=upload_id)
+
+
+class S3Storage(StorageBackend):
+    # One boto3 client per process; boto3 clients are thread-safe, so the storage executor's
+    # threads share it and its connection pool is sized to match them.
+    name = "s3"
+
+    def __init__(self, bucket: str, region: str, access_key_id: str, secret_access_key: str, endpoint_url: str = "", max_connections: int = 10):
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.max_connections = max_connections
+        self._credentials = {"aws_access_key_id": access_key_id, "aws_secret_access_key": secret_access_key}
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    self._client = boto3.client(
+                        "s3",
+                        region_name=self.region or None,
+                        endpoint_url=self.endpoint_url or None,
+                        config=Config(max_pool_connections=self.max_connections, retries={"max_attempts": 3, "mode": "standard"}),
+                        **self._credentials,
+                    )
+        return self._client
+
+    async def open(self) -> None:
+        await run_blocking("connect", lambda: self.client)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _get(self, key: str) -> bytes:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def open_writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        return S3Writer(self, key, content_type)
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        await run_blocking(
+            "put", self.client.put_object, Bucket=self.bucket, Key=key, Body=data, ContentType=content_type or guess_content_type(key)
+        )
+        return await self.url(key)
+
+    async def get(self, key: str) -> bytes:
+        return await run_blocking("get", self._get, key)
+
+    async def delete(self, key: str) -> None:
+        await run_blocking("delete", self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def signed_url(self, key: str, expires_in: int) -> str:
+        # Presigning is local HMAC work, cheap enough to keep on the event loop.
+        return self.client.generate_presigned_url("get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in)
+
+    async def url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
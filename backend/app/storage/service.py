@@ -0,0 +1,66 @@
+from typing import Optional
+from app.config.settings import settings
+from app.storage.base import StorageBackend
+from app.storage.executor import get_storage_executor, shutdown_storage_executor
+
+STORAGE_BACKENDS = ("auto", "local", "s3", "cloudinary")
+
+storage: Optional[StorageBackend] = None
+
+
+def create_storage(backend: str = "auto") -> StorageBackend:
+    # "auto" keeps the old preference order: S3 when configured, then Cloudinary, then local disk.
+    if backend == "auto":
+        if settings.AWS_S3_BUCKET and settings.AWS_ACCESS_KEY_ID:
+            backend = "s3"
+        elif settings.CLOUDINARY_URL:
+            backend = "cloudinary"
+        else:
+            backend = "local"
+    if backend == "s3":
+        from app.storage.s3 import S3Storage
+        return S3Storage(
+            settings.AWS_S3_BUCKET,
+            settings.AWS_S3_REGION,
+            settings.AWS_ACCESS_KEY_ID,
+            settings.AWS_SECRET_ACCESS_KEY,
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+            max_connections=settings.STORAGE_IO_WORKERS,
+        )
+    if backend == "cloudinary":
+        from app.storage.cloudinary_storage import CloudinaryStorage
+        return CloudinaryStorage(settings.CLOUDINARY_URL)
+    if backend == "local":
+        from app.storage.local import LocalStorage
+        return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL, settings.JWT_SECRET_KEY)
+    raise ValueError(f"Unknown storage backend '{backend}'. Expected one of: {', '.join(STORAGE_BACKENDS)}.")
+
+
+def get_storage() -> StorageBackend:
+    global storage
+    if storage is None:
+        storage = create_storage(settings.STORAGE_BACKEND)
+    return storage
+
+
+async def init_storage():
+    await get_storage().open()
+
+
+async def close_storage():
+    global storage
+    if storage:
+        await storage.close()
+        storage = None
+    shutdown_storage_executor()
+
+
+async def shareable_url(url: Optional[str]) -> Optional[str]:
+    # Stored URLs are handed to clients through here, so local objects get a signed link.
+    storage = get_storage()
+    key = storage.key_for_url(url) if url else None
+    return await storage.signed_url(key, settings.SIGNED_URL_TTL_SECONDS) if key else url
+
+
+def storage_metrics() -> dict:
+    return {"backend": get_storage().name, **get_storage_executor().stats()}
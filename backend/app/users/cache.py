@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.config.settings import settings
+from app.users.schemas import UserResponse
+
+class UserProfileCache:
+    # TTL + LRU of serialized profiles keyed by user id, for /api/users/me on every navigation.
+    # Writes go through update(); a read that started before a write is not cached, so a slow
+    # lookup cannot put an older profile back. Invalidation is per process: other workers can
+    # serve a changed profile until their entry's TTL runs out.
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._users: "OrderedDict[str, tuple]" = OrderedDict()
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[UserResponse]:
+        entry = self._users.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at >= time.monotonic():
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return user.copy()
+            del self._users[user_id]
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def put(self, user_id: str, user: UserResponse, read_at: Optional[int] = None):
+        # read_at is the `writes` counter seen before the database read that produced `user`;
+        # without it the profile comes from a write and supersedes any read still in flight.
+        if read_at is None:
+            self.writes += 1
+        elif read_at != self.writes:
+            return
+        self._users[user_id] = (time.monotonic() + self.ttl_seconds, user.copy())
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+            self.evicted += 1
+
+    def invalidate(self, user_id: str):
+        self.writes += 1
+        if self._users.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "invalidations": self.invalidations,
+        }
+
+user_cache = UserProfileCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends, Request, HTTPException, status
 from app.users.schemas import UserResponse, UserUpdateRequest
 from app.users.service import get_user_by_id, update_user_profile
 from app.config.database import get_database
+from app.middleware.role_guard import require_roles
+from app.users.cache import user_cache
+from app.middleware.token_cache import token_cache
 
 router = APIRouter(tags=["Users"])  # ❗ REMOVED prefix
 
@@ -49,3 +52,10 @@ async def update_my_profile(
 
     return updated
 
+@router.get("/cache/stats", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_user_cache_stats():
+    return user_cache.stats()
+
+@router.get("/token-cache/stats", dependencies=[Depends(require_roles(["ADMIN"]))])
+async def get_token_cache_stats():
+    return token_cache.stats()
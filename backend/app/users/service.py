@@ -1,7 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 from app.users.schemas import UserResponse, UserUpdateRequest
+from app.users.cache import user_cache
+
+PROFILE_PROJECTION = {"email": 1, "role": 1, "name": 1, "phone": 1, "department": 1}
 
 def _serialize_user(user_doc) -> dict:
     if not user_doc:
@@ -17,14 +21,30 @@ def _serialize_user(user_doc) -> dict:
     return mapped
 
 async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[UserResponse]:
-    user = await db["users"].find_one({"_id": ObjectId(user_id)})
-    return UserResponse.parse_obj(_serialize_user(user)) if user else None
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
+    read_at = user_cache.writes
+    user = await db["users"].find_one({"_id": ObjectId(user_id)}, PROFILE_PROJECTION)
+    if not user:
+        return None
+    response = UserResponse.parse_obj(_serialize_user(user))
+    user_cache.put(user_id, response, read_at)
+    return response
 
 async def update_user_profile(db: AsyncIOMotorDatabase, user_id: str, data: UserUpdateRequest) -> Optional[UserResponse]:
     update_data = {k: v for k, v in data.dict(exclude_unset=True).items() if v is not None}
     if not update_data:
         return await get_user_by_id(db, user_id)
-    await db["users"].update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
-    return await get_user_by_id(db, user_id)
-
-
+    user_cache.invalidate(user_id)
+    user = await db["users"].find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$set": update_data},
+        projection=PROFILE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if not user:
+        return None
+    response = UserResponse.parse_obj(_serialize_user(user))
+    user_cache.put(user_id, response)
+    return response
@@ -39,3 +39,41 @@ def create_hall_ticket_pdf(student_name: str, exams: List[Dict]) -> bytes:
     return buffer.getvalue()
 
 
+
+def create_room_sheet_pdf(exam_name: str, room: Dict, assignments: List[Dict]) -> bytes:
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    def header(y_position):
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, y_position, "SEAT PLAN & ATTENDANCE SHEET")
+        y_position -= 25
+        c.setFont("Helvetica", 12)
+        c.drawString(50, y_position, f"Exam: {exam_name or ''}")
+        y_position -= 18
+        c.drawString(50, y_position, f"Block: {room.get('block', '')} | Room: {room.get('room_number', '')} ({room.get('room_id', '')})")
+        y_position -= 18
+        c.drawString(50, y_position, f"Candidates: {len(assignments)}")
+        y_position -= 25
+        c.setFont("Helvetica-Bold", 10)
+        for x, label in ((50, "Row"), (85, "Seat"), (125, "Roll No"), (215, "Student ID"), (305, "Name"), (455, "Signature")):
+            c.drawString(x, y_position, label)
+        c.setFont("Helvetica", 10)
+        return y_position - 18
+
+    y_position = header(height - 50)
+    for a in assignments:
+        if y_position < 60:
+            c.showPage()
+            y_position = header(height - 50)
+        c.drawString(50, y_position, str(a.get("row", "")))
+        c.drawString(85, y_position, str(a.get("seat", "")))
+        c.drawString(125, y_position, str(a.get("roll_number", ""))[:14])
+        c.drawString(215, y_position, str(a.get("student_id", ""))[:14])
+        c.drawString(305, y_position, str(a.get("student_name", ""))[:28])
+        c.line(455, y_position - 2, width - 50, y_position - 2)
+        y_position -= 18
+    c.save()
+    buffer.seek(0)
+    return buffer.getvalue()
@@ -0,0 +1,25 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+from app.config.settings import settings
+
+process_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS or None)
+    return process_pool
+
+
+async def run_in_process(fn: Callable, *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), fn, *args)
+
+
+def shutdown_process_pool():
+    global process_pool
+    if process_pool:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+        process_pool = None
@@ -0,0 +1,54 @@
+# Per-request authentication cost: full JWT verification vs the decoded-token cache.
+#
+# Run from backend/:
+#   python -m benchmarks.auth_bench
+#   python -m benchmarks.auth_bench --tokens 5000 --requests 200000
+#
+# Requests draw tokens uniformly from a fixed pool, like the same cookies hitting the API all
+# morning; the first sighting of each token is a miss that pays for verification.
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+
+def _time_per_request(fn, tokens) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        fn(token)
+    return (time.perf_counter() - started) / len(tokens)
+
+
+def main(argv=None) -> int:
+    from app.config.security import create_access_token, decode_jwt_token
+    from app.middleware.token_cache import TokenCache
+
+    parser = argparse.ArgumentParser(description="Benchmark per-request JWT verification with and without the token cache.")
+    parser.add_argument("--tokens", type=int, default=2000, help="Distinct access tokens in circulation.")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--cache-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    pool = [create_access_token(subject=f"user{i}") for i in range(args.tokens)]
+    stream = [rng.choice(pool) for _ in range(args.requests)]
+
+    before = _time_per_request(decode_jwt_token, stream)
+    cache = TokenCache(args.cache_size)
+    after = _time_per_request(cache.decode, stream)
+    stats = cache.stats()
+
+    print(f"{args.requests:,} requests over {args.tokens:,} tokens (cache size {args.cache_size:,})")
+    print(f"  decode_jwt_token   {before * 1e6:>9.2f} us/request")
+    print(f"  TokenCache.decode  {after * 1e6:>9.2f} us/request  hit rate {stats['hit_rate']:.1%}")
+    print(f"  speedup            {before / after:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
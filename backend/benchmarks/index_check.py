@@ -0,0 +1,102 @@
+# Query plan check: applies the index registry to a scratch database on a real mongod and runs
+# explain() on the filters and sorts the services issue, failing if any plan contains a COLLSCAN.
+# Deliberate full reads (rosters, exam and calendar listings) are not listed. Updates, counts
+# and distincts are checked through a find on the same filter, which picks the same index.
+#
+# Run from backend/ (needs a local mongod; the scratch database is dropped afterwards):
+#   python -m benchmarks.index_check
+#   python -m benchmarks.index_check --uri mongodb://localhost:27017 --database vcube_index_check --keep
+import argparse
+import asyncio
+import os
+import sys
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from bson.objectid import ObjectId
+
+MAP_ID = ObjectId()
+
+# (collection, filter, sort) as issued by the services.
+QUERIES = [
+    ("users", {"email": "a@example.com", "role": "STUDENT"}, None),
+    ("hall_tickets", {"student_id": "S1"}, [("issued_at", -1)]),
+    ("hall_tickets", {"student_id": {"$in": ["S1", "S2"]}, "content_hash": {"$in": ["h"]}, "stale": {"$ne": True}}, None),
+    ("hall_tickets", {"student_id": {"$in": ["S1", "S2"]}, "stale": True}, None),
+    ("hall_tickets", {"exams.exam_id": "E1", "stale": {"$ne": True}}, None),
+    ("hall_tickets", {"job_id": MAP_ID, "student_id": {"$in": ["S1", "S2"]}}, None),
+    ("hall_tickets", {"stale": True}, None),
+    ("hall_ticket_jobs", {"status": {"$in": ["pending", "running"]}}, None),
+    ("students", {"$or": [{"department": "CSE", "semester": "3"}, {"department": "ECE", "semester": "5"}]}, [("student_id", 1)]),
+    ("students", {"$and": [{"$or": [{"department": "CSE", "semester": "3"}]}, {"student_id": {"$gt": "S1"}}]}, [("student_id", 1)]),
+    ("students", {"student_id": {"$in": ["S1", "S2"]}}, None),
+    ("rooms", {"room_id": {"$in": ["R1", "R2"]}}, None),
+    ("seating_maps", {"exam_id": "E1"}, [("generated_at", -1)]),
+    ("seating_maps", {}, [("generated_at", -1)]),
+    ("seating_assignments", {"seating_map_id": MAP_ID}, [("room_index", 1)]),
+    ("seating_assignments", {"seating_map_id": MAP_ID, "student_ids": "S1"}, None),
+    ("seating_assignments", {"seating_map_id": MAP_ID, "student_ids": {"$in": ["S1", "S2"]}}, None),
+    ("seating_assignments", {"seating_map_id": MAP_ID, "room_id": {"$in": ["R1", "R2"]}}, None),
+    ("mindmaps", {"created_by": "U1"}, None),
+    ("clubs", {"club_id": "C1"}, None),
+    ("club_events", {"club_id": "C1"}, None),
+    ("club_events", {"status": "pending"}, None),
+    ("files", {"sha256": "0" * 64}, None),
+]
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+async def _check(uri: str, database: str, keep: bool) -> list:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.config.indexes import ensure_indexes
+
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    db = client[database]
+    failures = []
+    try:
+        await ensure_indexes(db)
+        for collection, filter, sort in QUERIES:
+            cursor = db[collection].find(filter)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+            stages = list(_stages(plan))
+            label = f"{collection} {filter}" + (f" sort {sort}" if sort else "")
+            print(f"  {' > '.join(stages):<40} {label}")
+            if "COLLSCAN" in stages or stages == ["EOF"]:
+                failures.append(label)
+    finally:
+        if not keep:
+            await client.drop_database(database)
+        client.close()
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fail if any service query plan is a collection scan.")
+    parser.add_argument("--uri", default=os.environ.get("INDEX_CHECK_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="vcube_index_check")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database.")
+    args = parser.parse_args(argv)
+
+    failures = asyncio.run(_check(args.uri, args.database, args.keep))
+    if failures:
+        print("\nCollection scans:\n  " + "\n  ".join(failures))
+        return 1
+    print(f"\nNo collection scans in {len(QUERIES)} queries.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
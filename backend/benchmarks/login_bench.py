@@ -0,0 +1,149 @@
+# Login storm: bcrypt verification on the event loop vs the dedicated password pool.
+#
+# Run from backend/:
+#   python -m benchmarks.login_bench
+#   python -m benchmarks.login_bench --rounds 12 --concurrency 64 --duration 10 --workers 8
+#
+# Drives the real login route over ASGI (no server or network) with `concurrency` clients
+# logging in back to back, while a prober hits a trivial endpoint every few milliseconds.
+# Reports login throughput and the latency of the unrelated endpoint under that load. Throughput
+# is bounded by cores either way; the pool keeps the event loop free for everything else.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+USERS = 100
+
+
+async def _request(app, method: str, path: str, body: bytes = b"") -> int:
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def _app(db):
+    from fastapi import FastAPI
+    from app.auth.routes import router as auth_router
+    from app.config.database import get_database
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/auth")
+    app.dependency_overrides[get_database] = lambda: db
+
+    @app.get("/api/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def _run(app, concurrency: int, duration: float, probe_interval: float) -> dict:
+    bodies = [json.dumps({"email": f"user{i}@example.com", "password": f"secret{i}", "role": "STUDENT"}).encode() for i in range(USERS)]
+    deadline = time.perf_counter() + duration
+    logins = []
+    probes = []
+
+    async def client(n: int):
+        i = n
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await _request(app, "POST", "/api/auth/login", bodies[i % USERS])
+            assert status == 200, status
+            logins.append(time.perf_counter() - started)
+            i += concurrency
+
+    async def prober():
+        # Latency is measured from when each probe was due, so time spent waiting for a
+        # blocked event loop counts against the endpoint as it would for a real client.
+        due = time.perf_counter()
+        while due < deadline:
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await _request(app, "GET", "/api/health")
+            finished = time.perf_counter()
+            probes.append(finished - due)
+            due = max(due + probe_interval, finished)
+
+    started = time.perf_counter()
+    await asyncio.gather(prober(), *(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "logins_per_second": len(logins) / elapsed,
+        "login_p50": _percentile(logins, 0.5),
+        "login_p99": _percentile(logins, 0.99),
+        "probe_p50": _percentile(probes, 0.5),
+        "probe_p99": _percentile(probes, 0.99),
+        "probe_max": max(probes, default=0.0),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent logins and their effect on other endpoints.")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor.")
+    parser.add_argument("--workers", type=int, default=4, help="Password pool threads.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clients logging in concurrently.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode.")
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    from app.config.settings import settings
+    settings.PASSWORD_HASH_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.workers
+
+    import app.auth.service as auth_service
+    from app.config.security import hash_password, verify_and_update, shutdown_password_pool
+    from benchmarks.memory_db import MemoryDatabase
+
+    db = MemoryDatabase()
+    for i in range(USERS):
+        db["users"].docs[i] = {"_id": i, "email": f"user{i}@example.com", "role": "STUDENT", "password": hash_password(f"secret{i}")}
+    app = _app(db)
+
+    async def on_loop(plain_password, hashed_password):
+        return verify_and_update(plain_password, hashed_password)
+
+    pooled = auth_service.verify_and_update_async
+    print(f"bcrypt cost {args.rounds}, {args.concurrency} concurrent clients, {args.duration:.0f}s per mode")
+    for name, verify in (("event loop", on_loop), (f"pool ({args.workers} threads)", pooled)):
+        auth_service.verify_and_update_async = verify
+        r = asyncio.run(_run(app, args.concurrency, args.duration, args.probe_interval))
+        print(f"\n{name}")
+        print(f"  logins        {r['logins_per_second']:>8.1f}/s   p50 {r['login_p50'] * 1e3:>8.1f} ms   p99 {r['login_p99'] * 1e3:>8.1f} ms")
+        print(f"  /api/health   p50 {r['probe_p50'] * 1e3:>8.2f} ms   p99 {r['probe_p99'] * 1e3:>8.2f} ms   max {r['probe_max'] * 1e3:>8.2f} ms")
+    auth_service.verify_and_update_async = pooled
+    shutdown_password_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
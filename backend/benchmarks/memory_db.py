@@ -0,0 +1,266 @@
+# Minimal in-memory stand-in for the Motor database API used by the seating service and tests.
+# Every write is BSON-encoded so the store stage still pays the wire serialization cost.
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import bson
+from bson.objectid import ObjectId
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _values(doc: dict, path: str) -> list:
+    # Every value a dotted path reaches, descending into arrays the way MongoDB does.
+    values = [doc]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict) and part in item:
+                    found.append(item[part])
+        values = found
+    return values or [None]
+
+
+def _compare(values: list, op: str, operand) -> bool:
+    for value in values:
+        try:
+            if (op == "$lt" and value < operand) or (op == "$lte" and value <= operand) \
+                    or (op == "$gt" and value > operand) or (op == "$gte" and value >= operand):
+                return True
+        except TypeError:
+            continue
+    return False
+
+
+def _field_matches(values: list, cond) -> bool:
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        return all(
+            any(_field_matches(values, v) for v in operand) if op == "$in"
+            else not _field_matches(values, operand) if op == "$ne"
+            else (values != [None]) == operand if op == "$exists"
+            else _compare(values, op, operand)
+            for op, operand in cond.items()
+        )
+    return any(v == cond or (isinstance(v, list) and cond in v) for v in values)
+
+
+def _matches(doc: dict, filter: Optional[dict]) -> bool:
+    # Equality, comparison, $in/$ne/$exists and $or/$and; enough for the services under test.
+    for key, cond in (filter or {}).items():
+        if key == "$or":
+            ok = any(_matches(doc, f) for f in cond)
+        elif key == "$and":
+            ok = all(_matches(doc, f) for f in cond)
+        else:
+            ok = _field_matches(_values(doc, key), cond)
+        if not ok:
+            return False
+    return True
+
+
+def _apply(doc: dict, update: dict, inserting: bool = False):
+    for op, fields in update.items():
+        for key, value in fields.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                doc[key] = value
+            elif op == "$unset":
+                doc.pop(key, None)
+            elif op == "$inc":
+                doc[key] = doc.get(key, 0) + value
+            elif op == "$push":
+                items = doc.setdefault(key, [])
+                if isinstance(value, dict) and "$each" in value:
+                    items.extend(value["$each"])
+                    if "$slice" in value:
+                        doc[key] = items[:value["$slice"]]
+                else:
+                    items.append(value)
+            elif op != "$setOnInsert":
+                raise NotImplementedError(op)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        self._docs = sorted(self._docs, key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count: int):
+        self._docs = self._docs[:count] if count else self._docs
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.docs: Dict[Any, dict] = {}
+        self.unique: List[tuple] = []
+        self.bytes_written = 0
+
+    def _check_unique(self, doc: dict):
+        # Unique indexes (honouring partialFilterExpression) as declared through create_indexes.
+        for keys, partial in self.unique:
+            if not _matches(doc, partial):
+                continue
+            key = [_values(doc, k) for k in keys]
+            if any(d["_id"] != doc["_id"] and _matches(d, partial) and [_values(d, k) for k in keys] == key for d in self.docs.values()):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {'_'.join(keys)}", 11000)
+
+    def _store(self, doc: dict):
+        # Like the driver: the caller's dict gains an _id, the collection keeps its own copy.
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_", 11000)
+        self._check_unique(doc)
+        self.bytes_written += len(bson.encode(doc))
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def insert_one(self, doc: dict):
+        self._store(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered: bool = True):
+        docs, errors, inserted = list(docs), [], 0
+        for index, doc in enumerate(docs):
+            try:
+                self._store(doc)
+                inserted += 1
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": e.code, "errmsg": str(e), "op": doc})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in docs])
+
+    async def delete_one(self, filter: dict):
+        doomed = next((k for k, d in self.docs.items() if _matches(d, filter)), None)
+        if doomed is not None:
+            del self.docs[doomed]
+        return SimpleNamespace(deleted_count=int(doomed is not None))
+
+    async def delete_many(self, filter: dict):
+        doomed = [k for k, d in self.docs.items() if _matches(d, filter)]
+        for k in doomed:
+            del self.docs[k]
+        return SimpleNamespace(deleted_count=len(doomed))
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False):
+        return await self._update(filter, update, upsert, many=False)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False):
+        return await self._update(filter, update, upsert, many=True)
+
+    async def _update(self, filter: dict, update: dict, upsert: bool, many: bool):
+        matched = [d for d in self.docs.values() if _matches(d, filter)]
+        matched = matched if many else matched[:1]
+        for doc in matched:
+            before = dict(doc)
+            _apply(doc, update)
+            self.bytes_written += len(bson.encode(doc)) if doc != before else 0
+        upserted_id = None
+        if not matched and upsert:
+            doc = {k: v for k, v in filter.items() if not k.startswith("$") and not isinstance(v, dict)}
+            _apply(doc, update, inserting=True)
+            self._store(doc)
+            upserted_id = doc["_id"]
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched), upserted_id=upserted_id)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection: Optional[dict] = None, return_document: bool = False, upsert: bool = False, sort=None):
+        current = await self.find_one(filter, sort=sort)
+        if current is None:
+            if upsert:
+                res = await self._update(filter, update, True, many=False)
+                return dict(self.docs[res.upserted_id]) if return_document else None
+            return None
+        stored = self.docs[current["_id"]]
+        _apply(stored, update)
+        return dict(stored) if return_document else current
+
+    async def distinct(self, key: str, filter: Optional[dict] = None):
+        found = []
+        for doc in self.docs.values():
+            if _matches(doc, filter):
+                for value in _values(doc, key):
+                    for item in value if isinstance(value, list) else [value]:
+                        if item is not None and item not in found:
+                            found.append(item)
+        return found
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        for request in requests:
+            if isinstance(request, ReplaceOne):
+                current = next((d for d in self.docs.values() if _matches(d, request._filter)), None)
+                doc = dict(request._doc)
+                if current is not None:
+                    doc["_id"] = current["_id"]
+                    del self.docs[current["_id"]]
+                elif not request._upsert:
+                    continue
+                self._store(doc)
+            elif isinstance(request, UpdateOne):
+                await self.update_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, DeleteMany):
+                await self.delete_many(request._filter)
+            else:
+                raise NotImplementedError(type(request).__name__)
+
+    async def create_index(self, keys, **kwargs):
+        return str(keys)
+
+    async def create_indexes(self, indexes, **kwargs):
+        for index in indexes:
+            spec = index.document
+            if spec.get("unique"):
+                self.unique.append((list(spec["key"]), spec.get("partialFilterExpression")))
+        return [index.document["name"] for index in indexes]
+
+    async def drop(self):
+        self.database._collections.pop(self.name, None)
+
+    async def rename(self, new_name: str, dropTarget: bool = False):
+        collections = self.database._collections
+        if new_name in collections and not dropTarget:
+            raise ValueError(f"Collection {new_name} exists.")
+        collections.pop(self.name, None)
+        self.name = new_name
+        collections[new_name] = self
+
+    async def count_documents(self, filter: dict):
+        return sum(1 for d in self.docs.values() if _matches(d, filter))
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None):
+        return _Cursor([dict(d) for d in self.docs.values() if _matches(d, filter)])
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None):
+        docs = [d for d in self.docs.values() if _matches(d, filter)]
+        if sort:
+            key, direction = sort[0]
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    async def list_collection_names(self):
+        return list(self._collections)
@@ -0,0 +1,115 @@
+# Per-request overhead of the auth middleware: the previous BaseHTTPMiddleware implementation
+# vs the pure ASGI AuthMiddleware, measured by driving a bare Starlette app through ASGI calls
+# (no server or network). Both variants use the token cache, so the difference is the
+# middleware plumbing itself.
+#
+# Run from backend/:
+#   python -m benchmarks.middleware_bench
+#   python -m benchmarks.middleware_bench --requests 20000 --chunks 256
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+
+def _legacy_middleware():
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.responses import JSONResponse
+    from app.middleware.token_cache import token_cache
+
+    class LegacyAuthMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            token = request.cookies.get("access_token")
+            if not token:
+                return JSONResponse(status_code=401, content={"detail": "Missing access token."})
+            payload = token_cache.decode(token)
+            if not payload:
+                return JSONResponse(status_code=401, content={"detail": "Invalid or expired token."})
+            request.state.user = payload
+            return await call_next(request)
+
+    return LegacyAuthMiddleware
+
+
+def _app(middleware, chunks: int):
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    async def ping(request):
+        return JSONResponse({"user": request.state.user["sub"]} if middleware else {"user": None})
+
+    async def stream(request):
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 1024
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return Starlette(routes=[Route("/ping", ping), Route("/stream", stream)], middleware=[Middleware(middleware)] if middleware else [])
+
+
+async def _request(app, path: str, cookie: bytes) -> int:
+    messages = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal messages
+        if message["type"] == "http.response.body":
+            messages += 1
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"cookie", b"access_token=" + cookie)], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+async def _measure(app, path: str, cookie: bytes, requests: int):
+    await _request(app, path, cookie)
+    started = time.perf_counter()
+    for _ in range(requests):
+        messages = await _request(app, path, cookie)
+    return (time.perf_counter() - started) / requests, messages
+
+
+def main(argv=None) -> int:
+    from app.config.security import create_access_token
+    from app.middleware.auth_middleware import AuthMiddleware
+
+    parser = argparse.ArgumentParser(description="Benchmark auth middleware overhead per request.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--chunks", type=int, default=64, help="Body chunks sent by the streaming route.")
+    args = parser.parse_args(argv)
+
+    cookie = create_access_token(subject="benchmark").encode()
+    variants = [("no middleware", None), ("BaseHTTPMiddleware", _legacy_middleware()), ("pure ASGI", AuthMiddleware)]
+    results = {}
+    for path in ("/ping", "/stream"):
+        print(f"\n{path} ({args.requests:,} requests)")
+        for name, middleware in variants:
+            per_request, messages = asyncio.run(_measure(_app(middleware, args.chunks), path, cookie, args.requests))
+            results[(path, name)] = per_request
+            print(f"  {name:<20} {per_request * 1e6:>9.1f} us/request  {messages:>4} body messages")
+        base = results[(path, "no middleware")]
+        legacy = results[(path, "BaseHTTPMiddleware")] - base
+        asgi = results[(path, "pure ASGI")] - base
+        print(f"  middleware overhead  {legacy * 1e6:.1f} us -> {asgi * 1e6:.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# Exam-morning burst on the seat lookup: every student opens "my seat" at once.
+#
+# Run from backend/:
+#   python -m benchmarks.seat_lookup_bench
+#   python -m benchmarks.seat_lookup_bench --check              # exit 1 if warm p99 > --p99-ms
+#   python -m benchmarks.seat_lookup_bench --students 50000 --concurrency 16 --requests 50000
+#
+# Drives GET /api/seating/my-seat through AuthMiddleware and the real seating router over ASGI
+# (no server or network) against an in-memory database holding a freshly generated seating map.
+# The burst runs twice: cold (seat cache emptied, so each lookup reads through to the database)
+# and warm (cache filled by generation, as it is right after a map is published). Latency is per
+# request from when it was issued, with `concurrency` clients in flight on one event loop.
+# The in-memory store scans instead of using indexes, so cold numbers overstate MongoDB's cost;
+# --check gates the warm burst, which is the path the cache exists for.
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+EXAM_ID = "benchmark-exam"
+
+
+async def _request(app, path: str, query: bytes, cookie: bytes) -> int:
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query, "root_path": "",
+        "headers": [(b"cookie", b"access_token=" + cookie)], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def _app(db):
+    from fastapi import FastAPI
+    from app.config.database import get_database
+    from app.middleware.auth_middleware import AuthMiddleware
+    from app.seating.routes import router as seating_router
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+    app.include_router(seating_router)
+    app.dependency_overrides[get_database] = lambda: db
+    return app
+
+
+async def _seed(students: int):
+    from benchmarks.memory_db import MemoryDatabase
+    from app.seating.service import generate_seating_map
+
+    db = MemoryDatabase()
+    await db["students"].insert_many([
+        {"student_id": f"STU{i:07d}", "name": f"Student {i}", "department": f"DEPT{i % 12:02d}", "semester": "3", "roll_number": f"R{i:07d}"}
+        for i in range(students)
+    ])
+    rooms = -(-students // 60)
+    await db["rooms"].insert_many([
+        {"room_id": f"ROOM{r:05d}", "block": f"B{r // 50}", "room_number": str(r), "rows": 6, "benches_per_row": 10, "capacity": 60}
+        for r in range(rooms)
+    ])
+    await generate_seating_map(db, EXAM_ID, "Benchmark", engine="array")
+    return db
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def _burst(app, cookies: list, requests: int, concurrency: int) -> dict:
+    query = f"exam_id={EXAM_ID}".encode()
+    latencies = []
+    next_request = 0
+
+    async def client():
+        nonlocal next_request
+        while next_request < requests:
+            cookie = cookies[next_request % len(cookies)]
+            next_request += 1
+            started = time.perf_counter()
+            status = await _request(app, "/api/seating/my-seat", query, cookie)
+            assert status == 200, status
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "per_second": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 0.5),
+        "p99": _percentile(latencies, 0.99),
+        "max": max(latencies, default=0.0),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark a burst of seat lookups.")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=20000, help="Lookups per burst.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Lookups in flight at once.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="Fail if the warm burst's p99 exceeds --p99-ms.")
+    parser.add_argument("--p99-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    from app.config.security import create_access_token
+    from app.seating.cache import seat_cache
+    from app.seating.encoding import decode_room
+
+    async def run():
+        db = await _seed(args.students)
+        app = _app(db)
+        ids = [f"STU{i:07d}" for i in range(args.students)]
+        random.Random(args.seed).shuffle(ids)
+        cookies = [create_access_token(subject=student_id, claims={"role": "STUDENT"}).encode() for student_id in ids]
+        results = {}
+        for name, warm in (("cold", False), ("warm", True)):
+            seat_cache.invalidate()
+            seat_cache.hits = seat_cache.misses = 0
+            if warm:
+                header = await db["seating_maps"].find_one({"exam_id": EXAM_ID})
+                seats = [a async for room in db["seating_assignments"].find({}) for a in decode_room(room)]
+                seat_cache.warm(EXAM_ID, str(header["_id"]), seats)
+            results[name] = dict(await _burst(app, cookies, args.requests, args.concurrency), cache=seat_cache.stats())
+        return results
+
+    results = asyncio.run(run())
+    print(f"{args.students:,} students, {args.requests:,} lookups per burst, {args.concurrency} in flight")
+    for name, r in results.items():
+        print(f"\n{name}")
+        print(f"  {r['per_second']:>9,.0f} lookups/s   p50 {r['p50'] * 1e3:>7.2f} ms   p99 {r['p99'] * 1e3:>7.2f} ms   max {r['max'] * 1e3:>7.2f} ms")
+        print(f"  cache hit rate {r['cache']['hit_rate']:.2%} ({r['cache']['hits']:,} hits, {r['cache']['misses']:,} misses)")
+    if args.check:
+        p99_ms = results["warm"]["p99"] * 1e3
+        if p99_ms > args.p99_ms:
+            print(f"\nWarm p99 {p99_ms:.2f} ms exceeds {args.p99_ms:.2f} ms.")
+            return 1
+        print(f"\nWarm p99 {p99_ms:.2f} ms is within {args.p99_ms:.2f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# Seating pipeline benchmark: parse -> ingest -> allocate -> serialize -> store.
+#
+# Run from backend/:
+#   python -m benchmarks.seating_bench                          # print results
+#   python -m benchmarks.seating_bench --check                  # exit 1 on regression vs baseline.json
+#   python -m benchmarks.seating_bench --update-baseline        # record new baseline
+#   python -m benchmarks.seating_bench --sizes 1000 500000 --skew 1.5 --engine loop
+#
+# Each roster size runs in a fresh process so peak RSS is attributable to that size.
+# --check gates each stage's cost relative to a stdlib csv parse of the same roster timed in the
+# same run, so baseline.json holds machine-independent ratios rather than absolute throughputs.
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+STAGES = ["parse", "ingest", "allocate", "serialize", "store"]
+
+
+def synthetic_students_csv(n: int, departments: int = 12, skew: float = 1.0, seed: int = 0) -> bytes:
+    # Zipf-like department sizes: skew 0 is uniform, larger values concentrate on a few departments.
+    rng = random.Random(seed)
+    names = [f"DEPT{d:02d}" for d in range(departments)]
+    weights = [1 / (rank + 1) ** skew for rank in range(departments)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["student_id", "name", "department", "semester", "roll_number"])
+    for i, dept in enumerate(rng.choices(names, weights, k=n)):
+        writer.writerow([f"STU{i:07d}", f"Student {i}", dept, str(rng.randint(1, 8)), f"R{i:07d}"])
+    return buffer.getvalue().encode("utf-8")
+
+
+def synthetic_rooms_csv(n_students: int, rows: int = 6, benches_per_row: int = 10, headroom: float = 1.1) -> bytes:
+    n_rooms = max(1, int(n_students * headroom) // (rows * benches_per_row) + 1)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["room_id", "block", "room_number", "rows", "benches_per_row"])
+    for r in range(n_rooms):
+        writer.writerow([f"ROOM{r:05d}", f"B{r // 100}", str(100 + r % 100), rows, benches_per_row])
+    return buffer.getvalue().encode("utf-8")
+
+
+class _Upload:
+    def __init__(self, data: bytes, filename: str):
+        self._stream = io.BytesIO(data)
+        self.filename = filename
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run(n: int, skew: float, engine: str, separate: bool, seed: int) -> dict:
+    from benchmarks.memory_db import MemoryDatabase
+    from app.seating.algorithm import allocate_seats, assignment_docs
+    from app.seating.schemas import SeatingMapResponse
+    from app.seating.service import parse_students_csv, parse_rooms_csv, ingest_students_csv, ingest_rooms_csv, _room_documents
+
+    students_csv = synthetic_students_csv(n, skew=skew, seed=seed)
+    rooms_csv = synthetic_rooms_csv(n)
+    db = MemoryDatabase()
+    timings = {}
+
+    started = time.perf_counter()
+    for _ in csv.DictReader(io.StringIO(students_csv.decode())):
+        pass
+    reference = time.perf_counter() - started
+
+    def stage(name, started):
+        elapsed = time.perf_counter() - started
+        timings[name] = {"seconds": round(elapsed, 4), "per_second": round(n / elapsed if elapsed else 0.0, 1), "peak_rss_mb": _peak_rss_mb()}
+
+    started = time.perf_counter()
+    students = await parse_students_csv(students_csv)
+    rooms = await parse_rooms_csv(rooms_csv)
+    stage("parse", started)
+
+    started = time.perf_counter()
+    await ingest_students_csv(db, _Upload(students_csv, "students.csv"))
+    await ingest_rooms_csv(db, _Upload(rooms_csv, "rooms.csv"))
+    stage("ingest", started)
+
+    random.seed(seed)
+    started = time.perf_counter()
+    assignments = allocate_seats(students, rooms, True, engine, separate)
+    stage("allocate", started)
+
+    started = time.perf_counter()
+    docs = assignment_docs(assignments)
+    SeatingMapResponse.parse_obj({"_id": "benchmark", "assignments": docs, "generated_at": "now"}).json()
+    stage("serialize", started)
+
+    started = time.perf_counter()
+    header = await db["seating_maps"].insert_one({"exam_id": "benchmark", "total_assignments": len(docs)})
+    await db["seating_assignments"].insert_many(_room_documents(header.inserted_id, docs, [r.room_id for r in rooms]))
+    stage("store", started)
+
+    return {
+        "students": n,
+        "rooms": len(rooms),
+        "stored_bytes": db["seating_assignments"].bytes_written,
+        "reference_seconds": reference,
+        "stages": timings,
+    }
+
+
+def run_size(n: int, skew: float, engine: str, separate: bool, seed: int) -> dict:
+    return asyncio.run(_run(n, skew, engine, separate, seed))
+
+
+def _print(result: dict):
+    print(f"\n{result['students']:>8} students, {result['rooms']} rooms, {result['stored_bytes'] / 1e6:.1f} MB stored")
+    for name in STAGES:
+        s = result["stages"][name]
+        print(f"  {name:<10} {s['seconds']:>9.3f}s  {s['per_second']:>12,.0f} students/s  {s['relative']:>7.2f}x ref  peak RSS {s['peak_rss_mb']:>8.1f} MB")
+
+
+def _best_of(runs: list) -> dict:
+    # Fastest time per stage across repeats; RSS is the worst seen. Each stage's relative cost
+    # is its fastest time over the fastest reference parse.
+    best = runs[0]
+    for run in runs[1:]:
+        best["reference_seconds"] = min(best["reference_seconds"], run["reference_seconds"])
+        for name in STAGES:
+            if run["stages"][name]["seconds"] < best["stages"][name]["seconds"]:
+                rss = max(best["stages"][name]["peak_rss_mb"], run["stages"][name]["peak_rss_mb"])
+                best["stages"][name] = dict(run["stages"][name], peak_rss_mb=rss)
+    for name in STAGES:
+        best["stages"][name]["relative"] = round(best["stages"][name]["seconds"] / best["reference_seconds"], 3)
+    return best
+
+
+def _check(results: list, baseline: dict, tolerance: float, min_seconds: float) -> list:
+    failures = []
+    for result in results:
+        expected = baseline.get("results", {}).get(str(result["students"]))
+        if not expected:
+            continue
+        for name in STAGES:
+            if result["stages"][name]["seconds"] < min_seconds:
+                continue
+            ceiling = expected[name]["relative"] * (1 + tolerance)
+            actual = result["stages"][name]["relative"]
+            if actual > ceiling:
+                failures.append(f"{result['students']} students / {name}: {actual:.2f}x ref > {ceiling:.2f}x ref")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the seating pipeline on synthetic rosters.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--skew", type=float, default=1.0, help="Department size skew (0 = uniform).")
+    parser.add_argument("--engine", default="array", choices=["loop", "array"])
+    parser.add_argument("--separate-departments", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="Fail if any stage costs more, relative to the reference parse, than the stored baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative cost increase for --check.")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Stages faster than this are too noisy to check.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        runs = []
+        for _ in range(max(args.repeat, 1)):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                runs.append(pool.submit(run_size, n, args.skew, args.engine, args.separate_departments, args.seed).result())
+        result = _best_of(runs)
+        _print(result)
+        results.append(result)
+
+    params = {"skew": args.skew, "engine": args.engine, "separate_departments": args.separate_departments, "seed": args.seed}
+    if args.update_baseline:
+        baseline = {
+            "params": params,
+            "results": {str(r["students"]): {name: {"relative": r["stages"][name]["relative"]} for name in STAGES} for r in results},
+        }
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+    if args.check:
+        if not BASELINE_PATH.exists():
+            print("\nNo baseline recorded; run with --update-baseline first.")
+            return 1
+        baseline = json.loads(BASELINE_PATH.read_text())
+        if baseline.get("params") != params:
+            print(f"\nBaseline was recorded with {baseline.get('params')}; rerun with matching options.")
+            return 1
+        failures = _check(results, baseline, args.tolerance, args.min_seconds)
+        if failures:
+            print("\nRegressions:\n  " + "\n  ".join(failures))
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
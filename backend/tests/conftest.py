@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    # A LocalStorage under tmp_path installed as the process-wide backend.
+    from app.config.settings import settings
+    from app.storage import service
+    from app.storage.local import LocalStorage
+    backend = LocalStorage(str(tmp_path / "objects"), settings.LOCAL_STORAGE_URL, settings.JWT_SECRET_KEY)
+    monkeypatch.setattr(service, "storage", backend)
+    return backend
+
+
+@pytest.fixture
+def files_client(local_storage):
+    # Upload, download and storage routes behind the auth middleware, backed by MemoryDatabase.
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from benchmarks.memory_db import MemoryDatabase
+    from app.config.database import get_database
+    from app.config.indexes import ensure_indexes
+    from app.files.download import router as download_router, storage_router
+    from app.files.upload import router as upload_router
+    from app.middleware.auth_middleware import AuthMiddleware
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+    app.include_router(upload_router)
+    app.include_router(download_router)
+    app.include_router(storage_router)
+    db = MemoryDatabase()
+    asyncio.run(ensure_indexes(db))
+    app.dependency_overrides[get_database] = lambda: db
+    client = TestClient(app)
+    client.db = db
+    return client
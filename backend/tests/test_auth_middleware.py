@@ -0,0 +1,75 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.config.security import create_access_token
+from app.middleware.auth_middleware import PUBLIC_PATHS, AuthMiddleware, compile_allowlist
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+
+    @app.get("/api/health")
+    async def health():
+        return {"ok": True}
+
+    @app.get("/storage/{key:path}")
+    async def storage(key: str):
+        return {"key": key}
+
+    @app.api_route("/api/private", methods=["GET", "OPTIONS"])
+    async def private(request: Request):
+        user = getattr(request.state, "user", None)
+        return {"user_id": user and user["user_id"], "role": user and user["role"]}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i};".encode()
+        return StreamingResponse(chunks())
+    return TestClient(app)
+
+
+def test_allowlist_matches_exact_paths_and_starred_prefixes():
+    public = compile_allowlist(["/", "/api/health", "/docs/*"])
+    assert public.fullmatch("/") and public.fullmatch("/api/health")
+    assert public.fullmatch("/docs/") and public.fullmatch("/docs/oauth2-redirect")
+    assert not public.fullmatch("/api/health/extra")
+    assert not public.fullmatch("/api/users")
+    assert not public.fullmatch("/docsx")
+    assert not compile_allowlist([]).fullmatch("/")
+    assert not compile_allowlist(["/a.b"]).fullmatch("/axb")
+
+
+def test_public_paths_need_no_token(client):
+    assert client.get("/api/health").status_code == 200
+    assert client.get("/storage/hall_tickets/t.pdf").json() == {"key": "hall_tickets/t.pdf"}
+    assert "/api/auth/login" in PUBLIC_PATHS
+
+
+@pytest.mark.parametrize("token, detail", [(None, "Missing access token."), ("garbage", "Invalid or expired token.")])
+def test_protected_paths_reject_missing_or_bad_tokens(client, token, detail):
+    if token:
+        client.cookies.set("access_token", token)
+    response = client.get("/api/private")
+    assert response.status_code == 401
+    assert response.json() == {"detail": detail}
+
+
+def test_valid_token_lands_in_request_state(client):
+    client.cookies.set("access_token", create_access_token(subject="u1", claims={"role": "ADMIN"}))
+    assert client.get("/api/private").json() == {"user_id": "u1", "role": "ADMIN"}
+
+
+def test_preflight_requests_skip_authentication(client):
+    assert client.options("/api/private").json() == {"user_id": None, "role": None}
+
+
+def test_streaming_bodies_pass_through(client):
+    client.cookies.set("access_token", create_access_token(subject="u1", claims={"role": "STUDENT"}))
+    with client.stream("GET", "/api/stream") as response:
+        assert response.status_code == 200
+        assert b"".join(response.iter_bytes()) == b"chunk0;chunk1;chunk2;"
@@ -0,0 +1,97 @@
+import pytest
+from app.config.security import create_access_token
+from app.files import upload
+
+
+@pytest.fixture
+def client(files_client, monkeypatch):
+    monkeypatch.setattr(upload, "MAX_FILE_SIZE", 4096)
+    files_client.cookies.set("access_token", create_access_token(subject="u1", claims={"role": "STUDENT"}))
+    return files_client
+
+
+def _batch(client, *files):
+    return client.post("/api/files/upload/batch", files=[("files", f) for f in files])
+
+
+def _objects(storage):
+    return [p for p in storage.root.rglob("*") if p.is_file()] if storage.root.exists() else []
+
+
+def test_each_entry_succeeds_or_fails_on_its_own(client, local_storage):
+    response = _batch(
+        client,
+        ("a.pdf", b"first", "application/pdf"),
+        ("run.sh", b"#!/bin/sh", "application/x-sh"),
+        ("big.png", b"x" * 5000, "image/png"),
+        ("b.csv", b"id,name\n", "text/csv"),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["uploaded"], body["failed"]) == (2, 2)
+    assert [(r["filename"], r["status"], r.get("error")) for r in body["results"]] == [
+        ("a.pdf", "ok", None),
+        ("run.sh", "error", "Invalid file type."),
+        ("big.png", "error", "File size exceeds limit."),
+        ("b.csv", "ok", None),
+    ]
+    assert len(client.db["files"].docs) == 2
+    assert len(_objects(local_storage)) == 2
+
+
+def test_duplicates_within_a_batch_become_references(client, local_storage):
+    body = _batch(
+        client,
+        ("a.pdf", b"same", "application/pdf"),
+        ("b.pdf", b"same", "application/pdf"),
+        ("c.pdf", b"same", "application/pdf"),
+    ).json()
+    assert [r["deduplicated"] for r in body["results"]] == [False, True, True]
+    assert len(_objects(local_storage)) == 1
+    refs = [d["ref"] for d in client.db["files"].docs.values() if "ref" in d]
+    assert [str(r) for r in refs] == [body["results"][0]["file_id"]] * 2
+
+
+def test_content_stored_by_an_earlier_request_is_referenced(client, local_storage):
+    first = client.post("/api/files/upload", files={"file": ("a.pdf", b"again", "application/pdf")}).json()
+    body = _batch(client, ("b.pdf", b"again", "application/pdf"), ("c.pdf", b"new", "application/pdf")).json()
+    assert [r["deduplicated"] for r in body["results"]] == [True, False]
+    assert len(_objects(local_storage)) == 2
+    ref = next(d for d in client.db["files"].docs.values() if "ref" in d)
+    assert str(ref["ref"]) == first["file_id"]
+
+
+def test_files_past_the_limit_end_the_batch(client, local_storage, monkeypatch):
+    monkeypatch.setattr(upload.settings, "UPLOAD_BATCH_MAX_FILES", 2)
+    body = _batch(client, *[(f"{i}.pdf", f"file {i}".encode(), "application/pdf") for i in range(3)]).json()
+    assert body["uploaded"] == 2
+    assert body["error"] == "Too many files; at most 2 per request."
+    assert len(_objects(local_storage)) == 2
+
+
+@pytest.mark.parametrize("kwargs, detail", [
+    ({"json": {}}, "Expected a multipart/form-data request."),
+    ({"files": {"file": ("a.pdf", b"x", "application/pdf")}}, "No files provided."),
+])
+def test_requests_without_files_are_rejected(client, kwargs, detail):
+    response = client.post("/api/files/upload/batch", **kwargs)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_entry_that_loses_a_concurrent_race_is_repointed_at_the_winner(client, local_storage, monkeypatch):
+    winner = client.post("/api/files/upload", files={"file": ("w.pdf", b"racy", "application/pdf")}).json()
+    files = client.db["files"]
+    find_one = files.find_one
+    lookups = []
+
+    async def before_the_winner_landed(filter=None, *args, **kwargs):
+        lookups.append(filter)
+        return None if len(lookups) == 1 else await find_one(filter, *args, **kwargs)
+    monkeypatch.setattr(files, "find_one", before_the_winner_landed)
+    body = _batch(client, ("a.pdf", b"racy", "application/pdf"), ("b.pdf", b"racy", "application/pdf")).json()
+    assert body["uploaded"] == 2
+    assert [r["deduplicated"] for r in body["results"]] == [True, True]
+    assert len(_objects(local_storage)) == 1
+    refs = sorted(str(d["ref"]) for d in files.docs.values() if "ref" in d)
+    assert refs == [winner["file_id"]] * 2
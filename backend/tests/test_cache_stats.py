@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config.security import create_access_token
+from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.token_cache import TokenCache, token_cache
+
+
+def _client():
+    from app.seating.routes import router as seating_router
+    from app.users.routes import router as users_router
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+    app.include_router(users_router, prefix="/api/users")
+    app.include_router(seating_router)
+    return TestClient(app)
+
+
+def test_token_cache_counts_hits_misses_and_evictions():
+    cache = TokenCache(max_entries=1)
+    first, second = (create_access_token(subject=s, claims={"role": "STUDENT"}) for s in ("a", "b"))
+    assert cache.decode(first)["sub"] == "a"
+    assert cache.decode(first)["sub"] == "a"
+    cache.decode(second)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evicted"], stats["entries"]) == (1, 2, 1, 1)
+    assert stats["hit_rate"] == 0.3333
+
+
+def test_cache_stats_endpoints_are_admin_only():
+    client = _client()
+    admin = create_access_token(subject="admin", claims={"role": "ADMIN"})
+    student = create_access_token(subject="student", claims={"role": "STUDENT"})
+    for path in ("/api/users/token-cache/stats", "/api/seating/cache/stats"):
+        client.cookies.set("access_token", student)
+        assert client.get(path).status_code == 403
+        client.cookies.set("access_token", admin)
+        response = client.get(path)
+        assert response.status_code == 200
+        assert {"hits", "misses", "hit_rate"} <= response.json().keys()
+    hits = token_cache.stats()["hits"]
+    client.get("/api/users/token-cache/stats")
+    assert token_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from bson import ObjectId
+from app.config.security import create_access_token
+from app.storage import service
+
+
+def _login(client, subject, role="STUDENT"):
+    client.cookies.set("access_token", create_access_token(subject=subject, claims={"role": role}))
+
+
+@pytest.fixture
+def uploaded(files_client):
+    _login(files_client, "owner")
+    response = files_client.post("/api/files/upload", files={"file": ("notes.pdf", b"0123456789" * 10, "application/pdf")})
+    return response.json()
+
+
+@pytest.mark.parametrize("subject, role, code", [("owner", "STUDENT", 200), ("other", "STUDENT", 403), ("admin", "ADMIN", 200)])
+def test_only_the_owner_or_an_admin_can_download(files_client, uploaded, subject, role, code):
+    _login(files_client, subject, role)
+    response = files_client.get(uploaded["url"])
+    assert response.status_code == code
+    if code == 200:
+        assert response.content == b"0123456789" * 10
+        assert response.headers["content-type"] == "application/pdf"
+
+
+def test_download_requires_authentication(files_client, uploaded):
+    files_client.cookies.clear()
+    assert files_client.get(uploaded["url"]).status_code == 401
+
+
+def test_unknown_or_malformed_ids_are_not_found(files_client):
+    _login(files_client, "owner")
+    assert files_client.get(f"/api/files/{ObjectId()}").status_code == 404
+    assert files_client.get("/api/files/not-an-id").status_code == 404
+
+
+def test_revalidation_answers_304(files_client, uploaded):
+    first = files_client.get(uploaded["url"])
+    assert first.headers["etag"].strip('"') == next(iter(files_client.db["files"].docs.values()))["sha256"]
+    assert files_client.get(uploaded["url"], headers={"if-none-match": first.headers["etag"]}).status_code == 304
+    assert files_client.get(uploaded["url"], headers={"if-modified-since": first.headers["last-modified"]}).status_code == 304
+    assert files_client.get(uploaded["url"], headers={"if-none-match": '"other"'}).status_code == 200
+
+
+def test_range_requests_get_partial_content(files_client, uploaded):
+    response = files_client.get(uploaded["url"], headers={"range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == b"0123456789"
+    assert response.headers["content-range"] == "bytes 10-19/100"
+
+
+def test_storage_links_need_a_valid_unexpired_signature(files_client, local_storage):
+    url = asyncio.run(local_storage.put("hall_tickets/t.pdf", b"ticket"))
+    signed = asyncio.run(local_storage.signed_url("hall_tickets/t.pdf", 60))
+    files_client.cookies.clear()
+    assert files_client.get(signed).content == b"ticket"
+    assert files_client.get(url).status_code == 403
+    query = parse_qs(urlsplit(signed).query)
+    tampered = f"{urlsplit(signed).path}?expires={int(query['expires'][0]) + 60}&signature={query['signature'][0]}"
+    assert files_client.get(tampered).status_code == 403
+    other_key = signed.replace("t.pdf", "u.pdf")
+    assert files_client.get(other_key).status_code == 403
+
+
+def test_signatures_expire(local_storage):
+    signed = asyncio.run(local_storage.signed_url("k", 60))
+    query = parse_qs(urlsplit(signed).query)
+    expires, signature = int(query["expires"][0]), query["signature"][0]
+    assert local_storage.verify_signature("k", expires, signature)
+    assert not local_storage.verify_signature("k", expires, "0" * 64)
+    assert not local_storage.verify_signature("k", None, signature)
+    past = int(time.time()) - 1
+    assert not local_storage.verify_signature("k", past, local_storage._signature("k", past))
+
+
+class _RemoteStorage:
+    name = "s3"
+
+    def __init__(self):
+        self.signed = 0
+
+    async def signed_url(self, key, expires_in):
+        self.signed += 1
+        return f"https://bucket.example/{key}?sig={self.signed}"
+
+    def key_for_url(self, url):
+        return None
+
+
+def test_remote_downloads_redirect_to_a_cached_signed_url(files_client, monkeypatch):
+    remote = _RemoteStorage()
+    monkeypatch.setattr(service, "storage", remote)
+    file_id = ObjectId()
+    files_client.db["files"].docs[file_id] = {"_id": file_id, "filename": "r.pdf", "uploaded_by": "owner",
+                                              "storage_backend": "s3", "storage_key": "uploads/r.pdf", "url": "https://bucket.example/uploads/r.pdf"}
+    _login(files_client, "owner")
+    responses = [files_client.get(f"/api/files/{file_id}", follow_redirects=False) for _ in range(3)]
+    assert [r.status_code for r in responses] == [302] * 3
+    assert {r.headers["location"] for r in responses} == {"https://bucket.example/uploads/r.pdf?sig=1"}
+    assert remote.signed == 1
+    _login(files_client, "other")
+    assert files_client.get(f"/api/files/{file_id}", follow_redirects=False).status_code == 403
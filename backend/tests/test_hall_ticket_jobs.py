@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.memory_db import MemoryDatabase
+
+
+def test_bulk_start_counts_students_without_decoding_seats(monkeypatch):
+    from app.hall_ticket import service
+    monkeypatch.setattr(service, "_start_job", lambda db, job_id: None)
+    db = MemoryDatabase()
+
+    def untouched(*args, **kwargs):
+        raise AssertionError("seating maps read while starting a job")
+
+    async def seed():
+        await db["exams"].insert_many([
+            {"_id": ObjectId(), "code": "CS301", "department": "CSE", "semester": "3", "date": "2024-05-01", "time": "10:00"},
+            {"_id": ObjectId(), "code": "EC501", "department": "ECE", "semester": "5", "date": "2024-05-02", "time": "10:00"},
+        ])
+        await db["students"].insert_many([
+            {"student_id": f"S{i}", "name": f"S{i}", "department": dept, "semester": sem}
+            for i, (dept, sem) in enumerate([("CSE", "3"), ("CSE", "3"), ("CSE", "5"), ("ECE", "5")])
+        ])
+    asyncio.run(seed())
+    for name in ("seating_maps", "seating_assignments"):
+        monkeypatch.setattr(db[name], "find", untouched)
+        monkeypatch.setattr(db[name], "find_one", untouched)
+    job = asyncio.run(service.start_bulk_generation(db, session_date="2024-05-01"))
+    assert job.total == 2
+    assert job.status == "pending"
+
+
+def _job(worker, lease_until):
+    return {"_id": ObjectId(), "status": "running", "session_date": None, "session_time": None,
+            "stale_only": False, "total": 0, "processed": 0, "reused": 0, "failed": 0, "errors": [],
+            "last_student_id": None, "worker": worker, "lease_until": lease_until}
+
+
+def test_job_crashed_inside_its_lease_is_resumed_once_the_lease_expires(monkeypatch):
+    from app.hall_ticket import service
+    monkeypatch.setattr(service.settings, "HALL_TICKET_JOB_RETRY_SECONDS", 0.01)
+    db = MemoryDatabase()
+    # The previous process (a different WORKER_ID) died 0.2 s into a fresh lease.
+    job = _job("crashed-host:1", datetime.utcnow() + timedelta(seconds=0.2))
+
+    async def scenario():
+        await db["hall_ticket_jobs"].insert_one(job)
+        await service.resume_bulk_jobs(db)
+        await asyncio.sleep(0.05)
+        assert (await db["hall_ticket_jobs"].find_one({"_id": job["_id"]}))["status"] == "running"
+        await asyncio.wait_for(asyncio.gather(*service._running_jobs), timeout=5)
+        return await db["hall_ticket_jobs"].find_one({"_id": job["_id"]})
+    done = asyncio.run(scenario())
+    assert done["status"] == "completed"
+    assert done["worker"] == service.WORKER_ID
+
+
+def test_graceful_shutdown_releases_held_leases():
+    from app.hall_ticket import service
+    db = MemoryDatabase()
+    mine = _job(service.WORKER_ID, datetime.utcnow() + timedelta(minutes=2))
+    theirs = _job("other-host:1", datetime.utcnow() + timedelta(minutes=2))
+
+    async def scenario():
+        await db["hall_ticket_jobs"].insert_many([mine, theirs])
+        await service.release_bulk_jobs(db)
+    asyncio.run(scenario())
+    leases = {doc["worker"]: doc["lease_until"] for doc in db["hall_ticket_jobs"].docs.values()}
+    assert leases[service.WORKER_ID] is None
+    assert leases["other-host:1"] is not None
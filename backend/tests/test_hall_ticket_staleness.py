@@ -0,0 +1,79 @@
+import asyncio
+from bson import ObjectId
+from benchmarks.memory_db import MemoryDatabase
+from app.exams.schemas import ExamUpdate
+from app.exams.service import delete_exam, update_exam
+from app.hall_ticket import service
+from app.hall_ticket.service import generate_hall_ticket, ticket_content_hash
+
+EXAM = {"subject": "Algorithms", "code": "CS301", "department": "CSE", "semester": "3",
+        "date": "2024-05-01", "time": "10:00", "venue": "Hall A"}
+
+
+def _seed(db):
+    exam_ids = [ObjectId(), ObjectId()]
+
+    async def seed():
+        await db["exams"].insert_many([dict(EXAM, _id=exam_ids[0]), dict(EXAM, _id=exam_ids[1], code="CS302")])
+        await db["hall_tickets"].insert_many([
+            {"student_id": "S1", "exams": [{"exam_id": str(exam_ids[0])}], "stale": False},
+            {"student_id": "S2", "exams": [{"exam_id": str(exam_ids[0])}, {"exam_id": str(exam_ids[1])}], "stale": False},
+            {"student_id": "S3", "exams": [{"exam_id": str(exam_ids[1])}], "stale": False},
+        ])
+    asyncio.run(seed())
+    return [str(i) for i in exam_ids]
+
+
+def _stale(db):
+    return sorted(t["student_id"] for t in db["hall_tickets"].docs.values() if t["stale"])
+
+
+def test_content_hash_ignores_exam_order_and_unrendered_fields():
+    other = dict(EXAM, code="MA201", date="2024-05-02")
+    assert ticket_content_hash("Ada", [EXAM, other]) == ticket_content_hash("Ada", [other, dict(EXAM, exam_id="x")])
+    assert ticket_content_hash("Ada", [EXAM]) != ticket_content_hash("Ada", [dict(EXAM, venue="Hall B")])
+    assert ticket_content_hash("Ada", [EXAM]) != ticket_content_hash("Bob", [EXAM])
+
+
+def test_updating_an_exam_marks_only_its_tickets_stale():
+    db = MemoryDatabase()
+    first, _ = _seed(db)
+    asyncio.run(update_exam(db, first, ExamUpdate(venue="Hall B")))
+    assert _stale(db) == ["S1", "S2"]
+
+
+def test_empty_update_leaves_tickets_fresh():
+    db = MemoryDatabase()
+    first, _ = _seed(db)
+    asyncio.run(update_exam(db, first, ExamUpdate()))
+    assert _stale(db) == []
+
+
+def test_deleting_an_exam_marks_its_tickets_stale():
+    db = MemoryDatabase()
+    _, second = _seed(db)
+    assert asyncio.run(delete_exam(db, second))
+    assert _stale(db) == ["S2", "S3"]
+    assert not asyncio.run(delete_exam(db, second))
+
+
+def test_reissue_reuses_the_fresh_ticket_until_it_goes_stale(local_storage, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(service, "create_hall_ticket_pdf", lambda name, exams: rendered.append(name) or b"%PDF")
+    monkeypatch.setattr(service, "generate_qr_code", lambda content: b"png")
+    db = MemoryDatabase()
+    exam_id = str(ObjectId())
+    exams = [dict(EXAM, exam_id=exam_id)]
+
+    async def scenario():
+        first = await generate_hall_ticket(db, "S1", "Ada", exams)
+        again = await generate_hall_ticket(db, "S1", "Ada", exams)
+        assert again.issued_at == first.issued_at
+        assert len(db["hall_tickets"].docs) == 1
+        assert await service.mark_tickets_stale(db, exam_id) == 1
+        await generate_hall_ticket(db, "S1", "Ada", exams)
+        assert len(db["hall_tickets"].docs) == 2
+    asyncio.run(scenario())
+    # The PDF for unchanged content is rendered once; the reissue reuses the stored artifact.
+    assert rendered == ["Ada"]
+    assert _stale(db) == []
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from app.storage import local
+from app.storage.service import create_storage
+
+
+def _files(storage):
+    return sorted(p.name for p in storage.root.rglob("*") if p.is_file())
+
+
+def test_put_get_delete_round_trip(local_storage):
+    key = "hall_tickets/a b/ticket.pdf"
+    url = asyncio.run(local_storage.put(key, b"pdf"))
+    assert local_storage.key_for_url(url) == key
+    assert asyncio.run(local_storage.get(key)) == b"pdf"
+    assert local_storage.path(key).parent.parent.parent == local_storage.root
+    asyncio.run(local_storage.delete(key))
+    asyncio.run(local_storage.delete(key))
+    assert _files(local_storage) == []
+
+
+def test_failed_write_leaves_the_old_object_and_no_temp_file(local_storage, monkeypatch):
+    asyncio.run(local_storage.put("k", b"old"))
+
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(local.os, "replace", fail)
+    with pytest.raises(OSError):
+        asyncio.run(local_storage.put("k", b"new"))
+    assert asyncio.run(local_storage.get("k")) == b"old"
+    assert _files(local_storage) == [local_storage.path("k").name]
+
+
+def test_writer_is_invisible_until_commit(local_storage, monkeypatch):
+    monkeypatch.setattr(local.settings, "UPLOAD_CHUNK_SIZE", 4)
+
+    async def scenario():
+        writer = local_storage.open_writer("k")
+        await writer.write(b"abcdef")
+        assert not local_storage.path("k").exists()
+        assert [name.startswith(".tmp-") for name in _files(local_storage)] == [True]
+        await writer.write(b"gh")
+        return await writer.commit()
+    url = asyncio.run(scenario())
+    assert local_storage.key_for_url(url) == "k"
+    assert local_storage.path("k").read_bytes() == b"abcdefgh"
+    assert _files(local_storage) == ["k"]
+
+
+def test_aborted_writer_removes_its_temp_file(local_storage, monkeypatch):
+    monkeypatch.setattr(local.settings, "UPLOAD_CHUNK_SIZE", 4)
+
+    async def scenario():
+        writer = local_storage.open_writer("k")
+        await writer.write(b"abcdef")
+        await writer.abort()
+    asyncio.run(scenario())
+    assert _files(local_storage) == []
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_storage("ftp")
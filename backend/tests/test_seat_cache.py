@@ -0,0 +1,29 @@
+from app.seating.cache import SeatLookupCache
+
+SEAT = {"room_id": "R1", "block": "A", "room_number": "101", "row": 1, "seat": 2}
+
+
+def test_complete_bucket_answers_misses_and_counts_hits():
+    cache = SeatLookupCache(ttl_seconds=60)
+    cache.warm("exam-1", "map-1", [dict(SEAT, student_id="S1")])
+    assert cache.get("exam-1", "S1") == (True, "map-1", SEAT)
+    assert cache.get("exam-1", "S2") == (True, "map-1", None)
+    assert cache.get("exam-2", "S1") == (False, None, None)
+    assert cache.stats() == {"exams": 1, "seats": 1, "hits": 2, "misses": 1, "hit_rate": 0.6667}
+
+
+def test_delta_for_another_map_is_ignored():
+    cache = SeatLookupCache(ttl_seconds=60)
+    cache.warm("exam-1", "map-1", [dict(SEAT, student_id="S1")])
+    cache.apply_delta("exam-1", "map-0", [dict(SEAT, student_id="S9")], ["S1"])
+    cache.apply_delta("exam-1", "map-1", [dict(SEAT, student_id="S2", seat=3)], ["S1"])
+    assert cache.get("exam-1", "S1") == (True, "map-1", None)
+    assert cache.get("exam-1", "S2")[2]["seat"] == 3
+    assert cache.get("exam-1", "S9") == (True, "map-1", None)
+
+
+def test_expired_bucket_is_dropped():
+    cache = SeatLookupCache(ttl_seconds=-1)
+    cache.warm("exam-1", "map-1", [dict(SEAT, student_id="S1")])
+    assert cache.get("exam-1", "S1") == (False, None, None)
+    assert cache.stats()["exams"] == 0
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import numpy as np
+import pytest
+from bson import ObjectId
+from app.seating.algorithm import separated_indices
+
+
+def _run(seed):
+    labels = ["CSE-3", "CSE-3", "ECE-5", "ECE-5", "MECH-1"] * 8
+    return separated_indices(labels, np.array([4, 4]), np.array([5, 5]), seed)
+
+
+def test_seeded_run_is_reproducible_and_leaves_global_rng_alone():
+    random.seed(42)
+    expected = random.random()
+    random.seed(42)
+    first = _run(7)
+    assert random.random() == expected
+    assert (first[0] == _run(7)[0]).all()
+
+
+def _batch_db(exams):
+    from benchmarks.memory_db import MemoryDatabase
+    db = MemoryDatabase()
+
+    async def seed():
+        await db["rooms"].insert_one({
+            "room_id": "R1", "block": "A", "room_number": "101",
+            "rows": 4, "benches_per_row": 5, "capacity": 20
+        })
+        await db["students"].insert_many([
+            {"student_id": f"S{i}", "name": f"S{i}", "department": dept,
+             "semester": "3", "roll_number": f"R{i}"}
+            for i, dept in enumerate(["CSE", "ECE"] * 6)
+        ])
+        await db["exams"].insert_many(exams)
+    asyncio.run(seed())
+    return db
+
+
+def _exam(code, department, time="10:00"):
+    return {"_id": ObjectId(), "code": code, "subject": code, "department": department,
+            "semester": "3", "date": "2024-05-01", "time": time}
+
+
+def test_batch_rejects_two_exams_for_one_cohort_in_a_slot():
+    from app.seating.service import generate_batch_seating_maps
+    db = _batch_db([_exam("CS301", "CSE"), _exam("CS302", "CSE"), _exam("EC301", "ECE")])
+    with pytest.raises(ValueError, match="CSE semester 3 on 2024-05-01 10:00: CS301 and CS302"):
+        asyncio.run(generate_batch_seating_maps(db))
+    assert asyncio.run(db["seating_maps"].find_one({})) is None
+
+
+def test_single_session_batch_allocates_off_the_event_loop(monkeypatch):
+    from app.seating import service
+    calls = []
+
+    async def fake_run_in_process(fn, *args):
+        calls.append(fn)
+        return fn(*args)
+    monkeypatch.setattr(service, "run_in_process", fake_run_in_process)
+    db = _batch_db([_exam("CS301", "CSE"), _exam("EC301", "ECE")])
+    result = asyncio.run(service.generate_batch_seating_maps(db))
+    assert calls == [separated_indices]
+    assert sorted(m.total_assignments for m in result.seating_maps) == [6, 6]
+
+
+def _students(n, departments=("CSE", "ECE", "MECH")):
+    from app.seating.schemas import StudentData
+    return [StudentData(student_id=f"S{i:03d}", name=f"Student {i}", department=departments[i * 7 % len(departments)],
+                        semester="3", roll_number=f"R{i:03d}") for i in range(n)]
+
+
+def _rooms(*shapes):
+    from app.seating.schemas import RoomData
+    return [RoomData(room_id=f"R{i}", block="A", room_number=str(100 + i), rows=rows, benches_per_row=benches,
+                     capacity=max(rows, 0) * max(benches, 0)) for i, (rows, benches) in enumerate(shapes)]
+
+
+def _engine(engine, students, rooms, mix_departments, seed=11):
+    from app.seating.algorithm import allocate_seats, assignment_docs
+    random.seed(seed)
+    return assignment_docs(allocate_seats(students, rooms, mix_departments, engine))
+
+
+@pytest.mark.parametrize("mix_departments", [True, False])
+@pytest.mark.parametrize("n_students, shapes", [
+    (37, [(3, 5), (4, 6)]),             # roster fits with seats to spare
+    (60, [(3, 5), (2, 4)]),             # capacity shortfall: the rest go unplaced
+    (20, [(0, 5), (3, 0), (2, 4), (-1, 3), (3, 5)]),  # zero- and negative-capacity rooms are skipped
+    (0, [(3, 5)]),                      # empty roster
+    (10, []),                           # no rooms
+])
+def test_array_engine_matches_loop_engine(n_students, shapes, mix_departments):
+    students, rooms = _students(n_students), _rooms(*shapes)
+    loop = _engine("loop", students, rooms, mix_departments)
+    array = _engine("array", students, rooms, mix_departments)
+    assert array == loop
+    assert len(array) == min(n_students, sum(max(r, 0) * max(b, 0) for r, b in shapes))
+    assert len({d["student_id"] for d in array}) == len(array)
+    assert len({(d["room_id"], d["row"], d["seat"]) for d in array}) == len(array)
@@ -0,0 +1,43 @@
+import zlib
+import pytest
+from bson import ObjectId, decode, encode
+from bson.binary import Binary
+from app.seating.encoding import SEPARATOR, decode_room, encode_room
+
+ROOM = {"room_id": "R1", "block": "A", "room_number": "101"}
+
+
+def _assignments(names, rolls=None):
+    return [
+        dict(ROOM, student_id=f"S{i}", student_name=name, roll_number=(rolls or [f"R{i}"] * len(names))[i],
+             department=["CSE", "ECE"][i % 2], row=i // 5 + 1, seat=i % 5 + 1)
+        for i, name in enumerate(names)
+    ]
+
+
+@pytest.mark.parametrize("names", [
+    ["Ada", "Grace", "Linus"],
+    [f"Odd{SEPARATOR}Name", "", f"{SEPARATOR}{SEPARATOR}", "Ünïcødé 名前"],
+    [""],
+    [],
+])
+def test_round_trip_through_bson(names):
+    assignments = _assignments(names, rolls=[f"R{SEPARATOR}{i}" for i in range(len(names))])
+    doc = decode(encode(encode_room(ObjectId(), 0, ROOM, assignments)))
+    assert decode_room(doc) == assignments
+
+
+def test_format_1_documents_still_decode():
+    assignments = _assignments(["Ada", "Grace"])
+    doc = encode_room(ObjectId(), 0, ROOM, assignments)
+    del doc["format"]
+    doc["student_names"] = Binary(zlib.compress(SEPARATOR.join(["Ada", "Grace"]).encode()))
+    doc["roll_numbers"] = Binary(zlib.compress(SEPARATOR.join(["R0", "R1"]).encode()))
+    assert decode_room(doc) == assignments
+
+
+def test_truncated_text_column_is_rejected():
+    doc = encode_room(ObjectId(), 0, ROOM, _assignments(["Ada", "Grace"]))
+    doc["student_names"] = Binary(zlib.compress(zlib.decompress(doc["student_names"])[:-2]))
+    with pytest.raises(ValueError, match="Corrupt"):
+        decode_room(doc)
@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+from benchmarks.memory_db import MemoryDatabase
+from app.seating.encoding import decode_room
+from app.seating.schemas import RosterDelta, StudentData
+from app.seating.service import generate_seating_map, update_seating_map, SeatingMapConflict
+
+
+def _student(i, department="CSE"):
+    return {"student_id": f"S{i:03d}", "name": f"Student {i}", "department": department, "semester": "3", "roll_number": f"R{i:03d}"}
+
+
+def _late(i):
+    return StudentData.parse_obj(_student(i, "ECE"))
+
+
+class _Yielding:
+    # Suspends before every database call so concurrent requests interleave the way they do
+    # against a real server.
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        return _YieldingCollection(self._db[name])
+
+
+class _YieldingCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return await attr(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def seated():
+    db = MemoryDatabase()
+
+    async def seed():
+        await db["rooms"].insert_many([
+            {"room_id": f"R{i}", "block": "A", "room_number": str(101 + i), "rows": 2, "benches_per_row": 5, "capacity": 10}
+            for i in range(2)
+        ])
+        await db["students"].insert_many([_student(i) for i in range(14)])
+        await generate_seating_map(db, "exam-1", "Exam", mix_departments=False, engine="array")
+    asyncio.run(seed())
+    return db, str(next(iter(db["seating_maps"].docs)))
+
+
+def _seats(db, map_id):
+    return {
+        a["student_id"]: (a["room_id"], a["row"], a["seat"])
+        for room in db["seating_assignments"].docs.values() if str(room["seating_map_id"]) == map_id
+        for a in decode_room(room)
+    }
+
+
+def _update(db, map_id, added=(), removed=()):
+    return asyncio.run(update_seating_map(db, map_id, RosterDelta(added=[_late(i) for i in added], removed=list(removed))))
+
+
+def test_delta_keeps_existing_seats_and_reuses_freed_ones(seated):
+    db, map_id = seated
+    before = _seats(db, map_id)
+    result = _update(db, map_id, added=[100, 101], removed=["S003"])
+    after = _seats(db, map_id)
+    assert result.removed == 1 and result.unplaced == []
+    assert "S003" not in after
+    assert {k: v for k, v in after.items() if k in before} == {k: v for k, v in before.items() if k != "S003"}
+    assert after["S100"] == before["S003"]
+    assert after["S101"] == ("R1", 1, 5)
+    assert len(set(after.values())) == len(after) == 15
+    header = next(iter(db["seating_maps"].docs.values()))
+    assert header["total_assignments"] == 15 and header["seat_cursor"] == 15 and header["updating_until"] is None
+
+
+def test_delta_beyond_capacity_reports_unplaced(seated):
+    db, map_id = seated
+    result = _update(db, map_id, added=range(100, 108))
+    assert [a.student_id for a in result.placed] == [f"S{i:03d}" for i in range(100, 106)]
+    assert result.unplaced == ["S106", "S107"]
+    assert len(set(_seats(db, map_id).values())) == 20
+
+
+def test_concurrent_deltas_never_share_a_seat(seated, monkeypatch):
+    from app.seating import service
+    monkeypatch.setattr(service.settings, "SEATING_UPDATE_RETRY_SECONDS", 0.001)
+    db, map_id = seated
+    concurrent = _Yielding(db)
+
+    async def both():
+        return await asyncio.gather(
+            update_seating_map(concurrent, map_id, RosterDelta(added=[_late(i) for i in (100, 101, 102)], removed=["S001"])),
+            update_seating_map(concurrent, map_id, RosterDelta(added=[_late(i) for i in (200, 201, 202)])),
+        )
+    first, second = asyncio.run(both())
+    seats = _seats(db, map_id)
+    assert len(seats) == 14 - 1 + 6
+    assert len(set(seats.values())) == len(seats)
+    header = next(iter(db["seating_maps"].docs.values()))
+    assert header["total_assignments"] == len(seats)
+    assert header["free_seats"] == []
+
+
+def test_deleted_room_is_a_conflict_not_a_crash(seated):
+    db, map_id = seated
+    asyncio.run(db["rooms"].delete_many({"room_id": "R1"}))
+    with pytest.raises(SeatingMapConflict, match="R1"):
+        _update(db, map_id, added=[100])
+    header = next(iter(db["seating_maps"].docs.values()))
+    assert header["updating_until"] is None
+    # Freed seats in surviving rooms still work without the deleted room.
+    assert _update(db, map_id, added=[100], removed=["S000"]).placed[0].room_id == "R0"
+
+
+@pytest.mark.parametrize("codes", [["CS301"], ["CS301", "EC301"]])
+def test_batch_maps_accept_deltas_without_sharing_seats(codes, monkeypatch):
+    from bson import ObjectId
+    from app.seating import service
+
+    async def inline(fn, *args):
+        return fn(*args)
+    monkeypatch.setattr(service, "run_in_process", inline)
+    db = MemoryDatabase()
+    departments = ["CSE", "ECE"][:len(codes)]
+
+    async def seed():
+        await db["rooms"].insert_one({"room_id": "R0", "block": "A", "room_number": "101", "rows": 4, "benches_per_row": 5, "capacity": 20})
+        await db["students"].insert_many([_student(i, departments[i % len(departments)]) for i in range(12)])
+        await db["exams"].insert_many([
+            {"_id": ObjectId(), "code": code, "subject": code, "department": dept, "semester": "3", "date": "2024-05-01", "time": "10:00"}
+            for code, dept in zip(codes, departments)
+        ])
+        return await service.generate_batch_seating_maps(db)
+    maps = asyncio.run(seed()).seating_maps
+    taken = {seat for m in maps for seat in _seats(db, m.seating_map_id).values()}
+    placed = []
+    for n, m in enumerate(maps):
+        result = _update(db, m.seating_map_id, added=range(100 + 10 * n, 104 + 10 * n))
+        assert result.unplaced == []
+        placed += [(a.room_id, a.row, a.seat) for a in result.placed]
+    assert len(set(placed)) == len(placed) == 4 * len(maps)
+    assert not taken & set(placed)
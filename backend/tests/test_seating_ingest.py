@@ -0,0 +1,123 @@
+import asyncio
+import csv
+import io
+import pytest
+from app.seating.service import _iter_csv_rows
+
+
+class _Upload:
+    def __init__(self, data: bytes, filename: str = "roster.csv"):
+        self._stream = io.BytesIO(data)
+        self.filename = filename
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+
+def _rows(data: bytes, chunk_size: int, required: str = "student_id"):
+    async def collect():
+        return [item async for item in _iter_csv_rows(_Upload(data), chunk_size, required)]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1 << 20])
+def test_stray_quotes_in_unquoted_fields_keep_every_row(chunk_size):
+    data = b'student_id,name,department\nS1,O"Brien,CSE\nS2,Bob,CSE\nS3,D"Arcy,ECE\nS4,Eve,ECE\n'
+    rows = _rows(data, chunk_size)
+    assert [row for _, row in rows] == list(csv.DictReader(io.StringIO(data.decode())))
+    assert [line for line, _ in rows] == [2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_quoted_fields_may_span_lines(chunk_size):
+    data = b'student_id,name\r\nS1,"two\r\nlines"\r\n\r\nS2,"say ""hi"""\r\nS3,last'
+    rows = _rows(data, chunk_size)
+    assert [row for _, row in rows] == list(csv.DictReader(io.StringIO(data.decode(), newline="")))
+    assert [line for line, _ in rows] == [2, 5, 6]
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"name,department\nAda,CSE\n", "Missing required column"),
+    (b'student_id,name\nS1,"open\nS2,x\n', "Unterminated quoted field starting on line 2"),
+    (b"student_id,name\nS1,\xff\n", "Invalid file encoding"),
+])
+def test_bad_input_is_rejected(data, message):
+    with pytest.raises(ValueError, match=message):
+        _rows(data, 4)
+
+
+def _ingest(db, data: bytes, collection: str = "students", sync: bool = False):
+    from app.seating.service import ingest_students_csv, ingest_rooms_csv
+    ingest = ingest_students_csv if collection == "students" else ingest_rooms_csv
+    return asyncio.run(ingest(db, _Upload(data), sync=sync))
+
+
+def _students_csv(n: int, start: int = 0) -> bytes:
+    lines = ["student_id,name,department,semester,roll_number"]
+    lines += [f"S{i:04d},Student {i},CSE,3,R{i:04d}" for i in range(start, start + n)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _stored(db, collection: str = "students"):
+    async def collect():
+        key = "student_id" if collection == "students" else "room_id"
+        return sorted([d[key] async for d in db[collection].find({})])
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def db():
+    from benchmarks.memory_db import MemoryDatabase
+    database = MemoryDatabase()
+    _ingest(database, _students_csv(100))
+    return database
+
+
+def test_replace_swaps_in_the_new_roster(db):
+    result = _ingest(db, _students_csv(3, start=500))
+    assert result.inserted == 3
+    assert _stored(db) == ["S0500", "S0501", "S0502"]
+    assert sorted(asyncio.run(db.list_collection_names())) == ["students"]
+
+
+def test_replace_keeps_roster_when_upload_breaks_midway(db):
+    data = _students_csv(5000)
+    broken = data[:len(data) // 2] + b"\xff" + data[len(data) // 2:]
+    with pytest.raises(ValueError, match="Invalid file encoding"):
+        _ingest(db, broken)
+    assert len(_stored(db)) == 100
+    assert sorted(asyncio.run(db.list_collection_names())) == ["students"]
+
+
+def test_replace_rejects_header_without_key_before_touching_roster(db):
+    with pytest.raises(ValueError, match="Missing required column 'student_id'"):
+        _ingest(db, b"id,name\nS1,Ada\n")
+    assert len(_stored(db)) == 100
+
+
+def test_replace_with_no_valid_rows_leaves_roster(db):
+    result = _ingest(db, b"student_id,name\n,Ada\n, Bob\n")
+    assert result.records_failed == 2 and result.inserted == 0
+    assert len(_stored(db)) == 100
+
+
+def test_sync_with_wrong_header_deletes_nothing(db):
+    with pytest.raises(ValueError, match="Missing required column 'student_id'"):
+        _ingest(db, _students_csv(98).replace(b"student_id,", b"studentid,", 1), sync=True)
+    assert len(_stored(db)) == 100
+
+
+def test_sync_skips_deletes_when_rows_fail():
+    from benchmarks.memory_db import MemoryDatabase
+    db = MemoryDatabase()
+    _ingest(db, b"room_id,block,room_number,rows,benches_per_row\nR1,A,101,5,6\nR2,A,102,5,6\nR3,A,103,5,6\n", "rooms")
+    result = _ingest(db, b"room_id,block,room_number,rows,benches_per_row\nR1,A,101,five,6\nR2,A,102,5,8\n", "rooms", sync=True)
+    assert result.records_failed == 1 and result.updated == 1 and result.deleted == 0
+    assert "deletions skipped" in result.message
+    assert _stored(db, "rooms") == ["R1", "R2", "R3"]
+
+
+def test_clean_sync_deletes_missing_rows(db):
+    result = _ingest(db, _students_csv(98), sync=True)
+    assert result.deleted == 2 and result.unchanged == 98
+    assert len(_stored(db)) == 98
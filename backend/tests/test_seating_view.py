@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from benchmarks.memory_db import MemoryDatabase
+from app.seating.export import find_seating_map_header, stream_seating_csv
+from app.seating.service import generate_seating_map, get_seating_map
+
+
+@pytest.fixture
+def db():
+    database = MemoryDatabase()
+
+    async def seed():
+        await database["rooms"].insert_many([
+            {"room_id": f"R{i}", "block": "AB"[i % 2], "room_number": str(101 + i), "rows": 2, "benches_per_row": 3, "capacity": 6}
+            for i in range(4)
+        ])
+        await database["students"].insert_many([
+            {"student_id": f"S{i:02d}", "name": f"Student {i}", "department": "CSE" if i < 12 else "ECE", "semester": "3", "roll_number": f"R{i:02d}"}
+            for i in range(20)
+        ])
+        await generate_seating_map(database, "exam-1", "Exam", mix_departments=False, engine="array")
+    asyncio.run(seed())
+    return database
+
+
+def _view(db, **kwargs):
+    return asyncio.run(get_seating_map(db, **kwargs))
+
+
+def test_rooms_are_stored_one_document_each(db):
+    rooms = sorted(db["seating_assignments"].docs.values(), key=lambda r: r["room_index"])
+    assert [(r["room_id"], r["count"]) for r in rooms] == [("R0", 6), ("R1", 6), ("R2", 6), ("R3", 2)]
+    assert "assignments" not in next(iter(db["seating_maps"].docs.values()))
+
+
+def test_pages_follow_the_cursor_through_every_room(db):
+    full = _view(db)
+    pages, cursor = [], None
+    while True:
+        page = _view(db, cursor=cursor, limit=2)
+        pages.append([a.room_id for a in page.assignments])
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert [sorted(set(p)) for p in pages] == [["R0", "R1"], ["R2", "R3"], []]
+    assert sum(len(p) for p in pages) == len(full.assignments) == 20
+
+
+def test_filters_narrow_rooms_and_seats(db):
+    assert {a.room_id for a in _view(db, block="B").assignments} == {"R1", "R3"}
+    assert [a.student_id for a in _view(db, room_id="R3").assignments] == ["S18", "S19"]
+    ece = _view(db, department="ECE").assignments
+    assert {a.department for a in ece} == {"ECE"} and len(ece) == 8
+
+
+def test_embedded_legacy_maps_still_filter(db):
+    legacy = {"exam_id": "old", "exam_name": "Old", "generated_at": "2000-01-01", "assignments": [
+        {"student_id": "S1", "student_name": "A", "roll_number": "1", "department": "CSE", "room_id": "R0", "block": "A", "room_number": "101", "row": 1, "seat": 1},
+        {"student_id": "S2", "student_name": "B", "roll_number": "2", "department": "ECE", "room_id": "R1", "block": "B", "room_number": "102", "row": 1, "seat": 1},
+    ]}
+    map_id = asyncio.run(db["seating_maps"].insert_one(legacy)).inserted_id
+    assert [a.student_id for a in _view(db, seating_map_id=str(map_id), department="ECE").assignments] == ["S2"]
+
+
+def test_csv_export_streams_every_seat_in_room_order(db):
+    async def export():
+        header = await find_seating_map_header(db)
+        return b"".join([chunk if isinstance(chunk, bytes) else chunk.encode() async for chunk in stream_seating_csv(db, header)])
+    lines = asyncio.run(export()).decode().splitlines()
+    assert lines[0].startswith("block,room_number,room_id")
+    assert len(lines) == 21
+    assert [line.split(",")[2] for line in lines[1:]] == ["R0"] * 6 + ["R1"] * 6 + ["R2"] * 6 + ["R3"] * 2
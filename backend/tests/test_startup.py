@@ -0,0 +1,37 @@
+import asyncio
+from fastapi.testclient import TestClient
+from pymongo.errors import ServerSelectionTimeoutError
+from benchmarks.memory_db import MemoryDatabase
+
+
+def test_api_starts_and_reports_unready_without_mongod(monkeypatch):
+    from app.config import database
+    from app.main import app
+    monkeypatch.setattr(database.settings, "MONGODB_URI", "mongodb://127.0.0.1:1")
+    monkeypatch.setattr(database.settings, "MONGO_SERVER_SELECTION_TIMEOUT_MS", 100)
+    monkeypatch.setattr(database.settings, "MONGO_READY_TIMEOUT_MS", 300)
+    monkeypatch.setattr(database.settings, "MONGO_SETUP_RETRY_SECONDS", 0.05)
+    with TestClient(app) as client:
+        response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+
+def test_setup_retries_until_the_server_answers(monkeypatch):
+    from app.config import database
+    monkeypatch.setattr(database.settings, "MONGO_SETUP_RETRY_SECONDS", 0.01)
+    db = MemoryDatabase()
+    outages = {"left": 2}
+    resumed = []
+
+    async def ensure_indexes(db):
+        if outages["left"]:
+            outages["left"] -= 1
+            raise ServerSelectionTimeoutError("no servers")
+    monkeypatch.setattr(database, "ensure_indexes", ensure_indexes)
+
+    async def resume(db):
+        resumed.append(db)
+    asyncio.run(asyncio.wait_for(database._setup(db, [resume]), timeout=5))
+    assert outages["left"] == 0
+    assert resumed == [db]
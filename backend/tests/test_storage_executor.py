@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.storage.executor import StorageExecutor
+
+
+def test_concurrency_is_bounded_by_the_worker_count():
+    executor = StorageExecutor(max_workers=2)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def work():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    async def scenario():
+        await asyncio.gather(*(executor.run("put", work) for _ in range(6)))
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert running["peak"] == 2
+    stats = executor.stats()
+    assert (stats["workers"], stats["queued"], stats["active"]) == (2, 0, 0)
+    assert stats["peak_queued"] >= 4
+    assert stats["operations"]["put"]["count"] == 6
+    assert stats["operations"]["put"]["mean_wait_ms"] > 0
+
+
+def test_errors_are_counted_and_raised():
+    executor = StorageExecutor(max_workers=1)
+
+    def fail():
+        raise OSError("gone")
+    try:
+        with pytest.raises(OSError):
+            asyncio.run(executor.run("get", fail))
+        assert asyncio.run(executor.run("get", lambda: 1)) == 1
+    finally:
+        executor.shutdown()
+    assert (executor.stats()["operations"]["get"]["count"], executor.stats()["operations"]["get"]["errors"]) == (2, 1)
+
+
+def test_calls_cancelled_while_queued_never_run():
+    executor = StorageExecutor(max_workers=1)
+    ran = []
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run("put", time.sleep, 0.05))
+        queued = asyncio.ensure_future(executor.run("put", ran.append, 1))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await first
+        await asyncio.sleep(0.01)
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert ran == []
+    assert executor.stats()["queued"] == 0
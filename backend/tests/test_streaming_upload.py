@@ -0,0 +1,72 @@
+import hashlib
+import pytest
+from app.config.security import create_access_token
+from app.files import upload
+
+
+@pytest.fixture
+def client(files_client, monkeypatch):
+    monkeypatch.setattr(upload, "MAX_FILE_SIZE", 4096)
+    files_client.cookies.set("access_token", create_access_token(subject="u1", claims={"role": "STUDENT"}))
+    return files_client
+
+
+def _objects(storage):
+    return sorted(p.name for p in storage.root.rglob("*") if p.is_file()) if storage.root.exists() else []
+
+
+def test_upload_streams_the_file_into_storage(client, local_storage):
+    data = bytes(range(256)) * 12
+    response = client.post("/api/files/upload", files={"file": ("notes.pdf", data, "application/pdf")})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["size"], body["deduplicated"]) == (len(data), False)
+    assert body["url"] == f"/api/files/{body['file_id']}"
+    doc = next(iter(client.db["files"].docs.values()))
+    assert doc["sha256"] == hashlib.sha256(data).hexdigest()
+    assert doc["uploaded_by"] == "u1"
+    assert local_storage.path(doc["storage_key"]).read_bytes() == data
+    assert _objects(local_storage) == [local_storage.path(doc["storage_key"]).name]
+
+
+def test_oversized_content_length_is_rejected_before_reading(client, local_storage):
+    # The body is not even multipart, so only the Content-Length check can produce this error.
+    response = client.post("/api/files/upload", content=b"x" * (upload.MAX_FILE_SIZE + 128 * 1024), headers={
+        "content-type": "multipart/form-data; boundary=b",
+        "content-length": str(upload.MAX_FILE_SIZE + 128 * 1024),
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File size exceeds limit."
+    assert _objects(local_storage) == []
+
+
+def test_file_over_the_limit_mid_stream_leaves_no_partial_object(client, local_storage, monkeypatch):
+    monkeypatch.setattr(upload.settings, "UPLOAD_CHUNK_SIZE", 1024)
+    data = b"x" * (upload.MAX_FILE_SIZE + 1)
+    response = client.post("/api/files/upload", files={"file": ("big.pdf", data, "application/pdf")})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File size exceeds limit."
+    assert client.db["files"].docs == {}
+    assert _objects(local_storage) == []
+
+
+def test_disallowed_type_is_rejected(client, local_storage):
+    response = client.post("/api/files/upload", files={"file": ("run.sh", b"#!/bin/sh", "application/x-sh")})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid file type."
+    assert _objects(local_storage) == []
+
+
+@pytest.mark.parametrize("kwargs, detail", [
+    ({"json": {"file": "x"}}, "Expected a multipart/form-data request."),
+    ({"data": {"other": "x"}, "files": {"other": ("a.pdf", b"x", "application/pdf")}}, "No file provided."),
+])
+def test_requests_without_a_file_part_are_rejected(client, kwargs, detail):
+    response = client.post("/api/files/upload", **kwargs)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_upload_requires_authentication(files_client):
+    response = files_client.post("/api/files/upload", files={"file": ("a.pdf", b"x", "application/pdf")})
+    assert response.status_code == 401
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from pymongo.errors import DuplicateKeyError
+from app.config.security import create_access_token
+
+
+def _login(client, subject):
+    client.cookies.set("access_token", create_access_token(subject=subject, claims={"role": "STUDENT"}))
+
+
+def _upload(client, name, data):
+    response = client.post("/api/files/upload", files={"file": (name, data, "application/pdf")})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _objects(storage):
+    return [p for p in storage.root.rglob("*") if p.is_file()]
+
+
+def test_identical_content_is_stored_once(files_client, local_storage):
+    _login(files_client, "u1")
+    first = _upload(files_client, "a.pdf", b"%PDF same bytes")
+    _login(files_client, "u2")
+    second = _upload(files_client, "b.pdf", b"%PDF same bytes")
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert len(_objects(local_storage)) == 1
+    docs = files_client.db["files"].docs
+    ref = docs[next(k for k in docs if str(k) == second["file_id"])]
+    assert str(ref["ref"]) == first["file_id"]
+    assert "sha256" not in ref
+    assert (ref["filename"], ref["uploaded_by"]) == ("b.pdf", "u2")
+    # The reference is downloadable by its own uploader and serves the original bytes.
+    assert files_client.get(second["url"]).content == b"%PDF same bytes"
+
+
+def test_different_content_is_stored_separately(files_client, local_storage):
+    _login(files_client, "u1")
+    assert not _upload(files_client, "a.pdf", b"one")["deduplicated"]
+    assert not _upload(files_client, "a.pdf", b"two")["deduplicated"]
+    assert len(_objects(local_storage)) == 2
+
+
+def test_losing_a_concurrent_race_keeps_the_winner(files_client, local_storage, monkeypatch):
+    _login(files_client, "u1")
+    winner = _upload(files_client, "a.pdf", b"racy")
+    files = files_client.db["files"]
+    find_one = files.find_one
+    lookups = []
+
+    async def before_the_winner_landed(filter=None, *args, **kwargs):
+        # The first sha256 lookup runs before the concurrent insert is visible.
+        lookups.append(filter)
+        return None if len(lookups) == 1 else await find_one(filter, *args, **kwargs)
+    monkeypatch.setattr(files, "find_one", before_the_winner_landed)
+    loser = _upload(files_client, "b.pdf", b"racy")
+    assert loser["deduplicated"]
+    assert len(_objects(local_storage)) == 1
+    assert sum(1 for d in files.docs.values() if "sha256" in d) == 1
+    assert str(files.docs[next(k for k in files.docs if str(k) == loser["file_id"])]["ref"]) == winner["file_id"]
+
+
+def test_unique_index_covers_stored_objects_but_not_references(files_client):
+    files = files_client.db["files"]
+    asyncio.run(files.insert_one({"sha256": "h", "storage_key": "k1"}))
+    asyncio.run(files.insert_one({"ref": "x", "storage_key": "k1"}))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(files.insert_one({"sha256": "h", "storage_key": "k2"}))
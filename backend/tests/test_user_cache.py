@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from benchmarks.memory_db import MemoryDatabase
+from app.users import service
+from app.users.cache import UserProfileCache
+from app.users.schemas import UserResponse, UserUpdateRequest
+
+USER_ID = "0" * 24
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = UserProfileCache(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(service, "user_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def db():
+    database = MemoryDatabase()
+    asyncio.run(database["users"].insert_one({"_id": ObjectId(USER_ID), "email": "ada@example.com", "role": "STUDENT", "name": "Ada"}))
+    return database
+
+
+def _profile(name="Ada"):
+    return UserResponse.parse_obj({"_id": USER_ID, "email": "ada@example.com", "role": "STUDENT", "name": name})
+
+
+def test_repeat_reads_are_served_from_the_cache(cache, db, monkeypatch):
+    assert asyncio.run(service.get_user_by_id(db, USER_ID)).name == "Ada"
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("database read on a cache hit")
+    monkeypatch.setattr(db["users"], "find_one", unreachable)
+    assert asyncio.run(service.get_user_by_id(db, USER_ID)).name == "Ada"
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_update_writes_once_and_repopulates_the_cache(cache, db, monkeypatch):
+    asyncio.run(service.get_user_by_id(db, USER_ID))
+    updated = asyncio.run(service.update_user_profile(db, USER_ID, UserUpdateRequest(name="Grace")))
+    assert updated.name == "Grace"
+    assert cache.stats()["invalidations"] == 1
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("database read after the update")
+    monkeypatch.setattr(db["users"], "find_one", unreachable)
+    assert asyncio.run(service.get_user_by_id(db, USER_ID)).name == "Grace"
+
+
+def test_cached_profiles_are_copies(cache):
+    cache.put(USER_ID, _profile())
+    cache.get(USER_ID).name = "Mallory"
+    assert cache.get(USER_ID).name == "Ada"
+
+
+def test_read_that_started_before_a_write_is_not_cached(cache):
+    read_at = cache.writes
+    cache.invalidate(USER_ID)
+    cache.put(USER_ID, _profile("Stale"), read_at)
+    assert cache.get(USER_ID) is None
+    cache.put(USER_ID, _profile("Fresh"), cache.writes)
+    assert cache.get(USER_ID).name == "Fresh"
+
+
+def test_entries_expire_after_the_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.users.cache.time.monotonic", lambda: now[0])
+    cache.put(USER_ID, _profile())
+    now[0] += 61
+    assert cache.get(USER_ID) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = UserProfileCache(ttl_seconds=60, max_entries=2)
+    for user_id in ("a", "b"):
+        cache.put(user_id, _profile())
+    cache.get("a")
+    cache.put("c", _profile())
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["evicted"] == 1